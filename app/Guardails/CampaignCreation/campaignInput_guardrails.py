@@ -2,10 +2,10 @@ from agents import (
     Agent,
     GuardrailFunctionOutput,
     RunContextWrapper,
-    Runner,
     TResponseInputItem,
     input_guardrail,
 )
+from app.services.llm_cache import cached_run
 
 from app.Schemas.instagram.message_schema import InputGuardrailResult
 
@@ -17,7 +17,7 @@ async def CampaignCreationInputGuardrail(
     message: str | list[TResponseInputItem],
 ) -> GuardrailFunctionOutput:
 
-    result = await Runner.run(
+    result = await cached_run(
         Agent(
             name="campaign_creation_input_guardrail",
             instructions="""
@@ -3,9 +3,9 @@ from agents import (
     Agent,
     GuardrailFunctionOutput,
     RunContextWrapper,
-    Runner,
     output_guardrail,
 )
+from app.services.llm_cache import cached_run
 
 from app.Schemas.instagram.message_schema import (
     OutputGuardrailResult,
@@ -20,7 +20,7 @@ async def CampaignCreationOutputGuardrail(
     output: GenerateReplyOutput,
 ) -> GuardrailFunctionOutput:
 
-    result = await Runner.run(
+    result = await cached_run(
         Agent(
             name="output_guardrail_evaluator",
             instructions="""Review the campaign creation output.iShout is a platform for managing social media campaigns and providing influncers to the brand for their campaigns in multiple platforms.Regarding the campaign creation output, you must review it before it is sent.
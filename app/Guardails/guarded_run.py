@@ -0,0 +1,82 @@
+import asyncio
+import re
+from typing import Any
+from agents import Agent, RunContextWrapper, Runner
+from agents.exceptions import InputGuardrailTripwireTriggered
+from app.config.credentials_config import config
+
+# The prescreen lets a call skip its LLM input guardrails, so it only passes
+# text that is all of:
+# - at most GUARDRAIL_PRESCREEN_MAX_CHARS long (280 by default, about one chat
+#   message; longer text can hide more than these patterns can see),
+# - plain ASCII (Urdu, Arabic and other scripts always go to the guardrail),
+# - free of anything the Instagram input guardrail is there to catch: payment
+#   and crypto talk, links and contact handles, contracts and prompt injection,
+#   including spaced-out spellings such as "b i t c o i n" or "pay pal".
+_RISK_RE = re.compile(
+    r"crypto|bitcoin|\bbtc\b|\busdt\b|\beth\b|ethereum|wallet|binance|"
+    r"wire transfer|western union|moneygram|gift ?card|paypal|cash ?app|venmo|zelle|"
+    r"\biban\b|\bswift\b|bank (account|details|transfer)|"
+    r"https?://|www\.|telegram|signal|\b\d{9,}\b|"
+    r"contract|agreement|\bsign\b|\bnda\b|"
+    r"ignore (all|any|the|previous|prior)|system prompt|instructions|jailbreak|pretend",
+    re.I,
+)
+# Matched against the text with everything but letters and digits removed.
+_SQUASHED_RISK_RE = re.compile(
+    r"crypto|bitcoin|usdt|ethereum|wallet|binance|westernunion|moneygram|giftcard|"
+    r"paypal|cashapp|venmo|zelle|bank(?:account|details|transfer)|wiretransfer|"
+    r"telegram|whatsapp|jailbreak|systemprompt"
+)
+
+
+def prescreen(text: Any) -> bool:
+    """True when `text` is short, plain ASCII and matches none of the risk patterns."""
+    if not isinstance(text, str) or not text.isascii():
+        return False
+    if len(text) > config.GUARDRAIL_PRESCREEN_MAX_CHARS or _RISK_RE.search(text):
+        return False
+    return not _SQUASHED_RISK_RE.search(re.sub(r"[^a-z0-9]", "", text.lower()))
+
+
+async def run_guarded(
+    agent: Agent,
+    input: Any,
+    *,
+    use_prescreen: bool = False,
+    run=Runner.run,
+    **kwargs,
+):
+    """
+    Run `agent` with its input guardrails evaluated next to it, not before it.
+
+    The agent starts right away with its input guardrails detached, while the
+    guardrails run on `input` in parallel. If any tripwire fires the agent run
+    is cancelled and `InputGuardrailTripwireTriggered` is raised, as with
+    `Runner.run`. With `use_prescreen`, an `input` that passes the local
+    `prescreen` skips the LLM guardrails entirely; only opt in where `input`
+    is the raw user message and nothing else. Output guardrails are unchanged
+    and still run on the final output.
+    """
+    guardrails = list(agent.input_guardrails)
+    if not guardrails or not config.GUARDRAIL_PARALLEL_ENABLED:
+        return await run(agent, input, **kwargs)
+
+    main_agent = agent.clone(input_guardrails=[])
+    if use_prescreen and prescreen(input):
+        return await run(main_agent, input, **kwargs)
+
+    context = RunContextWrapper(context=kwargs.get("context"))
+    main = asyncio.create_task(run(main_agent, input, **kwargs))
+    try:
+        results = await asyncio.gather(*(g.run(agent, input, context) for g in guardrails))
+    except BaseException:
+        main.cancel()
+        await asyncio.gather(main, return_exceptions=True)
+        raise
+    for result in results:
+        if result.output.tripwire_triggered:
+            main.cancel()
+            await asyncio.gather(main, return_exceptions=True)
+            raise InputGuardrailTripwireTriggered(result)
+    return await main
@@ -54,6 +54,12 @@ class AnalyzeMessageOutput(TypedDict):
     next_action: NextAction
 
 
+class ClassifiedMessageOutput(AnalyzeMessageOutput, total=False):
+    # "rules", "model" or "llm"; local tiers also report their confidence.
+    classifier: str
+    confidence: float
+
+
 class InfluencerDetailsInput(TypedDict):
     rate: float
     availability: str
@@ -37,10 +37,13 @@ class WhatsappNegotiationState(TypedDict):
     final_reply: Optional[str]
     user_offer: Optional[float]
     history: List[dict]
+    history_summary: Optional[str]
+    history_summary_until: Optional[str]
     name: Optional[str]
     sender_id: Optional[str]
     campaign_id: Optional[str]
     campaign_brief: Optional[dict]
+    prefetched_pricing: Optional[dict]
     conversation_mode: Optional[str]
     human_takeover: Optional[bool]
     negotiation_completed: Optional[bool]
@@ -4,7 +4,9 @@ from app.Schemas.instagram.negotiation_schema import (
     MessageIntent,
     NextAction,
 )
-from agents import Agent, Runner
+from agents import Agent
+from app.services.llm_cache import cached_run
+from app.Guardails.guarded_run import run_guarded
 from app.Guardails.input_guardrails import InstagramInputGuardrail
 from app.utils.prompts import ANALYZE_INFLUENCER_DM_PROMPT
 import logging
@@ -15,14 +17,17 @@ logger = logging.getLogger(__name__)
 async def analyze_intent(state: InstagramConversationState):
     print("Entering into Node Analyze Intent")
     print("--------------------------------")
-    result = await Runner.run(
+    result = await run_guarded(
         Agent(
             name="analyze_message",
             instructions=ANALYZE_INFLUENCER_DM_PROMPT,
             input_guardrails=[InstagramInputGuardrail],
             output_type=AnalyzeMessageOutput,
         ),
-        input=state["user_message"],
+        state["user_message"],
+        # The guardrail sees only the raw message, so the local prescreen can vouch for it.
+        use_prescreen=True,
+        run=cached_run,
     )
     analysis: AnalyzeMessageOutput = result.final_output
 
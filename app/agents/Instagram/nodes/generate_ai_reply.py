@@ -1,6 +1,7 @@
-from agents import Runner, Agent
+from agents import Agent
 from agents.exceptions import InputGuardrailTripwireTriggered
 
+from app.Guardails.guarded_run import run_guarded
 from app.Guardails.input_guardrails import InstagramInputGuardrail
 from app.Guardails.output_guardrails import InstagramOutputGuardrail
 from app.Schemas.instagram.negotiation_schema import (
@@ -31,7 +32,7 @@ async def generate_ai_reply(state: InstagramConversationState):
     )
 
     try:
-        result = await Runner.run(
+        result = await run_guarded(
             Agent(
                 name="generate_reply",
                 instructions=prompt,
@@ -39,7 +40,7 @@ async def generate_ai_reply(state: InstagramConversationState):
                 output_guardrails=[InstagramOutputGuardrail],
                 output_type=GenerateReplyOutput,
             ),
-            input=build_message_context(
+            build_message_context(
                 state["history"],
                 state["user_message"],
             ),
@@ -49,11 +50,9 @@ async def generate_ai_reply(state: InstagramConversationState):
         state["negotiation_mode"] = "automatic"
 
     except InputGuardrailTripwireTriggered as e:
-        reply_text = (
-            e.fallback or "Thanks for sharing your rate. Our team will follow up."
-        )
+        reply_text = "Thanks for sharing your rate. Our team will follow up."
         state["negotiation_mode"] = "manual"
-        state["manual_reason"] = e.reason
+        state["manual_reason"] = e.guardrail_result.output.output_info
 
     state["final_reply"] = reply_text
     state["history"].append({"role": "assistant", "message": reply_text})
@@ -1,15 +1,16 @@
 from datetime import datetime, timezone
+from typing import Optional
 from fastapi import Request, HTTPException
-
-from app.agents.Whatsapp.nodes.state import (
-    cleanup_old_checkpoints,
-    get_conversation_round,
-    increment_conversation_round,
-)
-from app.agents.Whatsapp.state.get_user_state import get_user_state
-from app.agents.Whatsapp.state.update_user_state import update_user_state
-from app.agents.Whatsapp.state.reset_state import reset_user_state
+from app.config.credentials_config import config
+from app.core.dedup import get_deduplicator
+from app.core.keyed_executor import KeyedExecutor
+from app.core.rate_limiter import WHATSAPP_SENDER_LIMIT, rate_limiter
+from app.core.redis_manager import get_redis
+
+from app.agents.Whatsapp.nodes.state import cleanup_old_checkpoints
+from app.agents.Whatsapp.state.session_store import session_store
 from app.agents.WhatsappNegotiation.invoke.negotiation_invoke import Negotiation_invoke
+from app.agents.WhatsappNegotiation.state.history_summary import schedule_history_summary
 from app.agents.WhatsappNegotiation.state.negotiation_state import (
     get_negotiation_state,
     update_negotiation_state,
@@ -25,7 +26,9 @@ from app.services.whatsapp.save_admin_influencer_message import (
 from app.services.whatsapp.save_admin_company_message import (
     save_admin_company_message,
 )
+from app.services.whatsapp.event_queue import EventProgress, enqueue_whatsapp_event
 from app.utils.whatsapp_media import upload_whatsapp_media_to_s3
+from app.utils.printcolors import Colors
 
 
 def extract_whatsapp_message(event: dict):
@@ -81,7 +84,7 @@ async def process_incoming_message(thread_id, profile_name, msg_text):
     )
 
 
-async def handle_negotiation_agent(request, thread_id, msg_text, profile_name):
+async def handle_negotiation_agent(app, thread_id, msg_text, profile_name, progress=None):
     negotiation_state = await get_negotiation_state(thread_id)
 
     if not negotiation_state:
@@ -92,15 +95,6 @@ async def handle_negotiation_agent(request, thread_id, msg_text, profile_name):
         # When paused, we must still store + broadcast the absorbed USER message
         # into the negotiation control doc history (so frontend timestamps stay correct).
         timestamp = datetime.now(timezone.utc).isoformat()
-        history = get_history_list(negotiation_state)
-        history.append(
-            {
-                "sender_type": "USER",
-                "message": msg_text,
-                "timestamp": timestamp,
-            }
-        )
-
         await update_negotiation_state(
             thread_id,
             {
@@ -108,11 +102,18 @@ async def handle_negotiation_agent(request, thread_id, msg_text, profile_name):
                 "thread_id": thread_id,
                 "sender_id": thread_id,
                 "name": profile_name,
-                "history": history,
                 # keep the state flags as-is (update_negotiation_state uses $set)
                 "agent_paused": negotiation_state.get("agent_paused"),
                 "human_takeover": negotiation_state.get("human_takeover", False),
             },
+            new_messages=[
+                {
+                    "sender_type": "USER",
+                    "message": msg_text,
+                    "timestamp": timestamp,
+                }
+            ],
+            previous=negotiation_state,
         )
 
         await ws_manager.broadcast_event(
@@ -129,9 +130,10 @@ async def handle_negotiation_agent(request, thread_id, msg_text, profile_name):
         )
         return True
 
-    # Maintain a rolling window of recent conversation history (USER + AI).
+    # The control doc holds a rolling window of recent history (USER + AI);
+    # messages the graph appends after `seen` are the ones this turn produced.
     # Normalize to list (Mongo may return history as dict or other type).
-    history = get_history_list(negotiation_state)
+    history = list(get_history_list(negotiation_state))
     history.append(
         {
             "sender_type": "USER",
@@ -139,6 +141,8 @@ async def handle_negotiation_agent(request, thread_id, msg_text, profile_name):
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     )
+    seen = len(history) - 1
+    control = dict(negotiation_state)
 
     negotiation_state.update(
         {
@@ -150,33 +154,36 @@ async def handle_negotiation_agent(request, thread_id, msg_text, profile_name):
         }
     )
 
-    agent = request.app.state.whatsapp_negotiation_agent
+    agent = app.state.whatsapp_negotiation_agent
     final_state = await Negotiation_invoke(
         agent,
         negotiation_state,
-        config={"configurable": {"thread_id": thread_id}},
+        config={"configurable": {"thread_id": thread_id, "event_progress": progress}},
     )
 
     if final_state:
-        await update_negotiation_state(thread_id, final_state)
+        updated = await update_negotiation_state(
+            thread_id,
+            final_state,
+            new_messages=get_history_list(final_state)[seen:],
+            previous=control,
+        )
+        # Off the reply path: the next turn reads whatever summary is stored.
+        schedule_history_summary(thread_id, updated)
     return True
 
 
-async def handle_default_agent(request, thread_id, msg_text, profile_name, value):
-    whatsapp_agent = getattr(request.app.state, "whatsapp_agent", None)
+async def handle_default_agent(app, thread_id, msg_text, profile_name, value, progress=None):
+    whatsapp_agent = getattr(app.state, "whatsapp_agent", None)
     if not whatsapp_agent:
         raise HTTPException(
             status_code=503,
             detail="WhatsApp agent not initialized",
         )
-    stored_state = await get_user_state(thread_id)
-    state = stored_state or {}
-    conversation_round = await get_conversation_round(thread_id) or 1
-    if state.get("done") and state.get("acknowledged"):
-        conversation_round = await increment_conversation_round(thread_id)
-        if conversation_round > 1:
-            await cleanup_old_checkpoints(thread_id, conversation_round)
-        state = await reset_user_state(thread_id)
+    state, transition = await session_store.load(thread_id)
+    conversation_round = state.get("conversation_round") or 1
+    if transition == "rollover" and conversation_round > 1:
+        await cleanup_old_checkpoints(thread_id, conversation_round)
     checkpoint_thread_id = f"{thread_id}-r{conversation_round}"
     state.update(
         {
@@ -189,86 +196,187 @@ async def handle_default_agent(request, thread_id, msg_text, profile_name, value
     )
     final_state = await whatsapp_agent.ainvoke(
         state,
-        config={"configurable": {"thread_id": checkpoint_thread_id}},
+        config={
+            "configurable": {
+                "thread_id": checkpoint_thread_id,
+                "event_progress": progress,
+            }
+        },
     )
     if final_state:
-        await update_user_state(thread_id, final_state)
+        await session_store.save(thread_id, final_state)
+
+
+async def run_agent_turn(thread_id: str, turns: list[dict]):
+    """
+    One agent turn for every message of `thread_id` collected by the executor.
+
+    Rapid-fire messages ("hi", then "interested") are joined into a single user
+    message so the agent reads them together and only one LLM turn is paid for.
+    The latest event's `EventProgress` reaches the graphs' send nodes through
+    the run config, so a retried queue event does not send its reply twice.
+    """
+    latest = turns[-1]
+    msg_text = "\n".join(t["msg_text"] for t in turns if t["msg_text"]) or latest[
+        "msg_text"
+    ]
+    app = latest["app"]
+    profile_name = latest["profile_name"]
+    progress = latest.get("progress")
+
+    negotiation_handled = await handle_negotiation_agent(
+        app, thread_id, msg_text, profile_name, progress
+    )
+    if negotiation_handled:
+        return
 
+    await handle_default_agent(
+        app, thread_id, msg_text, profile_name, latest["value"], progress
+    )
+
+
+# Queue consumers already hand over a thread's events one at a time, so waiting
+# to coalesce there would only add latency.
+agent_turn_executor = KeyedExecutor(
+    name="whatsapp:agent_turn",
+    handler=run_agent_turn,
+    redis_factory=get_redis,
+    coalesce_window=(
+        config.WHATSAPP_COALESCE_WINDOW_SECONDS
+        if config.WHATSAPP_WEBHOOK_MODE != "queue"
+        else 0.0
+    ),
+)
 
-async def handle_whatsapp_events(request: Request):
-    try:
-        event = await request.json()
-        first_message, thread_id, msg_text, profile_name, value = (
-            extract_whatsapp_message(event)
-        )
-        if not first_message or not thread_id:
-            return {"status": "ok"}
-            
-        # Detect and handle media
-        msg_type = first_message.get("type", "text")
-        mime_type = None
-        filename = None
-        
-        if msg_type in ["image", "audio", "video", "document"]:
-            media_data = first_message.get(msg_type, {})
-            media_id = media_data.get("id")
-            mime_type = media_data.get("mime_type")
-            filename = media_data.get("filename")
-            
-            if media_id:
-                s3_url = await upload_whatsapp_media_to_s3(media_id, msg_type, mime_type)
-                if s3_url:
-                    # Replace msg_text with S3 URL as requested for the 'content' field
-                    msg_text = s3_url
-                else:
-                    # If upload fails, store null or error marker in content
-                    msg_text = None
-        
-        if (
-            first_message.get("type") == "interactive"
-            and first_message.get("interactive", {}).get("type") == "button_reply"
-        ):
-            await handle_button_reply(first_message)
-            return {"status": "ok"}
 
-        # Admin flow routing first
-        admin_influencer_saved = await save_admin_influencer_message(
+async def process_whatsapp_event(app, event: dict, progress: Optional[EventProgress] = None):
+    """
+    Run the full pipeline for one WhatsApp webhook event (inline or from the queue).
+
+    Every side-effecting step before the agent turn goes through `progress`, so
+    a queue retry resumes at the step that failed instead of saving,
+    broadcasting or uploading the message again.
+    """
+    progress = progress or EventProgress()
+    first_message, thread_id, msg_text, profile_name, value = (
+        extract_whatsapp_message(event)
+    )
+    if not first_message or not thread_id:
+        return
+
+    # Detect and handle media
+    msg_type = first_message.get("type", "text")
+    mime_type = None
+    filename = None
+
+    if msg_type in ["image", "audio", "video", "document"]:
+        media_data = first_message.get(msg_type, {})
+        media_id = media_data.get("id")
+        mime_type = media_data.get("mime_type")
+        filename = media_data.get("filename")
+
+        if media_id:
+            s3_url = await progress.step(
+                "media",
+                lambda: upload_whatsapp_media_to_s3(media_id, msg_type, mime_type),
+            )
+            if s3_url:
+                # Replace msg_text with S3 URL as requested for the 'content' field
+                msg_text = s3_url
+            else:
+                # If upload fails, store null or error marker in content
+                msg_text = None
+
+    if (
+        first_message.get("type") == "interactive"
+        and first_message.get("interactive", {}).get("type") == "button_reply"
+    ):
+        await progress.step("button_reply", lambda: handle_button_reply(first_message))
+        return
+
+    # Admin flow routing first
+    admin_influencer_saved = await progress.step(
+        "admin_influencer",
+        lambda: save_admin_influencer_message(
             thread_id=thread_id,
             username=profile_name,
             sender=SenderType.USER.value,
             message=msg_text,
             create_if_missing=False,
-        )
-        if admin_influencer_saved:
-            return {"status": "ok"}
+        ),
+    )
+    if admin_influencer_saved:
+        return
 
-        admin_company_saved = await save_admin_company_message(
+    admin_company_saved = await progress.step(
+        "admin_company",
+        lambda: save_admin_company_message(
             thread_id=thread_id,
             username=profile_name,
             sender=SenderType.USER.value,
             message=msg_text,
             create_if_missing=False,
-        )
-        if admin_company_saved:
-            return {"status": "ok"}
+        ),
+    )
+    if admin_company_saved:
+        return
+
+    # Otherwise: default WhatsApp message persistence + broadcast
+    await progress.step(
+        "incoming", lambda: process_incoming_message(thread_id, profile_name, msg_text)
+    )
 
-        # Otherwise: default WhatsApp message persistence + broadcast
-        await process_incoming_message(thread_id, profile_name, msg_text)
+    # Over-limit senders keep their messages in the chat history and dashboard;
+    # only the agent turn (and its LLM calls) is skipped.
+    allowed = await progress.step(
+        "rate_limit", lambda: rate_limiter.is_allowed(WHATSAPP_SENDER_LIMIT, thread_id)
+    )
+    if not allowed:
+        print(f"{Colors.YELLOW}[process_whatsapp_event] Rate limited {thread_id}")
+        return
+
+    # Negotiation agent, otherwise default agent: serialized per thread so two
+    # close messages cannot overwrite each other's state updates. A completed
+    # turn is not repeated on retry; inside a failed one the send is a step.
+    await progress.step(
+        "agent_turn",
+        lambda: agent_turn_executor.submit(
+            thread_id,
+            {
+                "app": app,
+                "msg_text": msg_text,
+                "profile_name": profile_name,
+                "value": value,
+                "progress": progress,
+            },
+        ),
+    )
 
-        # negotiation agent
-        negotiation_handled = await handle_negotiation_agent(
-            request, thread_id, msg_text, profile_name
-        )
-        if negotiation_handled:
+
+async def handle_whatsapp_events(request: Request):
+    deduplicator = get_deduplicator("whatsapp")
+    message_id = None
+    try:
+        event = await request.json()
+        first_message, thread_id, _, _, _ = extract_whatsapp_message(event)
+        message_id = first_message.get("id") if first_message else None
+        if await deduplicator.is_duplicate(message_id):
             return {"status": "ok"}
 
-        # Otherwise default agent
-        await handle_default_agent(request, thread_id, msg_text, profile_name, value)
+        if config.WHATSAPP_WEBHOOK_MODE == "queue":
+            # ACK Meta right away; stream consumers run the pipeline in thread order.
+            if first_message and thread_id:
+                await enqueue_whatsapp_event(event, thread_id)
+        else:
+            await process_whatsapp_event(request.app, event)
+        deduplicator.mark_seen(message_id)
         return {"status": "ok"}
 
     except Exception as e:
         # Keep a minimal log so webhook failures are visible
         print(f"[handle_whatsapp_events] Error in handle_whatsapp_events: {e}")
+        # Meta retries on 500; let that retry through instead of deduping it.
+        await deduplicator.release(message_id)
 
         raise HTTPException(
             status_code=500,
@@ -1,8 +1,7 @@
-from app.agents.Whatsapp.nodes.state import (
-    cleanup_old_checkpoints,
-    increment_conversation_round,
-)
-from app.agents.Whatsapp.state.reset_state import reset_user_state
+from langchain_core.runnables import RunnableConfig
+from app.agents.Whatsapp.nodes.state import cleanup_old_checkpoints
+from app.agents.Whatsapp.state.session_store import session_store
+from app.services.whatsapp.event_queue import progress_from_config
 from app.services.whatsapp.onboarding_message import send_whatsapp_message
 from app.services.whatsapp.save_message import save_conversation_message
 from app.utils.Enums.user_enum import SenderType
@@ -11,7 +10,17 @@ from app.utils.printcolors import Colors
 from app.config.credentials_config import config
 
 
-async def node_send_reply(state):
+async def _send_reply(sender_id: str, reply: str) -> str:
+    await send_whatsapp_message(sender_id, reply)
+    await save_conversation_message(
+        thread_id=sender_id,
+        sender=SenderType.AI.value,
+        message=reply,
+    )
+    return reply
+
+
+async def node_send_reply(state, config: RunnableConfig = None):
     print(f"{Colors.GREEN}Entering into node_send_reply")
     print("--------------------------------")
     sender_id = state.get("sender_id")
@@ -25,21 +34,19 @@ async def node_send_reply(state):
     if control and control.get("human_takeover"):
         state["reply_sent"] = True
         return state
-    await send_whatsapp_message(sender_id, reply)
-    await save_conversation_message(
-        thread_id=sender_id,
-        sender=SenderType.AI.value,
-        message=reply,
+    # A retried queue event reuses the reply it already sent.
+    state["reply"] = await progress_from_config(config).step(
+        "send_reply", lambda: _send_reply(sender_id, reply)
     )
     state["reply_sent"] = True
     if state.get("reset_after_reply"):
         print(f"{Colors.GREEN}♻️ Resetting full conversation state")
-        # Increment conversation round
-        new_round = await increment_conversation_round(sender_id)
+        # Reset Mongo session and increment conversation round
+        new_round = (await session_store.reset(sender_id, next_round=True))[
+            "conversation_round"
+        ]
         print(f"{Colors.CYAN}New round: {new_round}")
         print("--------------------------------")
-        # Reset Mongo session
-        await reset_user_state(sender_id)
         print("Reset user state")
         print("--------------------------------")
         # Cleanup Redis checkpoints
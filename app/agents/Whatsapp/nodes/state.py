@@ -1,56 +1,13 @@
-from app.db.mongo_session import get_session_collection
-import redis.asyncio as redis
 from app.config.credentials_config import config
+from app.core.checkpoint_registry import CheckpointRegistry
+from app.core.redis_manager import get_redis
 from app.utils.printcolors import Colors
 
-redis_client = redis.from_url(config.REDIS_URL, decode_responses=True)
-
-
-async def get_conversation_round(sender_id):
-    print("Entering into get_conversation_round")
-    print("--------------------------------")
-    print(sender_id)
-    print("--------------------------------")
-    session_collection = get_session_collection()
-    state = await session_collection.find_one({"sender_id": sender_id})
-    if state:
-        return state.get("conversation_round", 0)
-    print("Conversation round not found")
-    print("--------------------------------")
-    print(0)
-    print("--------------------------------")
-    return 0
-
-
-async def increment_conversation_round(sender_id):
-    print("Entering into increment_conversation_round")
-    print("--------------------------------")
-    print(sender_id)
-    print("--------------------------------")
-    session_collection = get_session_collection()
-    result = await session_collection.find_one_and_update(
-        {"sender_id": sender_id},
-        {"$inc": {"conversation_round": 1}},
-        upsert=True,
-    )
-    print("Conversation round incremented")
-    print("--------------------------------")
-    print(result.get("conversation_round", 0) + 1 if result else 1)
-    print("--------------------------------")
-    return result.get("conversation_round", 0) + 1 if result else 1
-
-
-async def is_duplicate_message(redis, message_id: str, ttl=60):
-    key = f"whatsapp:dedup:{message_id}"
-    return not await redis.set(key, "1", ex=ttl, nx=True)
-
-
-async def rate_limit(redis, sender_id, limit=10, window=60):
-    key = f"rate:{sender_id}"
-    count = await redis.incr(key)
-    if count == 1:
-        await redis.expire(key, window)
-    return count <= limit
+whatsapp_checkpoint_registry = CheckpointRegistry(
+    "whatsapp",
+    get_redis,
+    ttl_seconds=config.CHECKPOINT_REGISTRY_TTL_SECONDS,
+)
 
 
 async def cleanup_old_checkpoints(thread_id: str, keep_round: int):
@@ -58,9 +15,7 @@ async def cleanup_old_checkpoints(thread_id: str, keep_round: int):
         f"{Colors.GREEN}Cleaning up old checkpoints for {thread_id} with keep_round {keep_round}"
     )
     print("--------------------------------")
-    pattern = f"langgraph:checkpoint:{thread_id}-r*"
-    keys = await redis_client.keys(pattern)
-
-    for key in keys:
-        if not key.endswith(f"-r{keep_round}"):
-            await redis_client.delete(key)
+    keep = f"{thread_id}-r{keep_round}"
+    stale = [t for t in await whatsapp_checkpoint_registry.threads(thread_id) if t != keep]
+    removed = await whatsapp_checkpoint_registry.delete_threads(stale)
+    print(f"{Colors.CYAN}Deleted checkpoints of {removed} stale threads")
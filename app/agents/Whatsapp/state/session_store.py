@@ -0,0 +1,258 @@
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from pymongo import ReturnDocument
+from app.core.exception import InternalServerErrorException
+from app.core.redis_manager import get_redis
+from app.db.mongo_session import SESSION_EXPIRY_SECONDS, get_session_collection
+from app.utils.printcolors import Colors
+
+CACHE_PREFIX = "whatsapp:session"
+
+# Fields every fresh onboarding session starts with. `conversation_round` is
+# carried over (and bumped on rollover) rather than reset.
+DEFAULT_SESSION_FIELDS: Dict[str, Any] = {
+    "platform": [],
+    "category": [],
+    "country": [],
+    "limit": None,
+    "followers": [],
+    "user_message": None,
+    "reply": None,
+    "name": None,
+    "done": False,
+    "reply_sent": False,
+    "campaign_id": None,
+    "campaign_created": False,
+    "ready_for_campaign": False,
+    "acknowledged": False,
+}
+
+# Storage-only fields that never round-trip through the agent state.
+_INTERNAL_FIELDS = ("_id", "last_active_at", "session_transition")
+
+# Write through only when the cached hash is complete; a partial hash would be
+# mistaken for the full session on the next load.
+_UPDATE_IF_CACHED_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call('hset', KEYS[1], unpack(ARGV, 2))
+    redis.call('expire', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+def _fresh_session(sender_id: str, conversation_round) -> Dict[str, Any]:
+    return {
+        **DEFAULT_SESSION_FIELDS,
+        "_id": "$_id",
+        "sender_id": sender_id,
+        "conversation_round": conversation_round,
+        "session_transition": "$session_transition",
+    }
+
+
+def _transition_for(state: Optional[Dict[str, Any]], now: float) -> Optional[str]:
+    """Python mirror of the `$switch` in `load`, used for cache hits."""
+    if not state or now - (state.get("last_active") or 0) > SESSION_EXPIRY_SECONDS:
+        return "expired"
+    if state.get("done") and state.get("acknowledged"):
+        return "rollover"
+    return None
+
+
+class WhatsAppSessionStore:
+    """
+    Onboarding session state keyed by WhatsApp sender id.
+
+    `load` performs load-or-create, expiry, `last_active` touch and round
+    rollover as a single pipeline `find_one_and_update`. Sessions are cached in
+    a Redis hash that is written through on every save, so a message whose
+    session is cached and needs no transition costs no Mongo read at all.
+    """
+
+    def __init__(self, ttl_seconds: int = SESSION_EXPIRY_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _cache_key(sender_id: str) -> str:
+        return f"{CACHE_PREFIX}:{sender_id}"
+
+    @staticmethod
+    def _clean(doc: Dict[str, Any]) -> Dict[str, Any]:
+        for field in _INTERNAL_FIELDS:
+            doc.pop(field, None)
+        return doc
+
+    async def _read_cache(self, sender_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            cached = await get_redis().hgetall(self._cache_key(sender_id))
+        except Exception as e:
+            print(f"{Colors.RED}[WhatsAppSessionStore] Cache read failed: {e}")
+            return None
+        if not cached:
+            return None
+        return {field: json.loads(value) for field, value in cached.items()}
+
+    async def _write_cache(self, sender_id: str, state: Dict[str, Any]) -> None:
+        key = self._cache_key(sender_id)
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(
+                    key,
+                    mapping={
+                        field: json.dumps(value, default=str)
+                        for field, value in state.items()
+                    },
+                )
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            print(f"{Colors.RED}[WhatsAppSessionStore] Cache write failed: {e}")
+
+    async def _merge_cache(self, sender_id: str, fields: Dict[str, Any]) -> None:
+        args = []
+        for field, value in fields.items():
+            args.extend((field, json.dumps(value, default=str)))
+        if not args:
+            return
+        try:
+            await get_redis().eval(
+                _UPDATE_IF_CACHED_SCRIPT,
+                1,
+                self._cache_key(sender_id),
+                self.ttl_seconds,
+                *args,
+            )
+        except Exception as e:
+            print(f"{Colors.RED}[WhatsAppSessionStore] Cache merge failed: {e}")
+
+    async def load(self, sender_id: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Return `(state, transition)` for `sender_id`.
+
+        `transition` is "expired" when a new session was started (first contact
+        or inactivity), "rollover" when a finished, acknowledged session was
+        reset and `conversation_round` advanced, and None otherwise.
+        """
+        now = time.time()
+        cached = await self._read_cache(sender_id)
+        if cached is not None and _transition_for(cached, now) is None:
+            return cached, None
+
+        try:
+            doc = await get_session_collection().find_one_and_update(
+                {"sender_id": sender_id},
+                [
+                    {
+                        "$set": {
+                            "session_transition": {
+                                "$switch": {
+                                    "branches": [
+                                        {
+                                            "case": {
+                                                "$lt": [
+                                                    {"$ifNull": ["$last_active", 0]},
+                                                    now - self.ttl_seconds,
+                                                ]
+                                            },
+                                            "then": "expired",
+                                        },
+                                        {
+                                            "case": {
+                                                "$and": [
+                                                    {"$eq": ["$done", True]},
+                                                    {"$eq": ["$acknowledged", True]},
+                                                ]
+                                            },
+                                            "then": "rollover",
+                                        },
+                                    ],
+                                    "default": None,
+                                }
+                            }
+                        }
+                    },
+                    {
+                        "$replaceWith": {
+                            "$cond": [
+                                {"$eq": ["$session_transition", None]},
+                                "$$ROOT",
+                                _fresh_session(
+                                    sender_id,
+                                    {
+                                        "$add": [
+                                            {"$ifNull": ["$conversation_round", 0]},
+                                            {
+                                                "$cond": [
+                                                    {"$eq": ["$session_transition", "rollover"]},
+                                                    1,
+                                                    0,
+                                                ]
+                                            },
+                                        ]
+                                    },
+                                ),
+                            ]
+                        }
+                    },
+                    {"$set": {"last_active": now, "last_active_at": "$$NOW"}},
+                ],
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            print(f"{Colors.RED}[WhatsAppSessionStore] Error loading session: {e}")
+            raise InternalServerErrorException(
+                message=f"Error getting user state: {e}"
+            ) from e
+
+        transition = doc.get("session_transition")
+        state = self._clean(doc)
+        await self._write_cache(sender_id, state)
+        return state, transition
+
+    async def save(self, sender_id: str, new_data: Dict[str, Any]) -> None:
+        """Persist the agent's final state for `sender_id` and refresh the cache."""
+        fields = self._clean(dict(new_data))
+        fields["last_active"] = time.time()
+        await get_session_collection().update_one(
+            {"sender_id": sender_id},
+            {"$set": {**fields, "last_active_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        await self._merge_cache(sender_id, fields)
+
+    async def reset(self, sender_id: str, next_round: bool = False) -> Dict[str, Any]:
+        """Start a fresh session, optionally advancing `conversation_round`."""
+        round_expr = {"$ifNull": ["$conversation_round", 0]}
+        if next_round:
+            round_expr = {"$add": [round_expr, 1]}
+        doc = await get_session_collection().find_one_and_update(
+            {"sender_id": sender_id},
+            [
+                {"$set": {"session_transition": None}},
+                {"$replaceWith": _fresh_session(sender_id, round_expr)},
+                {"$set": {"last_active": time.time(), "last_active_at": "$$NOW"}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        state = self._clean(doc)
+        await self._write_cache(sender_id, state)
+        return state
+
+    async def delete(self, sender_id: str) -> int:
+        """Delete the session and its cached hash; returns the Mongo deleted count."""
+        result = await get_session_collection().delete_one({"sender_id": sender_id})
+        try:
+            await get_redis().delete(self._cache_key(sender_id))
+        except Exception as e:
+            print(f"{Colors.RED}[WhatsAppSessionStore] Cache delete failed: {e}")
+        return result.deleted_count
+
+
+session_store = WhatsAppSessionStore()
@@ -1,24 +1,45 @@
 import json
-from agents import Agent, Runner
+import random
+from typing import Optional
+from agents import Agent
+from app.core.background_tasks import spawn
+from app.services.llm_cache import cached_run
+from app.config.credentials_config import config
 from app.Schemas.whatsapp.negotiation_schema import WhatsappNegotiationState
 from app.Schemas.instagram.negotiation_schema import AnalyzeMessageOutput, NextAction
 from app.Guardails.input_guardrails import WhatsappInputGuardrail
+from app.agents.WhatsappNegotiation.classifier.intent_log import record_intent
+from app.agents.WhatsappNegotiation.classifier.local_intent import (
+    get_local_intent_classifier,
+    last_ai_message,
+)
 from app.utils.prompts import ANALYZE_INFLUENCER_WHATSAPP_PROMPT
+from app.utils.context_budget import build_context
 from app.utils.message_context import get_history_list
 
 
-async def intentclassifier(state: WhatsappNegotiationState, checkpointer=None):
-    user_message = state.get("user_message", "")
-    history = get_history_list(state)
-
+async def classify_with_llm(
+    user_message: str,
+    history: list,
+    summary: Optional[str] = None,
+    summary_until: Optional[str] = None,
+) -> dict:
     # Pass a JSON string so the agents library (which may treat input as list) does not fail.
     # The prompt tells the model to parse this JSON for "history" and "latest_user_message".
-    analyzer_input_str = json.dumps(
-        {"history": history, "latest_user_message": user_message},
-        default=str,
-    )
+    # Only the fields the prompt reads are sent, so repeated exchanges hit the LLM cache.
+    context = build_context(history, summary, summary_until)
+    payload = {
+        "history": [
+            {"sender_type": m.get("sender_type"), "message": m.get("message")}
+            for m in context.messages
+        ],
+        "latest_user_message": user_message,
+    }
+    if context.summary:
+        payload["earlier_conversation_summary"] = context.summary
+    analyzer_input_str = json.dumps(payload, default=str)
 
-    result = await Runner.run(
+    result = await cached_run(
         Agent(
             name="analyze_whatsapp_message",
             instructions=ANALYZE_INFLUENCER_WHATSAPP_PROMPT,
@@ -27,22 +48,72 @@ async def intentclassifier(state: WhatsappNegotiationState, checkpointer=None):
         ),
         input=analyzer_input_str,
     )
-    analysis: AnalyzeMessageOutput = result.final_output or {}
+    analysis = dict(result.final_output or {})
+    analysis["classifier"] = "llm"
+    return analysis
+
+
+async def _shadow_label(
+    thread_id, user_message, history, summary, previous_ai, local, offered_price
+) -> None:
+    try:
+        analysis = await classify_with_llm(user_message, history, *summary)
+        await record_intent(
+            thread_id, user_message, previous_ai, analysis, local=local, offered_price=offered_price
+        )
+    except Exception as e:
+        print(f"[intentclassifier] Shadow labelling failed: {e}")
+
+
+async def intentclassifier(state: WhatsappNegotiationState, checkpointer=None):
+    user_message = state.get("user_message", "")
+    history = get_history_list(state)
+    thread_id = state.get("thread_id")
+    previous_ai = last_ai_message(history)
+    summary = (state.get("history_summary"), state.get("history_summary_until"))
+    offered_price = state.get("last_offered_price")
+
+    # Short, formulaic replies ("ok deal", "no thanks", "500") are classified
+    # locally; anything the local tiers are unsure about goes to the LLM. The
+    # intent log is written in the background so it never delays the reply.
+    local = get_local_intent_classifier().classify(user_message, history, offered_price)
+    if local and local["confidence"] >= config.NEGOTIATION_INTENT_CONFIDENCE_THRESHOLD:
+        analysis = local
+        if random.random() < config.NEGOTIATION_INTENT_SHADOW_RATE:
+            spawn(
+                _shadow_label(
+                    thread_id, user_message, history, summary, previous_ai, local, offered_price
+                )
+            )
+        else:
+            spawn(
+                record_intent(
+                    thread_id, user_message, previous_ai, analysis, offered_price=offered_price
+                )
+            )
+    else:
+        analysis = await classify_with_llm(user_message, history, *summary)
+        spawn(
+            record_intent(
+                thread_id, user_message, previous_ai, analysis, local=local, offered_price=offered_price
+            )
+        )
     intent = analysis.get("intent", "unclear")
 
-    # Persist full analysis
-    state["analysis"] = analysis
-    state["intent"] = intent
-    state["next_action"] = analysis.get(
-        "next_action", NextAction.GENERATE_CLARIFICATION
-    )
+    # Runs in parallel with the brief and pricing lookups, so only the keys
+    # this node owns are returned.
+    update = {
+        "analysis": analysis,
+        "intent": intent,
+        "next_action": analysis.get("next_action", NextAction.GENERATE_CLARIFICATION),
+    }
 
     # Capture influencer's offered rate (if any) into user_offer
     budget = analysis.get("budget_amount")
     if budget is not None:
         try:
-            state["user_offer"] = float(budget)
+            update["user_offer"] = float(budget)
         except (TypeError, ValueError):
             # Leave user_offer as-is if parsing fails
             pass
-    return state
+    return update
@@ -9,7 +9,7 @@ from app.utils.prompts import WHATSAPP_GENERATE_REPLY_RULES
 from app.utils.message_context import (
     get_history_list,
     set_history_list,
-    history_to_agent_messages,
+    state_to_agent_messages,
 )
 import json
 
@@ -45,7 +45,7 @@ async def generate_reply_node(state: WhatsappNegotiationState):
 
     # Ensure we always provide a non-empty input to the agent (API expects role/user or role/assistant).
     if history:
-        agent_input = history_to_agent_messages(history)
+        agent_input = state_to_agent_messages(state)
     else:
         agent_input = f"Influencer message: {user_message}"
 
@@ -11,7 +11,7 @@ from app.utils.prompts import WHATSAPP_CLOSE_CONVERSATION_INSTRUCTIONS
 from app.utils.message_context import (
     get_history_list,
     set_history_list,
-    history_to_agent_messages,
+    state_to_agent_messages,
 )
 
 
@@ -30,7 +30,7 @@ async def close_conversation_node(state: WhatsappNegotiationState):
                     GenerateReplyOutput, strict_json_schema=False
                 ),
             ),
-            input=history_to_agent_messages(history),
+            input=state_to_agent_messages(state),
         )
         ai_reply = result.final_output.get(
             "final_reply", "Thank you! Looking forward to working together."
@@ -11,7 +11,7 @@ from app.utils.prompts import WHATSAPP_NEGOTIATION_COMPLETE_INSTRUCTIONS
 from app.utils.message_context import (
     get_history_list,
     set_history_list,
-    history_to_agent_messages,
+    state_to_agent_messages,
 )
 from app.config.credentials_config import config
 
@@ -35,7 +35,7 @@ async def complete_negotiation_node(state: WhatsappNegotiationState):
                     GenerateReplyOutput, strict_json_schema=False
                 ),
             ),
-            input=history_to_agent_messages(history),
+            input=state_to_agent_messages(state),
         )
         ai_reply = result.final_output.get(
             "final_reply", "Thanks for your time! We'll follow up shortly."
@@ -11,7 +11,7 @@ from app.utils.prompts import WHATSAPP_CONFIRM_DETAILS_SUFFIX
 from app.utils.message_context import (
     get_history_list,
     set_history_list,
-    history_to_agent_messages,
+    state_to_agent_messages,
 )
 from app.config.credentials_config import config
 
@@ -39,7 +39,7 @@ async def confirm_details_node(state: WhatsappNegotiationState):
     )
 
     agent_input = (
-        history_to_agent_messages(history)
+        state_to_agent_messages(state)
         if history
         else f"Influencer asked about deliverables/timeline. Offered rate: {rate}"
     )
@@ -8,7 +8,7 @@ from app.utils.prompts import WHATSAPP_COUNTER_OFFER_RULES
 from app.utils.message_context import (
     get_history_list,
     set_history_list,
-    history_to_agent_messages,
+    state_to_agent_messages,
 )
 from app.db.connection import get_db
 from bson import ObjectId
@@ -80,7 +80,7 @@ async def counter_offer_node(state: WhatsappNegotiationState, checkpointer=None)
     history = get_history_list(state)
     set_history_list(state, history)
     if history:
-        agent_input = history_to_agent_messages(history)
+        agent_input = state_to_agent_messages(state)
     if not history or not agent_input:
         agent_input = (
             f"Brand is negotiating a collaboration rate with an influencer. "
@@ -13,11 +13,13 @@ async def fetch_campaign_brief_node(state: WhatsappNegotiationState):
 
     - If state already has `campaign_brief`, this node is a no-op.
     - If there's no campaign_id or no brief_id on the campaign, it safely returns.
+    - Runs in parallel with intent classification, so it only returns the
+      `campaign_brief` update.
     """
 
     # Skip if already present
     if state.get("campaign_brief") is not None:
-        return state
+        return {}
 
     try:
         db = get_db()
@@ -26,7 +28,7 @@ async def fetch_campaign_brief_node(state: WhatsappNegotiationState):
         if not influencer_id:
             # Keep a minimal warning so we know why brief was missing
             print("[fetch_campaign_brief_node] No influencer_id on state; cannot resolve campaign")
-            return state
+            return {}
 
         try:
             influencer_object_id = ObjectId(str(influencer_id))
@@ -34,7 +36,7 @@ async def fetch_campaign_brief_node(state: WhatsappNegotiationState):
             print(
                 f"[fetch_campaign_brief_node] Invalid influencer_id on state: {influencer_id}"
             )
-            return state
+            return {}
 
         campaign_influencers_collection = db.get_collection(
             config.MONGODB_ATLAS_COLLECTION_CAMPAIGNS
@@ -47,14 +49,14 @@ async def fetch_campaign_brief_node(state: WhatsappNegotiationState):
             print(
                 f"[fetch_campaign_brief_node] No campaign_influencer found for id={influencer_object_id}"
             )
-            return state
+            return {}
 
         campaign_id = influencer_doc.get("campaign_id")
         if not campaign_id:
             print(
                 "[fetch_campaign_brief_node] Influencer has no campaign_id; skipping brief fetch"
             )
-            return state
+            return {}
 
         try:
             campaign_object_id = (
@@ -66,7 +68,7 @@ async def fetch_campaign_brief_node(state: WhatsappNegotiationState):
             print(
                 f"[fetch_campaign_brief_node] Invalid campaign_id on influencer doc: {campaign_id}"
             )
-            return state
+            return {}
 
         # 2) Fetch campaign and its brief_id
         campaigns_collection = db.get_collection("campaigns")
@@ -78,28 +80,27 @@ async def fetch_campaign_brief_node(state: WhatsappNegotiationState):
             print(
                 f"[fetch_campaign_brief_node] No campaign found for id={campaign_object_id}"
             )
-            return state
+            return {}
 
         brief_id = campaign_doc.get("brief_id")
         if not brief_id:
             print(
                 "[fetch_campaign_brief_node] Campaign has no brief_id; skipping brief fetch"
             )
-            return state
+            return {}
         briefs_collection = db.get_collection(config.MONGODB_CAMPAIGN_BRIEF_GENERATION)
         brief_doc: Dict[str, Any] = await briefs_collection.find_one(
             {"_id": str(brief_id)}
         )
         if not brief_doc:
             print(f"[fetch_campaign_brief_node] No brief found for id={brief_id}")
-            return state
+            return {}
 
         # The actual brief content is stored under "response"
         brief_payload = brief_doc.get("response") or {}
-        state["campaign_brief"] = brief_payload
-        return state
+        return {"campaign_brief": brief_payload}
 
     except Exception as e:
         print(f"[fetch_campaign_brief_node] Failed to fetch brief: {e}")
-        return state
+        return {}
 
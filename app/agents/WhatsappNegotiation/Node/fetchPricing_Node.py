@@ -3,34 +3,61 @@ from app.db.connection import get_db
 from bson import ObjectId
 
 
-async def fetch_pricing_node(state: WhatsappNegotiationState, checkpointer=None):
-    thread_id = state.get("thread_id")
-    influencer_id = state.get("influencer_id")
-
-    if state.get("min_price") and state.get("max_price"):
-        return state
-
-    # Guard: influencer_id must be present
-    if not influencer_id:
-        print("[fetch_pricing_node] Missing influencer_id in state")
-        return state
-
+async def _load_pricing(influencer_id):
     db = get_db()
     collection = db.get_collection("campaign_influencers")
     influencer = await collection.find_one(
         {"_id": ObjectId(influencer_id)},
         {"min_price": 1, "max_price": 1, "campaign_id": 1},
     )
-
     if not influencer:
-        print(
-            f"[fetch_pricing_node] Influencer not found for _id={influencer_id}"
-        )
+        print(f"[fetch_pricing_node] Influencer not found for _id={influencer_id}")
+        return None
+    return {
+        "min_price": float(influencer.get("min_price", 0)),
+        "max_price": float(influencer.get("max_price", 0)),
+        "campaign_id": influencer.get("campaign_id"),
+    }
+
+
+async def prefetch_pricing_node(state: WhatsappNegotiationState):
+    """
+    Look up pricing while the intent is being classified.
+
+    The result is kept under `prefetched_pricing` and only copied onto the
+    state by `fetch_pricing_node` when routing needs it.
+    """
+    influencer_id = state.get("influencer_id")
+    if (state.get("min_price") and state.get("max_price")) or not influencer_id:
+        return {"prefetched_pricing": None}
+    try:
+        return {"prefetched_pricing": await _load_pricing(influencer_id)}
+    except Exception as e:
+        print(f"[prefetch_pricing_node] Failed: {e}")
+        return {"prefetched_pricing": None}
+
+
+async def fetch_pricing_node(state: WhatsappNegotiationState, checkpointer=None):
+    thread_id = state.get("thread_id")
+    influencer_id = state.get("influencer_id")
+    pricing = state.get("prefetched_pricing")
+    state["prefetched_pricing"] = None
+
+    if state.get("min_price") and state.get("max_price"):
         return state
 
-    state["min_price"] = float(influencer.get("min_price", 0))
-    state["max_price"] = float(influencer.get("max_price", 0))
-    state["campaign_id"] = influencer.get("campaign_id")
+    if pricing is None:
+        # Guard: influencer_id must be present
+        if not influencer_id:
+            print("[fetch_pricing_node] Missing influencer_id in state")
+            return state
+        pricing = await _load_pricing(influencer_id)
+        if pricing is None:
+            return state
+
+    state["min_price"] = pricing["min_price"]
+    state["max_price"] = pricing["max_price"]
+    state["campaign_id"] = pricing["campaign_id"]
 
     if checkpointer:
         await checkpointer.save_checkpoint(
@@ -1,80 +1,67 @@
+from langchain_core.runnables import RunnableConfig
 from app.Schemas.instagram.negotiation_schema import NextAction
 from app.Schemas.whatsapp.negotiation_schema import WhatsappNegotiationState
-from app.config.credentials_config import config
-import httpx
+from app.services.meta_graph_client import get_meta_graph_client
+from app.services.whatsapp.event_queue import progress_from_config
 from app.services.whatsapp.save_message import save_conversation_message
 from app.utils.Enums.user_enum import SenderType
 
 
-async def send_whatsapp_reply_node(state: WhatsappNegotiationState):
-    final_reply = state.get("final_reply")
-    thread_id = state.get("thread_id")
-    if not final_reply or not thread_id:
-        print("[send_whatsapp_reply_node] Missing final_reply or thread_id")
-        return state
-    headers = {
-        "Authorization": f"Bearer {config.META_WHATSAPP_ACCESSSTOKEN}",
-        "Content-Type": "application/json",
-    }
+async def _send_reply(state: WhatsappNegotiationState, final_reply: str) -> str:
+    thread_id = state["thread_id"]
+    client = get_meta_graph_client()
+    await client.send_text(thread_id, final_reply)
 
-    base_url = "https://graph.facebook.com/v22.0/967002123161751/messages"
+    await save_conversation_message(
+        thread_id=thread_id,
+        username="AI Negotiator",
+        sender=SenderType.AI.value,
+        message=final_reply,
+    )
 
-    text_payload = {
-        "messaging_product": "whatsapp",
-        "to": thread_id,
-        "type": "text",
-        "text": {"body": final_reply},
-    }
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            text_response = await client.post(
-                base_url,
-                headers=headers,
-                json=text_payload,
-            )
+    # If we have a brief PDF uploaded to Meta, and this is the final
+    # CLOSE_CONVERSATION accept step, send it as a one-shot document message.
+    brief_media_id = state.get("brief_media_id")
+    if brief_media_id and state.get("next_action") == NextAction.CLOSE_CONVERSATION:
+        filename = state.get("brief_media_filename") or "campaign_brief.pdf"
+        await client.send_document(
+            thread_id,
+            media_id=brief_media_id,
+            filename=filename,
+            caption="Campaign brief",
+        )
 
+        # Also log and broadcast the S3 URL for the brief (if present on state)
+        s3_url = state.get("brief_s3_url")
+        if s3_url:
             await save_conversation_message(
-                thread_id=state["thread_id"],
+                thread_id=thread_id,
                 username="AI Negotiator",
                 sender=SenderType.AI.value,
-                message=final_reply,
+                message=s3_url,
             )
+    return final_reply
 
-            # If we have a brief PDF uploaded to Meta, and this is the final
-            # CLOSE_CONVERSATION accept step, send it as a one-shot document message.
-            brief_media_id = state.get("brief_media_id")
-            if brief_media_id and state.get("next_action") == NextAction.CLOSE_CONVERSATION:
-                filename = state.get("brief_media_filename") or "campaign_brief.pdf"
-                document_payload = {
-                    "messaging_product": "whatsapp",
-                    "to": thread_id,
-                    "type": "document",
-                    "document": {
-                        "id": brief_media_id,
-                        "filename": filename,
-                        "caption": "Campaign brief",
-                    },
-                }
 
-                await client.post(
-                    base_url,
-                    headers=headers,
-                    json=document_payload,
-                )
-
-                # Also log and broadcast the S3 URL for the brief (if present on state)
-                s3_url = state.get("brief_s3_url")
-                if s3_url:
-                    await save_conversation_message(
-                        thread_id=state["thread_id"],
-                        username="AI Negotiator",
-                        sender=SenderType.AI.value,
-                        message=s3_url,
-                    )
+async def send_whatsapp_reply_node(
+    state: WhatsappNegotiationState, config: RunnableConfig = None
+):
+    final_reply = state.get("final_reply")
+    thread_id = state.get("thread_id")
+    if not final_reply or not thread_id:
+        print("[send_whatsapp_reply_node] Missing final_reply or thread_id")
+        return state
+    try:
+        # One step of the queued event: a retried turn reuses the reply that
+        # was already sent (and saved) instead of sending a second one.
+        state["final_reply"] = await progress_from_config(config).step(
+            "send_reply", lambda: _send_reply(state, final_reply)
+        )
 
-                # Make this one-shot so we don't resend the PDF on future replies.
-                state.pop("brief_media_id", None)
-                state.pop("brief_media_filename", None)
+        # Make this one-shot so we don't resend the PDF on future replies.
+        if state.get("brief_media_id") and state.get("next_action") == NextAction.CLOSE_CONVERSATION:
+            state.pop("brief_media_id", None)
+            state.pop("brief_media_filename", None)
 
     except Exception as e:
         print(
@@ -0,0 +1,128 @@
+"""
+Offline evaluation of the local negotiation intent classifier.
+
+Replays LLM-labelled messages (from the intent log, or a JSONL export with
+`message`, `previous_ai`, `intent` and optionally `budget_amount` per line)
+through the local tiers and reports, per confidence threshold, how many
+messages would skip the LLM and how often the local answer agrees with it.
+
+    python -m app.agents.WhatsappNegotiation.classifier.evaluate
+    python -m app.agents.WhatsappNegotiation.classifier.evaluate --file export.jsonl
+    python -m app.agents.WhatsappNegotiation.classifier.evaluate --train intent_model.json
+
+With `--train`, model weights are fitted on 80% of the messages, written to
+the given path and the report covers the remaining 20%.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+from typing import Dict, List, Optional
+from app.agents.WhatsappNegotiation.classifier.local_intent import (
+    IntentModel,
+    LocalIntentClassifier,
+    extract_features,
+)
+from app.config.credentials_config import config
+
+THRESHOLDS = (0.6, 0.7, 0.8, 0.85, 0.9, 0.95)
+
+
+def _agrees(predicted: dict, record: dict) -> bool:
+    if predicted["intent"] != record.get("intent"):
+        return False
+    expected = record.get("budget_amount")
+    if expected is None or predicted.get("budget_amount") is None:
+        return expected == predicted.get("budget_amount")
+    return abs(float(expected) - float(predicted["budget_amount"])) < 0.01
+
+
+def evaluate(
+    records: List[dict], classifier: LocalIntentClassifier
+) -> Dict[str, object]:
+    predictions = [
+        classifier.classify(
+            r.get("message", ""),
+            [{"sender_type": "AI", "message": r.get("previous_ai") or ""}],
+            r.get("offered_price"),
+        )
+        for r in records
+    ]
+    report: Dict[str, object] = {"messages": len(records), "thresholds": {}}
+    for threshold in THRESHOLDS:
+        covered = [
+            (p, r)
+            for p, r in zip(predictions, records)
+            if p is not None and p["confidence"] >= threshold
+        ]
+        agreed = sum(1 for p, r in covered if _agrees(p, r))
+        report["thresholds"][threshold] = {
+            "local_share": round(len(covered) / len(records), 3) if records else 0.0,
+            "agreement": round(agreed / len(covered), 3) if covered else None,
+        }
+
+    threshold = config.NEGOTIATION_INTENT_CONFIDENCE_THRESHOLD
+    confusion = Counter(
+        f"{r.get('intent')} -> {p['intent']}"
+        for p, r in zip(predictions, records)
+        if p is not None and p["confidence"] >= threshold and not _agrees(p, r)
+    )
+    report["disagreements_at_threshold"] = dict(confusion.most_common())
+    return report
+
+
+def _read_jsonl(path: str) -> List[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def _read_log(limit: int) -> List[dict]:
+    from app.agents.WhatsappNegotiation.classifier.intent_log import (
+        load_labelled_messages,
+    )
+    from app.db.connection import close, connect
+
+    await connect()
+    try:
+        return await load_labelled_messages(limit)
+    finally:
+        await close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--file", help="JSONL export instead of the intent log")
+    parser.add_argument("--limit", type=int, default=0, help="newest N log entries")
+    parser.add_argument("--train", metavar="PATH", help="fit and save model weights")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    records = _read_jsonl(args.file) if args.file else asyncio.run(_read_log(args.limit))
+    records = [r for r in records if r.get("message") and r.get("intent")]
+    if not records:
+        print("No labelled messages found.")
+        return
+
+    model = IntentModel.load(config.NEGOTIATION_INTENT_MODEL_PATH)
+    if args.train:
+        random.Random(args.seed).shuffle(records)
+        split = int(len(records) * 0.8)
+        train, records = records[:split], records[split:]
+        model = IntentModel.fit(
+            (extract_features(r["message"], r.get("previous_ai") or ""), r["intent"])
+            for r in train
+        )
+        model.save(args.train)
+        print(f"Trained on {len(train)} messages, weights written to {args.train}")
+
+    print("Rules only:")
+    print(json.dumps(evaluate(records, LocalIntentClassifier()), indent=2))
+    if model is not None:
+        print("Rules + model:")
+        print(json.dumps(evaluate(records, LocalIntentClassifier(model)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.config.credentials_config import config
+from app.db.connection import get_db
+from app.utils.printcolors import Colors
+
+
+async def record_intent(
+    thread_id: str,
+    message: str,
+    previous_ai: str,
+    analysis: dict,
+    local: Optional[dict] = None,
+    offered_price: Optional[float] = None,
+) -> None:
+    """
+    Log one classified negotiation message.
+
+    LLM classifications double as labels for the offline evaluation; `local`
+    holds what the local tiers said about the same message, if anything.
+    Callers on the reply path run this with `spawn`, never awaiting the write.
+    """
+    doc = {
+        "thread_id": thread_id,
+        "message": message,
+        "previous_ai": previous_ai,
+        "offered_price": offered_price,
+        "intent": analysis.get("intent"),
+        "next_action": analysis.get("next_action"),
+        "budget_amount": analysis.get("budget_amount"),
+        "classifier": analysis.get("classifier"),
+        "confidence": analysis.get("confidence"),
+        "created_at": datetime.now(timezone.utc),
+    }
+    if local is not None:
+        doc["local"] = {
+            "intent": local.get("intent"),
+            "classifier": local.get("classifier"),
+            "confidence": local.get("confidence"),
+        }
+    try:
+        await get_db().get_collection(config.MONGODB_NEGOTIATION_INTENT_LOG).insert_one(doc)
+    except Exception as e:
+        print(f"{Colors.RED}[record_intent] Failed: {e}")
+
+
+async def load_labelled_messages(limit: int = 0) -> List[dict]:
+    """LLM-labelled messages, newest first."""
+    cursor = (
+        get_db()
+        .get_collection(config.MONGODB_NEGOTIATION_INTENT_LOG)
+        .find(
+            {"classifier": "llm"},
+            {
+                "_id": 0,
+                "message": 1,
+                "previous_ai": 1,
+                "offered_price": 1,
+                "intent": 1,
+                "budget_amount": 1,
+            },
+        )
+        .sort("created_at", -1)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=None)
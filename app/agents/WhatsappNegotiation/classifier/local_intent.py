@@ -0,0 +1,381 @@
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config.credentials_config import config
+from app.Schemas.instagram.negotiation_schema import ClassifiedMessageOutput, NextAction
+from app.Schemas.whatsapp.negotiation_schema import WhatsappMessageIntent
+from app.utils.printcolors import Colors
+
+# Longer messages usually carry deliverables, timelines or conditions that only
+# the LLM extracts, so they always go to the LLM.
+LOCAL_MAX_WORDS = 12
+
+NEXT_ACTION_BY_INTENT = {
+    WhatsappMessageIntent.INTEREST: NextAction.ASK_RATE,
+    WhatsappMessageIntent.NEGOTIATE: NextAction.ESCALATE_NEGOTIATION,
+    WhatsappMessageIntent.REJECT: NextAction.REJECT_NEGOTIATION,
+    WhatsappMessageIntent.ACCEPT: NextAction.ACCEPT_NEGOTIATION,
+    WhatsappMessageIntent.QUESTION: NextAction.ANSWER_QUESTION,
+    WhatsappMessageIntent.UNCLEAR: NextAction.GENERATE_CLARIFICATION,
+}
+
+_CURRENCIES = {
+    "$": "USD",
+    "usd": "USD",
+    "dollars": "USD",
+    "aed": "AED",
+    "dh": "AED",
+    "dhs": "AED",
+    "dirham": "AED",
+    "dirhams": "AED",
+    "pkr": "PKR",
+    "rs": "PKR",
+    "inr": "INR",
+    "€": "EUR",
+    "eur": "EUR",
+    "£": "GBP",
+    "gbp": "GBP",
+}
+_CURRENCY = r"(\$|€|£|usd|dollars|aed|dhs?|dirhams?|pkr|rs|inr|eur|gbp)"
+_BARE_AMOUNT_RE = re.compile(
+    rf"^(?:{_CURRENCY}\.?\s*)?(\d[\d,]*(?:\.\d+)?)\s*(k)?\s*(?:{_CURRENCY})?$", re.I
+)
+_ANY_AMOUNT_RE = re.compile(r"(?:[$€£]\s*)?\d[\d,]*(?:\.\d+)?\s*k?\b", re.I)
+_PRICE_WORDS_RE = re.compile(
+    r"\b(offer|budget|rate|price|pay|charge|fee|amount|aed|usd|dhs?)\b|[$€£]", re.I
+)
+_NEGATION_RE = re.compile(r"\b(no|not|dont|cant|cannot|never|wont)\b")
+_WORD_RE = re.compile(r"[a-z0-9$€£]+")
+
+_ACCEPT_PHRASES = {
+    "ok deal",
+    "okay deal",
+    "deal",
+    "done deal",
+    "done",
+    "agreed",
+    "i agree",
+    "agree",
+    "that works",
+    "works for me",
+    "sounds good",
+    "lets do it",
+    "lets go",
+    "confirmed",
+    "i accept",
+    "accepted",
+    "fine by me",
+}
+_AFFIRM_PHRASES = {
+    "ok",
+    "okay",
+    "k",
+    "yes",
+    "yeah",
+    "yep",
+    "yup",
+    "sure",
+    "ok sure",
+    "yes sure",
+    "fine",
+    "alright",
+    "great",
+    "perfect",
+    "yes please",
+}
+_INTEREST_PHRASES = {
+    "interested",
+    "i am interested",
+    "im interested",
+    "yes interested",
+    "yes i am interested",
+    "yes im interested",
+    "very interested",
+    "count me in",
+    "im in",
+    "tell me more",
+    "sounds interesting",
+}
+_REJECT_PHRASES = {
+    "no thanks",
+    "no thank you",
+    "not interested",
+    "im not interested",
+    "i am not interested",
+    "not for me",
+    "i will pass",
+    "ill pass",
+    "pass",
+}
+
+
+def normalize_message(text: str) -> str:
+    text = (text or "").lower().replace("'", "").replace("’", "")
+    return " ".join(_WORD_RE.findall(text))
+
+
+def last_ai_message(history: List[dict]) -> str:
+    for message in reversed(history or []):
+        if isinstance(message, dict) and (message.get("sender_type") or "").upper() == "AI":
+            return message.get("message") or ""
+    return ""
+
+
+def parse_amount(text: str) -> Optional[Tuple[float, Optional[str]]]:
+    """`(amount, currency)` if `text` is nothing but a price, e.g. "500", "$1.2k", "800 AED"."""
+    match = _BARE_AMOUNT_RE.match((text or "").strip().rstrip(".!"))
+    if not match:
+        return None
+    prefix, number, thousands, suffix = match.groups()
+    try:
+        amount = float(number.replace(",", ""))
+    except ValueError:
+        return None
+    if thousands:
+        amount *= 1000
+    currency = _CURRENCIES.get((prefix or suffix or "").lower())
+    return amount, currency
+
+
+def build_analysis(
+    intent: WhatsappMessageIntent,
+    classifier: str,
+    confidence: float,
+    budget_amount: Optional[float] = None,
+    currency: Optional[str] = None,
+) -> ClassifiedMessageOutput:
+    return {
+        "intent": intent.value,
+        "pricing_mentioned": budget_amount is not None,
+        "budget_amount": budget_amount,
+        "currency": currency,
+        "deliverables_mentioned": False,
+        "deliverables": None,
+        "timeline_mentioned": False,
+        "timeline": None,
+        "platforms_mentioned": False,
+        "platforms": None,
+        "usage_rights_mentioned": False,
+        "exclusivity_mentioned": False,
+        "missing_required_details": [],
+        "next_action": NEXT_ACTION_BY_INTENT[intent].value,
+        "classifier": classifier,
+        "confidence": round(confidence, 3),
+    }
+
+
+def _context(previous_ai: str) -> Tuple[bool, bool]:
+    """(brand talked about money, brand quoted an amount) in its last message."""
+    money = bool(_PRICE_WORDS_RE.search(previous_ai or ""))
+    return money, money and bool(_ANY_AMOUNT_RE.search(previous_ai or ""))
+
+
+def is_offer(previous_ai: str, offered_price: Optional[float]) -> bool:
+    """
+    Whether the brand's last message put `offered_price` on the table.
+
+    A price word plus any number is not enough (it may be a follower count or
+    a date); the message has to quote the price the negotiation last offered.
+    """
+    if offered_price is None or not _PRICE_WORDS_RE.search(previous_ai or ""):
+        return False
+    for match in _ANY_AMOUNT_RE.finditer(previous_ai or ""):
+        amount = parse_amount(match.group())
+        if amount is not None and abs(amount[0] - float(offered_price)) < 0.01:
+            return True
+    return False
+
+
+def classify_by_rules(
+    message: str, previous_ai: str, offered_price: Optional[float] = None
+) -> Optional[ClassifiedMessageOutput]:
+    """
+    Exact-phrase and bare-price rules for the replies the LLM is not needed for.
+
+    The brand's last message decides between readings: "ok" after an offer
+    accepts it, "ok" after an introduction only shows interest, and a bare
+    number is only read as a rate when the brand was talking money. Only a
+    message quoting `offered_price` counts as an offer to accept.
+    """
+    normalized = normalize_message(message)
+    if not normalized:
+        return None
+    money, _ = _context(previous_ai)
+    offer = is_offer(previous_ai, offered_price)
+
+    amount = parse_amount(message)
+    if amount is not None:
+        return build_analysis(
+            WhatsappMessageIntent.NEGOTIATE,
+            "rules",
+            0.95 if money else 0.7,
+            budget_amount=amount[0],
+            currency=amount[1],
+        )
+    if normalized in _INTEREST_PHRASES:
+        return build_analysis(WhatsappMessageIntent.INTEREST, "rules", 0.95)
+    if normalized in _ACCEPT_PHRASES:
+        return build_analysis(WhatsappMessageIntent.ACCEPT, "rules", 0.95 if offer else 0.75)
+    if normalized in _AFFIRM_PHRASES:
+        if offer:
+            return build_analysis(WhatsappMessageIntent.ACCEPT, "rules", 0.9)
+        if money:
+            # "ok" to "what is your rate?" says nothing about the rate.
+            return None
+        return build_analysis(WhatsappMessageIntent.INTEREST, "rules", 0.88)
+    if normalized in _REJECT_PHRASES:
+        return build_analysis(WhatsappMessageIntent.REJECT, "rules", 0.92)
+    if normalized == "no":
+        # A bare "no" to a price is usually pushback, not a refusal to work together.
+        if money:
+            return build_analysis(WhatsappMessageIntent.NEGOTIATE, "rules", 0.6)
+        return build_analysis(WhatsappMessageIntent.REJECT, "rules", 0.8)
+    return None
+
+
+def extract_features(message: str, previous_ai: str) -> Dict[str, float]:
+    words = normalize_message(message).split()
+    features: Dict[str, float] = {"bias": 1.0}
+    for word in words:
+        features[f"w:{word}"] = 1.0
+    for first, second in zip(words, words[1:]):
+        features[f"b:{first}_{second}"] = 1.0
+    if _ANY_AMOUNT_RE.search(message or ""):
+        features["has_amount"] = 1.0
+    if "?" in (message or ""):
+        features["has_question"] = 1.0
+    if _NEGATION_RE.search(" ".join(words)):
+        features["has_negation"] = 1.0
+    money, offer = _context(previous_ai)
+    if money:
+        features["ai_money"] = 1.0
+    if offer:
+        features["ai_offer"] = 1.0
+    if "?" in (previous_ai or ""):
+        features["ai_asked"] = 1.0
+    features["short"] = 1.0 if len(words) <= 3 else 0.0
+    return features
+
+
+class IntentModel:
+    """
+    Multinomial logistic regression over `extract_features`, stored as JSON.
+
+    Weights are fitted offline by `app.agents.WhatsappNegotiation.classifier.evaluate`
+    from LLM-labelled messages; at runtime scoring is a few dict lookups.
+    """
+
+    def __init__(self, labels: List[str], weights: Dict[str, Dict[str, float]]):
+        self.labels = labels
+        self.weights = weights
+
+    def probabilities(self, features: Dict[str, float]) -> Dict[str, float]:
+        scores = {
+            label: sum(self.weights.get(label, {}).get(f, 0.0) * v for f, v in features.items())
+            for label in self.labels
+        }
+        top = max(scores.values())
+        exp = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(exp.values())
+        return {label: value / total for label, value in exp.items()}
+
+    def predict(self, features: Dict[str, float]) -> Tuple[str, float]:
+        probabilities = self.probabilities(features)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+    @classmethod
+    def fit(
+        cls,
+        examples: Iterable[Tuple[Dict[str, float], str]],
+        epochs: int = 30,
+        learning_rate: float = 0.1,
+        l2: float = 1e-4,
+    ) -> "IntentModel":
+        examples = list(examples)
+        labels = sorted({label for _, label in examples})
+        model = cls(labels, {label: {} for label in labels})
+        for _ in range(epochs):
+            for features, target in examples:
+                probabilities = model.probabilities(features)
+                for label in labels:
+                    gradient = probabilities[label] - (1.0 if label == target else 0.0)
+                    weights = model.weights[label]
+                    for f, v in features.items():
+                        w = weights.get(f, 0.0)
+                        weights[f] = w - learning_rate * (gradient * v + l2 * w)
+        return model
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"labels": self.labels, "weights": self.weights}, f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IntentModel"]:
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data["labels"], data["weights"])
+        except Exception as e:
+            print(f"{Colors.RED}[IntentModel] Failed to load {path}: {e}")
+            return None
+
+
+@dataclass
+class LocalIntentClassifier:
+    """
+    Rules first, then the model (if weights are present); no I/O.
+
+    Returns the higher-confidence analysis of the two, or None for messages the
+    local tiers do not handle. The caller decides whether the confidence is
+    enough to skip the LLM.
+    """
+
+    model: Optional[IntentModel] = None
+
+    def classify(
+        self, message: str, history: List[dict], offered_price: Optional[float] = None
+    ) -> Optional[ClassifiedMessageOutput]:
+        if len(normalize_message(message).split()) > LOCAL_MAX_WORDS:
+            return None
+        previous_ai = last_ai_message(history)
+        result = classify_by_rules(message, previous_ai, offered_price)
+        if self.model is None:
+            return result
+
+        label, confidence = self.model.predict(extract_features(message, previous_ai))
+        if result is not None and result["confidence"] >= confidence:
+            return result
+        try:
+            intent = WhatsappMessageIntent(label)
+        except ValueError:
+            return result
+        if intent == WhatsappMessageIntent.ACCEPT and not is_offer(previous_ai, offered_price):
+            # Accepting ends the negotiation; without a quoted offer the LLM decides.
+            return result
+        amount = parse_amount(message) if intent == WhatsappMessageIntent.NEGOTIATE else None
+        if amount is None and _ANY_AMOUNT_RE.search(message or ""):
+            # A price inside a sentence needs the LLM to tell whose price it is.
+            return result
+        return build_analysis(
+            intent,
+            "model",
+            confidence,
+            budget_amount=amount[0] if amount else None,
+            currency=amount[1] if amount else None,
+        )
+
+
+_classifier: Optional[LocalIntentClassifier] = None
+
+
+def get_local_intent_classifier() -> LocalIntentClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = LocalIntentClassifier(IntentModel.load(config.NEGOTIATION_INTENT_MODEL_PATH))
+    return _classifier
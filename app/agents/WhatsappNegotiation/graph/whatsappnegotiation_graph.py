@@ -21,7 +21,10 @@ from app.agents.WhatsappNegotiation.Node.completeNegotiation_Node import (
 )
 from app.agents.WhatsappNegotiation.Node.confirmDetail_Node import confirm_details_node
 from app.agents.WhatsappNegotiation.Node.counteroffer_Node import counter_offer_node
-from app.agents.WhatsappNegotiation.Node.fetchPricing_Node import fetch_pricing_node
+from app.agents.WhatsappNegotiation.Node.fetchPricing_Node import (
+    fetch_pricing_node,
+    prefetch_pricing_node,
+)
 from app.agents.WhatsappNegotiation.Node.rejectNegotiation_Node import (
     reject_negotiation_node,
 )
@@ -39,6 +42,8 @@ negotiation_graph.add_node("negotiatedebug_after", whatsapp_negotiation_debug_af
 
 negotiation_graph.add_node("fetch_campaign_brief", fetch_campaign_brief_node)
 negotiation_graph.add_node("intentclassifier", intentclassifier)
+negotiation_graph.add_node("prefetch_pricing", prefetch_pricing_node)
+negotiation_graph.add_node("join_prefetch", lambda state: {})
 negotiation_graph.add_node("fetch_pricing", fetch_pricing_node)
 negotiation_graph.add_node("counter_offer", counter_offer_node)
 negotiation_graph.add_node("generate_reply", generate_reply_node)
@@ -52,11 +57,16 @@ negotiation_graph.add_node("send_message", send_whatsapp_reply_node)
 
 
 negotiation_graph.add_edge(START, "negotiatedebug_before")
-negotiation_graph.add_edge("negotiatedebug_before", "fetch_campaign_brief")
-negotiation_graph.add_edge("fetch_campaign_brief", "intentclassifier")
+# Brief lookup, pricing lookup and intent classification are independent, so
+# they run in one step; routing waits for all three.
+for node in ("fetch_campaign_brief", "prefetch_pricing", "intentclassifier"):
+    negotiation_graph.add_edge("negotiatedebug_before", node)
+negotiation_graph.add_edge(
+    ["fetch_campaign_brief", "prefetch_pricing", "intentclassifier"], "join_prefetch"
+)
 
 negotiation_graph.add_conditional_edges(
-    "intentclassifier",
+    "join_prefetch",
     route_by_intent,
     {
         "fetch_pricing": "fetch_pricing",
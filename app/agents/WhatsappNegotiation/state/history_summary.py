@@ -0,0 +1,88 @@
+import json
+from typing import Optional, Set
+from agents import Agent, Runner
+from app.config.credentials_config import config
+from app.core.background_tasks import spawn
+from app.db.connection import get_db
+from app.utils.context_budget import truncate_to_tokens, unsummarized
+from app.utils.message_context import get_history_list
+from app.utils.printcolors import Colors
+from app.utils.prompts import NEGOTIATION_HISTORY_SUMMARY_PROMPT
+
+# Threads with a refresh running in this process; back-to-back turns would
+# otherwise each pay for the same summarization and all but one write loses.
+_refreshing: Set[str] = set()
+
+
+async def refresh_history_summary(thread_id: str, control: Optional[dict]) -> None:
+    """
+    Fold older negotiation messages into the control doc's rolling summary.
+
+    Runs after a turn has been saved. Nothing happens until the messages not
+    yet in the summary reach LLM_CONTEXT_MAX_MESSAGES - 2; then all but the
+    newest NEGOTIATION_SUMMARY_KEEP_MESSAGES are summarized together with the
+    previous summary, so the verbatim part of the context never outgrows what
+    the context builder sends. `history_summary_until` is the timestamp of the
+    last folded message; the write only applies if no other worker moved it.
+    """
+    if not control:
+        return
+    until = control.get("history_summary_until")
+    pending = [
+        m
+        for m in unsummarized(get_history_list(control), until)
+        if isinstance(m, dict) and m.get("timestamp")
+    ]
+    keep = config.NEGOTIATION_SUMMARY_KEEP_MESSAGES
+    if len(pending) < max(keep + 1, config.LLM_CONTEXT_MAX_MESSAGES - 2):
+        return
+    fold = pending[:-keep]
+
+    payload = {
+        "summary": control.get("history_summary") or "",
+        "messages": [
+            {"sender_type": m.get("sender_type"), "message": m.get("message")}
+            for m in fold
+        ],
+    }
+    try:
+        result = await Runner.run(
+            Agent(
+                name="negotiation_history_summary",
+                instructions=NEGOTIATION_HISTORY_SUMMARY_PROMPT,
+            ),
+            input=json.dumps(payload, default=str),
+        )
+        summary = truncate_to_tokens(
+            str(result.final_output or "").strip(),
+            config.LLM_CONTEXT_BUDGET_TOKENS // 3,
+            keep_end=True,
+        )
+        if not summary:
+            return
+        await get_db().get_collection(config.MONGODB_NEGOTIATION_AGENT_CONTROLS).update_one(
+            {"thread_id": thread_id, "history_summary_until": until},
+            {
+                "$set": {
+                    "history_summary": summary,
+                    "history_summary_until": fold[-1]["timestamp"],
+                }
+            },
+        )
+    except Exception as e:
+        print(f"{Colors.RED}[refresh_history_summary] Failed for {thread_id}: {e}")
+
+
+def schedule_history_summary(thread_id: str, control: Optional[dict]) -> None:
+    """Start `refresh_history_summary` in the background unless one is already running."""
+    if not control or thread_id in _refreshing:
+        return
+    _refreshing.add(thread_id)
+
+    async def _run() -> None:
+        try:
+            await refresh_history_summary(thread_id, control)
+        finally:
+            _refreshing.discard(thread_id)
+
+    spawn(_run())
@@ -1,24 +1,83 @@
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
 from app.db.connection import get_db
-from typing import Optional
+from typing import List, Optional
 from app.core.exception import InternalServerErrorException
 from app.config.credentials_config import config
+from app.utils.message_context import get_history_list
 
+# Never `$set` from graph state: history changes only through `new_messages`,
+# the summary only through `refresh_history_summary` (which may finish while a
+# turn that read an older summary is still running), and prefetched pricing is
+# per-turn scratch the graph may not have used.
+TRANSIENT_FIELDS = (
+    "_id",
+    "history",
+    "history_summary",
+    "history_summary_until",
+    "prefetched_pricing",
+)
 
-async def update_negotiation_state(thread_id: str, data: dict) -> Optional[dict]:
+
+async def update_negotiation_state(
+    thread_id: str,
+    data: dict,
+    new_messages: Optional[List[dict]] = None,
+    reset_history: bool = False,
+    previous: Optional[dict] = None,
+) -> Optional[dict]:
+    """
+    `$set` `data` on the thread's control document and return the updated doc.
+
+    The control doc only keeps the last NEGOTIATION_HISTORY_WINDOW entries of
+    `history` (enough for the LLM context). `new_messages` are pushed onto that
+    window and appended to the negotiation history collection, which holds the
+    full conversation. With `reset_history` the window is replaced instead, for
+    a negotiation starting over on the same thread, and its rolling summary is
+    cleared. `TRANSIENT_FIELDS` in `data` are ignored.
+
+    `previous` is the control doc as last read by the caller. If its history
+    was never copied to the history collection, it is copied along with the
+    first new messages so the full conversation stays readable.
+    """
     try:
         db = get_db()
         collection = db.get_collection(config.MONGODB_NEGOTIATION_AGENT_CONTROLS)
-        data.pop("_id", None)
+        data = {k: v for k, v in data.items() if k not in TRANSIENT_FIELDS}
         data["_updated_at"] = datetime.now(timezone.utc)
 
-        await collection.update_one(
+        update: dict = {"$set": data}
+        window = config.NEGOTIATION_HISTORY_WINDOW
+        logged = list(new_messages or [])
+        if logged:
+            data["history_logged"] = True
+            if not reset_history and previous and not previous.get("history_logged"):
+                logged = get_history_list(previous) + logged
+        if reset_history:
+            data["history"] = (new_messages or [])[-window:]
+            update["$unset"] = {"history_summary": "", "history_summary_until": ""}
+        elif new_messages:
+            update["$push"] = {"history": {"$each": new_messages, "$slice": -window}}
+
+        updated = await collection.find_one_and_update(
             {"thread_id": thread_id},
-            {"$set": data},
+            update,
             upsert=True,
+            return_document=ReturnDocument.AFTER,
         )
 
-        return await collection.find_one({"thread_id": thread_id})
+        if logged:
+            await db.get_collection(config.MONGODB_NEGOTIATION_HISTORY).insert_many(
+                [
+                    {
+                        **message,
+                        "thread_id": thread_id,
+                        "campaign_id": updated.get("campaign_id"),
+                    }
+                    for message in logged
+                ]
+            )
+        return updated
 
     except Exception as e:
         print(f"[update_negotiation_state] Failed: {e}")
@@ -37,3 +96,32 @@ async def get_negotiation_state(thread_id: str) -> Optional[dict]:
         raise InternalServerErrorException(
             message=f"Error fetching negotiation state: {str(e)}"
         ) from e
+
+
+async def get_negotiation_history(control: dict) -> List[dict]:
+    """
+    Full message history for a negotiation control document, oldest first.
+
+    Controls whose history was never copied to the history collection only
+    have their inline `history`, so that is returned for them.
+    """
+    if not control.get("history_logged"):
+        return get_history_list(control)
+    try:
+        db = get_db()
+        query = {
+            "thread_id": control.get("thread_id"),
+            "campaign_id": control.get("campaign_id"),
+        }
+        messages = (
+            await db.get_collection(config.MONGODB_NEGOTIATION_HISTORY)
+            .find(query, {"_id": 0, "thread_id": 0, "campaign_id": 0})
+            .sort("_id", 1)
+            .to_list(length=None)
+        )
+        return messages
+    except Exception as e:
+        print(f"[get_negotiation_history] Failed: {e}")
+        raise InternalServerErrorException(
+            message=f"Error fetching negotiation history: {str(e)}"
+        ) from e
@@ -2,7 +2,8 @@ from typing import List, Optional
 from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import HTTPException, UploadFile
-from agents import Runner, Agent
+from agents import Agent
+from app.Guardails.guarded_run import run_guarded
 from app.Guardails.CampaignCreation.campaignInput_guardrails import (
     CampaignCreationInputGuardrail,
 )
@@ -89,7 +90,7 @@ async def create_campaign_brief(user_input: str, user_id: str) -> CampaignBriefR
             + f"\n\nToday's date is {today_str}. When generating the timeline, prefer milestones that are on or after today and avoid dates that are clearly in the past."
         )
 
-        result = await Runner.run(
+        result = await run_guarded(
             Agent(
                 name="create_campaign",
                 instructions=instructions,
@@ -97,7 +98,7 @@ async def create_campaign_brief(user_input: str, user_id: str) -> CampaignBriefR
                 output_guardrails=[CampaignCreationOutputGuardrail],
                 output_type=CampaignBriefResponse,
             ),
-            input=user_input,
+            user_input,
         )
 
         if isinstance(result.final_output, dict):
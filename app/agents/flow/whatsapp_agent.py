@@ -1,6 +1,4 @@
-from app.agents.Whatsapp.nodes.state import get_conversation_round
-from app.agents.Whatsapp.state.get_user_state import get_user_state
-from app.agents.Whatsapp.state.update_user_state import update_user_state
+from app.agents.Whatsapp.state.session_store import session_store
 
 
 async def run_whatsapp_agent(
@@ -12,8 +10,8 @@ async def run_whatsapp_agent(
 ):
 
     whatsapp_agent = app.state.whatsapp_agent
-    state = await get_user_state(thread_id) or {}
-    round_no = await get_conversation_round(thread_id) or 1
+    state, _ = await session_store.load(thread_id)
+    round_no = state.get("conversation_round") or 1
     checkpoint_id = f"{thread_id}-r{round_no}"
 
     state.update(
@@ -31,4 +29,4 @@ async def run_whatsapp_agent(
         config={"configurable": {"thread_id": checkpoint_id}},
     )
     if final_state:
-        await update_user_state(thread_id, final_state)
+        await session_store.save(thread_id, final_state)
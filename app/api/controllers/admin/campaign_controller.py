@@ -1,7 +1,11 @@
-from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import anyio
+from typing import AsyncIterator, Dict, Any, List, Optional
 from datetime import datetime, timezone
 from bson import ObjectId
 from fastapi import HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from app.api.controllers.admin.influencers_controller import (
     find_influencers_by_campaign,
 )
@@ -27,10 +31,14 @@ from app.core.exception import (
 )
 from app.db.connection import get_db
 from app.config import config
+from app.services.vector_search import get_influencer_search_service
 from app.services.whatsapp.interactive_message import (
     send_whatsapp_interactive_message,
 )
 from app.utils.helpers import convert_objectid
+from app.utils.printcolors import Colors
+
+GENERATED_INSERT_BATCH_SIZE = 10
 
 
 async def _populate_user_details(user_id: str) -> Dict[str, Any]:
@@ -543,6 +551,163 @@ async def admin_generate_influencers(
         ) from e
 
 
+def generated_influencer_document(
+    campaign_id: str, inf: Dict[str, Any]
+) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    return {
+        "campaign_id": ObjectId(campaign_id),
+        "influencer_id": inf.get("id"),
+        "username": inf.get("username"),
+        "platform": inf.get("platform"),
+        "followers": inf.get("followers"),
+        "engagementRate": inf.get("engagementRate"),
+        "country": inf.get("country"),
+        "bio": inf.get("bio"),
+        "picture": inf.get("picture"),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def admin_stream_generate_influencers(
+    campaign_id: str,
+    request_data: AdminGenerateInfluencersRequest,
+) -> StreamingResponse:
+    try:
+        db = get_db()
+        campaigns_collection = db.get_collection(
+            config.MONGODB_ATLAS_COLLECTION_CAMPAIGNS
+        )
+        campaign = await campaigns_collection.find_one({"_id": ObjectId(campaign_id)})
+        if not campaign:
+            raise NotFoundException(message="Campaign not found")
+        platforms = [p.strip().lower() for p in campaign.get("platform") or []]
+        if not platforms or not campaign.get("category"):
+            raise BadRequestException(
+                message="Campaign must have platform and category specified",
+            )
+        limit = campaign.get("limit") or request_data.limit
+        if not limit:
+            raise BadRequestException(message="Campaign limit is required")
+        search_service = get_influencer_search_service()
+        unsupported = [p for p in platforms if p not in search_service.stores]
+        if unsupported:
+            raise BadRequestException(
+                message=f"Unsupported platform: {', '.join(unsupported)}"
+            )
+    except (NotFoundException, BadRequestException):
+        raise
+    except Exception as e:
+        raise InternalServerErrorException(
+            message=f"Error in admin stream generate influencers: {str(e)}"
+        ) from e
+
+    return StreamingResponse(
+        stream_generated_influencers(
+            campaign_id,
+            campaign,
+            list(dict.fromkeys(platforms)),
+            limit,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+async def stream_generated_influencers(
+    campaign_id: str,
+    campaign: Dict[str, Any],
+    platforms: List[str],
+    limit: int,
+) -> AsyncIterator[str]:
+    """
+    NDJSON body for the streaming generate endpoint.
+
+    Every platform search runs concurrently and feeds a shared queue, so each
+    influencer is written to the response as soon as it passes filtering.
+    Results are persisted to `generated_influencers` in small batches as they go.
+    Lines are `{"type": "influencer", "data": {...}}`, then a final
+    `{"type": "done", "count": n}` (or `{"type": "error", ...}`).
+    """
+    db = get_db()
+    generated_collection = db.get_collection("generated_influencers")
+    campaigns_collection = db.get_collection(config.MONGODB_ATLAS_COLLECTION_CAMPAIGNS)
+    search_service = get_influencer_search_service()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def produce(platform: str) -> None:
+        try:
+            async for influencer in search_service.stream(
+                platform=platform,
+                category=campaign["category"],
+                limit=limit,
+                followers=campaign.get("followers"),
+                country=campaign.get("country"),
+            ):
+                await queue.put(influencer)
+        except Exception as e:
+            print(
+                f"{Colors.RED}[stream_generated_influencers] {platform} search failed: {e}"
+            )
+        finally:
+            await queue.put(finished)
+
+    async def flush(batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        await generated_collection.insert_many(
+            [generated_influencer_document(campaign_id, inf) for inf in batch]
+        )
+
+    async def mark_generated() -> None:
+        await campaigns_collection.update_one(
+            {"_id": ObjectId(campaign_id)},
+            {"$set": {"generated": True}},
+        )
+
+    producers = [asyncio.create_task(produce(platform)) for platform in platforms]
+    pending_producers = len(producers)
+    batch: List[Dict[str, Any]] = []
+    count = 0
+    marked = False
+    try:
+        while pending_producers:
+            item = await queue.get()
+            if item is finished:
+                pending_producers -= 1
+                continue
+            count += 1
+            batch.append(item)
+            yield json.dumps({"type": "influencer", "data": item}, default=str) + "\n"
+            if len(batch) >= GENERATED_INSERT_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        await flush(batch)
+        batch = []
+        if count:
+            await mark_generated()
+            marked = True
+        yield json.dumps({"type": "done", "count": count}) + "\n"
+    except Exception as e:
+        print(f"{Colors.RED}[stream_generated_influencers] {e}")
+        yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+    finally:
+        for task in producers:
+            if not task.done():
+                task.cancel()
+        if batch or (count and not marked):
+            # Client disconnected mid-stream: keep what was already sent. The
+            # response task is being cancelled, so shield the writes from it.
+            with anyio.CancelScope(shield=True):
+                try:
+                    await flush(batch)
+                    if count:
+                        await mark_generated()
+                except Exception as e:
+                    print(f"{Colors.RED}[stream_generated_influencers] flush failed: {e}")
+
+
 async def store_generated_influencers(
     campaign_id: str,
     influencers: List[Dict[str, Any]],
@@ -559,21 +724,7 @@ async def store_generated_influencers(
             if not isinstance(inf, dict):
                 continue
 
-            documents.append(
-                {
-                    "campaign_id": ObjectId(campaign_id),
-                    "influencer_id": inf.get("id"),
-                    "username": inf.get("username"),
-                    "platform": inf.get("platform"),
-                    "followers": inf.get("followers"),
-                    "engagementRate": inf.get("engagementRate"),
-                    "country": inf.get("country"),
-                    "bio": inf.get("bio"),
-                    "picture": inf.get("picture"),
-                    "created_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
-                }
-            )
+            documents.append(generated_influencer_document(campaign_id, inf))
             await campaign_collection.update_one(
                 {"_id": ObjectId(campaign_id)},
                 {"$set": {"generated": True}},
@@ -1,5 +1,6 @@
 from typing import Any, Dict
 from app.config.credentials_config import config
+from app.agents.Whatsapp.state.session_store import session_store
 from app.core.exception import InternalServerErrorException, NotFoundException
 from app.db.connection import get_db
 
@@ -12,20 +13,16 @@ async def delete_whatsapp_chat(
         whatsapp_collection = db.get_collection(
             config.MONGODB_COLLECTION_WHATSAPP_MESSAGES
         )
-        whatsapp_sessions_collection = db.get_collection(
-            config.MONGODB_ATLAS_COLLECTION_WHATSAPP_SESSIONS
-        )
         Whatsapp_agentcontrol = db.get_collection(config.MONGODB_AGENT_CONTROL)
         result = await whatsapp_collection.delete_many({"thread_id": thread_id})
-        whatsapp_sessions_result = await whatsapp_sessions_collection.delete_one(
-            {"thread_id": thread_id}
-        )
+        # Through the store, so the Redis session cache goes with the document.
+        whatsapp_sessions_deleted = await session_store.delete(thread_id)
         Whatsapp_agentcontrol_result = await Whatsapp_agentcontrol.delete_one(
             {"thread_id": thread_id}
         )
         if result.deleted_count == 0:
             raise NotFoundException(message="Whatsapp messages not found")
-        if whatsapp_sessions_result.deleted_count == 0:
+        if whatsapp_sessions_deleted == 0:
             raise NotFoundException(message="Whatsapp sessions not found")
         if Whatsapp_agentcontrol_result.deleted_count == 0:
             raise NotFoundException(message="Whatsapp agent control not found")
@@ -6,9 +6,7 @@ from app.core.exception import (
     InternalServerErrorException,
     NotFoundException,
 )
-from app.tools.instagram_influencers import search_instagram_influencers
-from app.tools.tiktok_influencers import search_tiktok_influencers
-from app.tools.youtube_influencers import search_youtube_influencers
+from app.services.vector_search import get_influencer_search_service
 from langfuse import observe
 from app.Schemas.influencers import (
     FindInfluencerRequest,
@@ -41,21 +39,16 @@ async def find_influencers_by_campaign(request_data: FindInfluencerRequest):
                 message="Campaign must have platform and category specified",
             )
 
+        search_service = get_influencer_search_service()
         tasks = []
 
         for platform in platforms:
             platform_normalized = platform.strip().lower()
-
-            if platform_normalized == "instagram":
-                tool = search_instagram_influencers
-            elif platform_normalized == "tiktok":
-                tool = search_tiktok_influencers
-            elif platform_normalized == "youtube":
-                tool = search_youtube_influencers
-            else:
+            if platform_normalized not in search_service.stores:
                 raise BadRequestException(message=f"Unsupported platform: {platform}")
             tasks.append(
-                tool(
+                search_service.search(
+                    platform=platform_normalized,
                     category=categories,
                     limit=limit,
                     followers=followers_list,
@@ -14,16 +14,7 @@ from app.core.exception import (
 )
 from app.db.connection import get_db
 from bson import ObjectId
-
-from app.tools.regenerate_instagram_influencers import (
-    regenerate_instagram_influencer,
-)
-from app.tools.regenerate_tiktok_influencers import (
-    regenerate_tiktok_influencer,
-)
-from app.tools.regenerate_youtube_influencers import (
-    regenerate_youtube_influencer,
-)
+from app.services.vector_search import get_influencer_search_service
 
 
 @observe(name="reject_and_regenerate_influencer")
@@ -50,33 +41,16 @@ async def reject_and_regenerate_influencer(
             "influencer_id", {"campaign_id": ObjectId(request_data.campaign_id)}
         )
         excluded_ids = set(generated_ids + [request_data.rejected_influencer_id])
-        if platform == "instagram":
-            influencer = await regenerate_instagram_influencer(
-                categories=categories,
-                followers=followers_list,
-                countries=countries,
-                exclude_ids=excluded_ids,
-            )
-        elif platform == "tiktok":
-            influencer = await regenerate_tiktok_influencer(
-                request_data=SearchRejectRegenerateInfluencersRequest(
-                    categories=categories,
-                    followers=followers_list,
-                    countries=countries,
-                    exclude_ids=excluded_ids,
-                )
-            )
-        elif platform == "youtube":
-            influencer = await regenerate_youtube_influencer(
-                request_data=SearchRejectRegenerateInfluencersRequest(
-                    categories=categories,
-                    followers=followers_list,
-                    countries=countries,
-                    exclude_ids=excluded_ids,
-                )
-            )
-        else:
+        search_service = get_influencer_search_service()
+        if platform not in search_service.stores:
             raise BadRequestException(message="Unsupported platform")
+        influencer = await search_service.regenerate_one(
+            platform=platform,
+            category=categories,
+            followers=followers_list,
+            country=countries,
+            exclude_ids={str(_id) for _id in excluded_ids},
+        )
 
         if influencer and influencer.get("id"):
             await generated_collection.insert_one(
@@ -4,7 +4,7 @@ from bson import ObjectId
 from fastapi import BackgroundTasks
 from typing import Dict, Any
 from app.Schemas.password import ResetPasswordSchema
-from app.agents.Whatsapp.nodes.state import redis_client
+from app.core.redis_manager import get_redis
 from app.core.exception import (
     AccountNotActiveException,
     EmailNotFoundException,
@@ -57,8 +57,8 @@ async def forgot_password(
     otp = generate_otp()
     otp_key = f"reset_otp:{request.email}"
     verified_key = f"reset_otp_verified:{request.email}"
-    await redis_client.delete(otp_key, verified_key)
-    await redis_client.setex(otp_key, 300, otp)
+    await get_redis().delete(otp_key, verified_key)
+    await get_redis().setex(otp_key, 300, otp)
     background_tasks.add_task(
         send_reset_email,
         request.email,
@@ -80,7 +80,7 @@ async def verify_otp(email: str, otp: str):
     otp_key = f"reset_otp:{email}"
     verified_key = f"reset_otp_verified:{email}"
 
-    stored_otp = await redis_client.get(otp_key)
+    stored_otp = await get_redis().get(otp_key)
 
     if not stored_otp:
         raise OTPExpiredException("OTP expired")
@@ -88,12 +88,12 @@ async def verify_otp(email: str, otp: str):
     if stored_otp != otp:
         raise UnauthorizedException("Invalid OTP")
 
-    if await redis_client.get(verified_key):
+    if await get_redis().get(verified_key):
         raise OTPAlreadyVerifiedException("OTP already verified")
 
     # Mark verified
-    await redis_client.setex(verified_key, 1200, "1")
-    await redis_client.delete(otp_key)
+    await get_redis().setex(verified_key, 1200, "1")
+    await get_redis().delete(otp_key)
 
     reset_token = create_reset_password_token(email)
 
@@ -1,9 +1,9 @@
 import json
 import time
 from typing import Optional, Dict
-import httpx
 from fastapi import BackgroundTasks, Request
 from fastapi.responses import JSONResponse, Response
+from app.services.meta_graph_client import get_meta_graph_client
 from app.services.websocket_manager import ws_manager
 from app.config import config
 
@@ -19,25 +19,23 @@ async def _get_ig_username(psid: Optional[str]) -> Optional[str]:
     cached = PROFILE_CACHE.get(psid)
     if cached and now - cached.get("ts", 0) < PROFILE_TTL_SEC:
         return cached.get("username")
-    graph_url = f"https://graph.facebook.com/v23.0/{psid}"
-    params = {
-        "fields": "username",
-        "access_token": "EAAVTqVZBPnhYBQPpws4RTBzBGtxZARiAecMVFFvkftKgzRjjTCRkYMYqZBMuIg9pfCLy8ty9cp4JLnw4LKkKZAeqINE2tfz0glk4IgtTxt32dVDFQIAiHGm4JZAzKr4InGMoalsd5T0xFflZAgsYO5N4MOnz0g6vN7UvoZANHdyOEgNkoOXZC4FZAOXsH4WYK2is4VIDT",
-    }
-
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(graph_url, params=params)
-            if resp.status_code == 200:
-                data = resp.json()
-                username = data.get("username")
-                PROFILE_CACHE[psid] = {
-                    "username": data.get("username"),
-                    "ts": now,
-                }
-                return username
-            else:
-                print(f"Failed to fetch username for PSID {psid}: {resp.status_code}")
+        resp = await get_meta_graph_client().get_object(
+            psid,
+            fields="username",
+            access_token=config.PAGE_ACCESS_TOKEN,
+            api_version="v23.0",
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            username = data.get("username")
+            PROFILE_CACHE[psid] = {
+                "username": data.get("username"),
+                "ts": now,
+            }
+            return username
+        else:
+            print(f"Failed to fetch username for PSID {psid}: {resp.status_code}")
     except Exception as e:
         print(f"Error fetching username for PSID {psid}: {str(e)}")
 
@@ -26,6 +26,7 @@ from app.api.controllers.admin.campaign_controller import (
     company_approved_campaign_influencers,
     get_all_campaigns,
     admin_generate_influencers,
+    admin_stream_generate_influencers,
     get_campaign_generated_influencers,
     update_campaignstatus_with_background_task,
 )
@@ -61,7 +62,9 @@ from app.api.controllers.admin.user_managment import (
     update_user_status,
 )
 from app.api.controllers.company.company_data import company_data
-from app.core.redis import redis_info
+from app.core.rate_limiter import LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT, rate_limit
+from app.core.redis import checkpoint_stats_report, redis_info, reset_checkpoint_stats
+from app.db.indexes import index_drift_report
 from app.Schemas.campaign import (
     AdminGenerateInfluencersRequest,
     CampaignStatusUpdateRequest,
@@ -75,6 +78,10 @@ from app.services.instagram.list_on_conversations import (
     instagram_conversations_list,
 )
 from app.services.negotiation.InitialMessage import NegotiationInitialMessage
+from app.services.vector_search import (
+    ensure_vector_index_filters,
+    materialize_search_fields,
+)
 from app.services.negotiation.negotiation import (
     get_all_negotiation_controls,
     get_negotiation_control_detail,
@@ -86,7 +93,11 @@ from app.services.negotiation.negotiation import (
 router = APIRouter()
 
 
-@router.post("/campaigns/generate-influencers/{campaign_id}", tags=["Admin"])
+@router.post(
+    "/campaigns/generate-influencers/{campaign_id}",
+    tags=["Admin"],
+    dependencies=[Depends(rate_limit(LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT))],
+)
 async def generate_influencers_route(
     campaign_id: str,
     request_data: AdminGenerateInfluencersRequest,
@@ -101,6 +112,19 @@ async def generate_influencers_route(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/campaigns/generate-influencers/{campaign_id}/stream",
+    tags=["Admin"],
+    dependencies=[Depends(rate_limit(LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT))],
+)
+async def stream_generate_influencers_route(
+    campaign_id: str,
+    request_data: AdminGenerateInfluencersRequest,
+    current_user: dict = Depends(require_admin_access),
+):
+    return await admin_stream_generate_influencers(campaign_id, request_data)
+
+
 router.add_api_route(
     path="/campaigns",
     endpoint=get_all_campaigns,
@@ -213,6 +237,7 @@ router.add_api_route(
     endpoint=reject_and_regenerate_influencer,
     methods=["POST"],
     tags=["Admin"],
+    dependencies=[Depends(rate_limit(LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT))],
 )
 
 router.add_api_route(
@@ -261,6 +286,30 @@ router.add_api_route(
     tags=["Admin"],
 )
 
+router.add_api_route(
+    path="/redis/checkpoint-stats",
+    endpoint=checkpoint_stats_report,
+    methods=["GET"],
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_access)],
+)
+
+router.add_api_route(
+    path="/redis/checkpoint-stats/reset",
+    endpoint=reset_checkpoint_stats,
+    methods=["POST"],
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_access)],
+)
+
+router.add_api_route(
+    path="/mongo/indexes",
+    endpoint=index_drift_report,
+    methods=["GET"],
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_access)],
+)
+
 router.add_api_route(
     path="/user-management",
     endpoint=get_all_users,
@@ -283,7 +332,26 @@ router.add_api_route(
 )
 
 
-@router.post("/more-influencers", tags=["Admin"])
+@router.post("/search-fields/materialize/{platform}", tags=["Admin"])
+async def materialize_search_fields_route(
+    platform: str,
+    current_user: dict = Depends(require_admin_access),
+):
+    try:
+        result = await materialize_search_fields(platform)
+        result["index"] = await ensure_vector_index_filters(platform)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/more-influencers",
+    tags=["Admin"],
+    dependencies=[Depends(rate_limit(LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT))],
+)
 async def more_influencers_route(
     request_data: MoreInfluencerRequest,
     background_tasks: BackgroundTasks,
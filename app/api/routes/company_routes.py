@@ -31,6 +31,7 @@ from app.api.controllers.admin.campaign_controller import (
 from app.Schemas.campaign import (
     CreateCampaignRequest,
 )
+from app.core.rate_limiter import LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT, rate_limit
 from app.services.whatsapp.send_text import send_message_from_ishout_to_user
 from app.tools.search_influencers import search_influencers
 from app.api.controllers.company.profile import (
@@ -102,6 +103,7 @@ router.add_api_route(
     endpoint=search_influencers,
     methods=["POST"],
     tags=["Company"],
+    dependencies=[Depends(rate_limit(LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT))],
 )
 
 router.add_api_route(
@@ -164,7 +166,12 @@ router.add_api_route(
 )
 
 
-@router.post("/campaign-brief", response_model=CampaignBriefResponse, tags=["Company"])
+@router.post(
+    "/campaign-brief",
+    response_model=CampaignBriefResponse,
+    tags=["Company"],
+    dependencies=[Depends(rate_limit(LLM_COMPANY_LIMIT, LLM_ROUTE_LIMIT))],
+)
 async def create_campaign_brief_endpoint(request: CampaignBriefRequest):
     return await create_campaign_brief(
         user_input=request.user_input, user_id=request.user_id
@@ -24,6 +24,11 @@ class Config(BaseModel):
     MONGODB_VECTOR_INDEX_NAME: str = Field(
         default=os.getenv("MONGODB_VECTOR_INDEX_NAME")
     )
+    # Enable only after POST /search-fields/materialize/{platform} has run for
+    # every platform: documents and the Atlas index need the filter fields first.
+    VECTOR_SEARCH_PREFILTER: bool = Field(
+        default=os.getenv("VECTOR_SEARCH_PREFILTER", "false").lower() == "true"
+    )
     MONGODB_ATLAS_COLLECTION_USERS: str = Field(
         default=os.getenv("MONGODB_ATLAS_COLLECTION_USERS")
     )
@@ -75,6 +80,12 @@ class Config(BaseModel):
     MONGODB_WHATSAPP_NEGOTIATION: str = Field(
         default=os.getenv("MONGODB_WHATSAPP_NEGOTIATION", "whatsapp_negotiation")
     )
+    MONGODB_NEGOTIATION_HISTORY: str = Field(
+        default=os.getenv("MONGODB_NEGOTIATION_HISTORY", "negotiation_history")
+    )
+    MONGODB_NEGOTIATION_INTENT_LOG: str = Field(
+        default=os.getenv("MONGODB_NEGOTIATION_INTENT_LOG", "negotiation_intent_log")
+    )
     MONGODB_INSTAGRAM_SESSIONS: str = Field(
         default=os.getenv("MONGODB_INSTAGRAM_SESSIONS", "instagram_sessions")
     )
@@ -86,6 +97,42 @@ class Config(BaseModel):
     OPENAI_GPT_IMAGE_MODEL: str = Field(default=os.getenv("OPENAI_GPT_IMAGE_MODEL"))
 
     EMBEDDING_MODEL: str = Field(default=os.getenv("EMBEDDING_MODEL"))
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(
+        default=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "2048"))
+    )
+    EMBEDDING_CACHE_TTL_SECONDS: int = Field(
+        default=int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    )
+    # Results of cache-eligible agent runs, keyed by prompt, model, schema and input.
+    LLM_CACHE_ENABLED: bool = Field(
+        default=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    )
+    LLM_CACHE_TTL_SECONDS: int = Field(
+        default=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+    )
+    # Conversation history sent to an LLM call is cut to this many tokens.
+    LLM_CONTEXT_BUDGET_TOKENS: int = Field(
+        default=int(os.getenv("LLM_CONTEXT_BUDGET_TOKENS", "2000"))
+    )
+    LLM_CONTEXT_MAX_MESSAGES: int = Field(
+        default=int(os.getenv("LLM_CONTEXT_MAX_MESSAGES", "16"))
+    )
+    LLM_TOKENIZER_ENCODING: str = Field(
+        default=os.getenv("LLM_TOKENIZER_ENCODING", "o200k_base")
+    )
+    # Once LLM_CONTEXT_MAX_MESSAGES - 2 negotiation messages are unsummarized,
+    # all but the newest NEGOTIATION_SUMMARY_KEEP_MESSAGES are folded into the summary.
+    NEGOTIATION_SUMMARY_KEEP_MESSAGES: int = Field(
+        default=int(os.getenv("NEGOTIATION_SUMMARY_KEEP_MESSAGES", "6"))
+    )
+    # Input guardrails run alongside the agent; short messages with no risky
+    # keywords skip the LLM guardrail entirely.
+    GUARDRAIL_PARALLEL_ENABLED: bool = Field(
+        default=os.getenv("GUARDRAIL_PARALLEL_ENABLED", "true").lower() == "true"
+    )
+    GUARDRAIL_PRESCREEN_MAX_CHARS: int = Field(
+        default=int(os.getenv("GUARDRAIL_PRESCREEN_MAX_CHARS", "280"))
+    )
     PORT: int = Field(default=int(os.getenv("PORT", "8000")))
 
     JWT_SECRET_KEY: str = Field(default=os.getenv("JWT_SECRET_KEY"))
@@ -107,6 +154,18 @@ class Config(BaseModel):
     WHATSAPP_GRAPH_API_VERSION: str = Field(
         default=os.getenv("WHATSAPP_GRAPH_API_VERSION")
     )
+    WHATSAPP_PHONE_NUMBER_ID: str = Field(
+        default=os.getenv("WHATSAPP_PHONE_NUMBER_ID", "967002123161751")
+    )
+    META_MESSAGES_API_VERSION: str = Field(
+        default=os.getenv("META_MESSAGES_API_VERSION", "v22.0")
+    )
+    META_HTTP_MAX_CONNECTIONS: int = Field(
+        default=int(os.getenv("META_HTTP_MAX_CONNECTIONS", "50"))
+    )
+    META_HTTP_MAX_KEEPALIVE: int = Field(
+        default=int(os.getenv("META_HTTP_MAX_KEEPALIVE", "20"))
+    )
 
     LANGFUSE_SECRET_KEY: str = Field(default=os.getenv("LANGFUSE_SECRET_KEY"))
     LANGFUSE_PUBLIC_KEY: str = Field(default=os.getenv("LANGFUSE_PUBLIC_KEY"))
@@ -127,6 +186,129 @@ class Config(BaseModel):
     )
 
     REDIS_URL: str = Field(default=os.getenv("REDIS_URL"))
+    # Per pool, per worker; callers wait up to REDIS_POOL_TIMEOUT for a free connection.
+    REDIS_MAX_CONNECTIONS: int = Field(
+        default=int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+    )
+    REDIS_POOL_TIMEOUT: float = Field(
+        default=float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+    )
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(
+        default=int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+    )
+    REDIS_CONNECT_TIMEOUT: float = Field(
+        default=float(os.getenv("REDIS_CONNECT_TIMEOUT", "5"))
+    )
+    # "inline" runs the WhatsApp pipeline inside the webhook request; "queue" ACKs
+    # immediately and hands the event to Redis Stream consumers.
+    WHATSAPP_WEBHOOK_MODE: str = Field(
+        default=os.getenv("WHATSAPP_WEBHOOK_MODE", "inline").lower()
+    )
+    WHATSAPP_QUEUE_PARTITIONS: int = Field(
+        default=int(os.getenv("WHATSAPP_QUEUE_PARTITIONS", "8"))
+    )
+    WHATSAPP_QUEUE_MAX_ATTEMPTS: int = Field(
+        default=int(os.getenv("WHATSAPP_QUEUE_MAX_ATTEMPTS", "3"))
+    )
+    # Entries of different threads processed at once within one partition.
+    WHATSAPP_QUEUE_CONCURRENCY: int = Field(
+        default=int(os.getenv("WHATSAPP_QUEUE_CONCURRENCY", "16"))
+    )
+    WHATSAPP_QUEUE_RUN_CONSUMERS: bool = Field(
+        default=os.getenv("WHATSAPP_QUEUE_RUN_CONSUMERS", "true").lower() == "true"
+    )
+    WS_SEND_QUEUE_SIZE: int = Field(default=int(os.getenv("WS_SEND_QUEUE_SIZE", "256")))
+    # "drop_oldest" or "close" when a socket's send queue is full.
+    WS_SLOW_CONSUMER_POLICY: str = Field(
+        default=os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest").lower()
+    )
+    # "local" keeps WebSocket fan-out in-process; "redis" relays events between
+    # API replicas over Redis pub/sub.
+    WS_CLUSTER_MODE: str = Field(default=os.getenv("WS_CLUSTER_MODE", "local").lower())
+    WS_REPLAY_BUFFER_SIZE: int = Field(
+        default=int(os.getenv("WS_REPLAY_BUFFER_SIZE", "5000"))
+    )
+    # Clients missing more events than this get `resync_required` instead.
+    WS_REPLAY_MAX_EVENTS: int = Field(
+        default=int(os.getenv("WS_REPLAY_MAX_EVENTS", "200"))
+    )
+    # Meta keeps redelivering unacknowledged webhooks for up to a day.
+    WEBHOOK_DEDUP_TTL_SECONDS: int = Field(
+        default=int(os.getenv("WEBHOOK_DEDUP_TTL_SECONDS", "86400"))
+    )
+    # Idle WhatsApp onboarding sessions are removed by a TTL index after this.
+    WHATSAPP_SESSION_TTL_SECONDS: int = Field(
+        default=int(os.getenv("WHATSAPP_SESSION_TTL_SECONDS", str(30 * 24 * 3600)))
+    )
+    # Most recent negotiation messages kept inline on the control document.
+    NEGOTIATION_HISTORY_WINDOW: int = Field(
+        default=int(os.getenv("NEGOTIATION_HISTORY_WINDOW", "50"))
+    )
+    CHECKPOINT_REGISTRY_TTL_SECONDS: int = Field(
+        default=int(os.getenv("CHECKPOINT_REGISTRY_TTL_SECONDS", str(7 * 24 * 3600)))
+    )
+    CHECKPOINT_SWEEP_INTERVAL_SECONDS: float = Field(
+        default=float(os.getenv("CHECKPOINT_SWEEP_INTERVAL_SECONDS", "300"))
+    )
+    # SCAN pages (of ~500 keys) walked per sweep.
+    CHECKPOINT_SWEEP_SCAN_BUDGET: int = Field(
+        default=int(os.getenv("CHECKPOINT_SWEEP_SCAN_BUDGET", "20"))
+    )
+    # Comma-separated state fields left out of each graph's Redis checkpoints.
+    CHECKPOINT_DROP_FIELDS_WHATSAPP: str = Field(
+        default=os.getenv("CHECKPOINT_DROP_FIELDS_WHATSAPP", "debug_log")
+    )
+    CHECKPOINT_DROP_FIELDS_NEGOTIATION: str = Field(
+        default=os.getenv(
+            "CHECKPOINT_DROP_FIELDS_NEGOTIATION",
+            "history,campaign_brief,analysis,prefetched_pricing",
+        )
+    )
+    CHECKPOINT_STATS_ENABLED: bool = Field(
+        default=os.getenv("CHECKPOINT_STATS_ENABLED", "false").lower() == "true"
+    )
+    RATE_LIMIT_ENABLED: bool = Field(
+        default=os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    )
+    # Inbound WhatsApp messages processed per sender per period.
+    WHATSAPP_SENDER_RATE_LIMIT: int = Field(
+        default=int(os.getenv("WHATSAPP_SENDER_RATE_LIMIT", "20"))
+    )
+    WHATSAPP_SENDER_RATE_PERIOD_SECONDS: float = Field(
+        default=float(os.getenv("WHATSAPP_SENDER_RATE_PERIOD_SECONDS", "60"))
+    )
+    # LLM-backed routes: token bucket per user, sliding window per route.
+    LLM_COMPANY_RATE_LIMIT: int = Field(
+        default=int(os.getenv("LLM_COMPANY_RATE_LIMIT", "10"))
+    )
+    LLM_COMPANY_RATE_PERIOD_SECONDS: float = Field(
+        default=float(os.getenv("LLM_COMPANY_RATE_PERIOD_SECONDS", "60"))
+    )
+    LLM_ROUTE_RATE_LIMIT: int = Field(
+        default=int(os.getenv("LLM_ROUTE_RATE_LIMIT", "120"))
+    )
+    LLM_ROUTE_RATE_PERIOD_SECONDS: float = Field(
+        default=float(os.getenv("LLM_ROUTE_RATE_PERIOD_SECONDS", "60"))
+    )
+    # Negotiation intents classified locally at or above this confidence skip the LLM.
+    NEGOTIATION_INTENT_CONFIDENCE_THRESHOLD: float = Field(
+        default=float(os.getenv("NEGOTIATION_INTENT_CONFIDENCE_THRESHOLD", "0.85"))
+    )
+    NEGOTIATION_INTENT_MODEL_PATH: str = Field(
+        default=os.getenv(
+            "NEGOTIATION_INTENT_MODEL_PATH",
+            "app/agents/WhatsappNegotiation/classifier/intent_model.json",
+        )
+    )
+    # Share of locally classified messages also labelled by the LLM, for evaluation.
+    NEGOTIATION_INTENT_SHADOW_RATE: float = Field(
+        default=float(os.getenv("NEGOTIATION_INTENT_SHADOW_RATE", "0.05"))
+    )
+    # Messages from one thread arriving within this window share one agent turn.
+    # Off by default: every turn waits the full window before starting.
+    WHATSAPP_COALESCE_WINDOW_SECONDS: float = Field(
+        default=float(os.getenv("WHATSAPP_COALESCE_WINDOW_SECONDS", "0.0"))
+    )
     RESEND_FROM_EMAIL: str = Field(default=os.getenv("RESEND_FROM_EMAIL"))
     RESEND_API_KEY: str = Field(default=os.getenv("RESEND_API_KEY"))
 
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Coroutine, Optional, Set
+from app.utils.printcolors import Colors
+
+# How long shutdown waits for in-flight background work before cancelling it.
+DRAIN_TIMEOUT_SECONDS = 10.0
+
+_tasks: Set[asyncio.Task] = set()
+
+
+def spawn(coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+    """
+    Run `coro` in the background without awaiting it.
+
+    The event loop only keeps weak references to tasks, so a bare
+    `asyncio.create_task` can be garbage-collected mid-run; the task is held
+    here until it finishes and is awaited (or cancelled) at shutdown.
+    """
+    task = asyncio.create_task(coro, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def drain_background_tasks(timeout: float = DRAIN_TIMEOUT_SECONDS) -> None:
+    """Wait up to `timeout` for spawned tasks, then cancel whatever is left."""
+    if not _tasks:
+        return
+    _, pending = await asyncio.wait(set(_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    if pending:
+        print(f"{Colors.YELLOW}[background_tasks] Cancelled {len(pending)} tasks at shutdown")
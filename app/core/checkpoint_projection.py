@@ -0,0 +1,62 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Sequence, Tuple
+
+
+def parse_fields(value: str) -> FrozenSet[str]:
+    return frozenset(f.strip() for f in (value or "").split(",") if f.strip())
+
+
+@dataclass(frozen=True)
+class CheckpointProjection:
+    """
+    State fields that are not written to a graph's checkpoints.
+
+    Only fields the graph can rebuild on resume belong here: every turn is
+    invoked with the full state loaded from Mongo, and blobs such as the
+    campaign brief are re-fetched by their node from the ids kept in state
+    (`influencer_id`, `campaign_id`), so those ids act as the reference.
+    """
+
+    drop: FrozenSet[str] = frozenset()
+
+    def values(self, channel_values: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.drop:
+            return channel_values
+        return {k: v for k, v in channel_values.items() if k not in self.drop}
+
+    def writes(self, writes: Sequence[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+        if not self.drop:
+            return list(writes)
+        return [(channel, value) for channel, value in writes if channel not in self.drop]
+
+
+def node_from_task_path(task_path: str) -> str:
+    """LangGraph task paths look like "~__pregel_pull, <node>"; keep the node."""
+    return (task_path or "").rsplit(",", 1)[-1].strip() or "unknown"
+
+
+class CheckpointStats:
+    """Running per-node averages of serialized checkpoint size, raw vs projected."""
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def record(self, node: str, raw_bytes: int, stored_bytes: int) -> None:
+        totals = self._totals[node]
+        totals[0] += 1
+        totals[1] += raw_bytes
+        totals[2] += stored_bytes
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            node: {
+                "checkpoints": count,
+                "avg_raw_bytes": round(raw / count, 1),
+                "avg_stored_bytes": round(stored / count, 1),
+            }
+            for node, (count, raw, stored) in sorted(self._totals.items())
+        }
+
+    def reset(self) -> None:
+        self._totals.clear()
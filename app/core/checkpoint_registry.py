@@ -0,0 +1,252 @@
+import asyncio
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from redis.asyncio import Redis
+from app.core.checkpoint_projection import (
+    CheckpointProjection,
+    CheckpointStats,
+    node_from_task_path,
+)
+from app.utils.printcolors import Colors
+
+REGISTRY_PREFIX = "checkpoint:registry"
+SWEEP_LEASE_KEY = "checkpoint:registry:sweep:lease"
+SWEEP_CURSOR_KEY = "checkpoint:registry:sweep:cursor"
+CHECKPOINT_KEY_PATTERN = "checkpoint*"
+UNLINK_BATCH_SIZE = 500
+SCAN_COUNT = 500
+RECORDED_CACHE_SIZE = 10_000
+
+# Onboarding checkpoints live under "<sender>-r<round>"; other graphs use the
+# bare thread id, which then forms a group of its own.
+_ROUND_RE = re.compile(r"^(?P<group>.+)-r(?P<round>\d+)$")
+
+
+def split_round(thread_id: str):
+    match = _ROUND_RE.match(thread_id)
+    if not match:
+        return thread_id, None
+    return match.group("group"), int(match.group("round"))
+
+
+class CheckpointRegistry:
+    """
+    Redis sets recording which checkpoint threads belong to which conversation.
+
+    Each checkpointer gets its own namespace. `threads:<group>` holds the
+    checkpoint threads of one conversation, so cleanup is a set read plus the
+    saver's public `adelete_thread` (an indexed query per thread) instead of a
+    keyspace walk. `saver` is attached when the checkpointer is built.
+
+    Recording is remembered per process: a thread is written to Redis on its
+    first checkpoint and then at most once per half TTL (to keep the set
+    alive), so the checkpoint write path normally costs no round trip.
+    """
+
+    def __init__(self, namespace: str, redis_factory, ttl_seconds: int):
+        self.namespace = namespace
+        self.redis_factory = redis_factory
+        self.ttl_seconds = ttl_seconds
+        self.saver: Optional[AsyncRedisSaver] = None
+        self._recorded: Dict[str, float] = {}
+
+    def threads_key(self, group: str) -> str:
+        return f"{REGISTRY_PREFIX}:{self.namespace}:threads:{group}"
+
+    async def record(self, thread_id: str) -> None:
+        now = time.monotonic()
+        refresh_after = self.ttl_seconds / 2
+        if now - self._recorded.get(thread_id, -refresh_after) < refresh_after:
+            return
+        group, _ = split_round(thread_id)
+        redis: Redis = self.redis_factory()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(self.threads_key(group), thread_id)
+            pipe.expire(self.threads_key(group), self.ttl_seconds)
+            await pipe.execute()
+        if len(self._recorded) >= RECORDED_CACHE_SIZE:
+            self._recorded = {
+                t: at for t, at in self._recorded.items() if now - at < refresh_after
+            }
+        self._recorded[thread_id] = now
+
+    async def threads(self, group: str) -> Set[str]:
+        return set(await self.redis_factory().smembers(self.threads_key(group)))
+
+    async def delete_threads(self, thread_ids: Iterable[str]) -> int:
+        """Delete the checkpoints of `thread_ids` through the saver, then the registry entries."""
+        thread_ids = list(thread_ids)
+        if not thread_ids or self.saver is None:
+            return 0
+        await asyncio.gather(*(self.saver.adelete_thread(t) for t in thread_ids))
+        for thread_id in thread_ids:
+            self._recorded.pop(thread_id, None)
+
+        redis: Redis = self.redis_factory()
+        by_group: Dict[str, List[str]] = defaultdict(list)
+        for thread_id in thread_ids:
+            by_group[split_round(thread_id)[0]].append(thread_id)
+        async with redis.pipeline(transaction=False) as pipe:
+            for group, ids in by_group.items():
+                pipe.srem(self.threads_key(group), *ids)
+            await pipe.execute()
+        return len(thread_ids)
+
+
+async def unlink_in_batches(redis: Redis, keys: List[str]) -> None:
+    for start in range(0, len(keys), UNLINK_BATCH_SIZE):
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.unlink(*keys[start : start + UNLINK_BATCH_SIZE])
+            await pipe.execute()
+
+
+class TrackedAsyncRedisSaver(AsyncRedisSaver):
+    """
+    AsyncRedisSaver that records the threads it writes in a CheckpointRegistry.
+
+    Only the public `aput`/`aput_writes` are overridden: each completed write
+    registers its thread, and the saver's own `adelete_thread` removes the keys
+    later, so nothing depends on how the package lays out its keys. Fields
+    named by `projection` are left out of stored checkpoints and writes; with
+    `stats` set, serialized sizes before and after projection are recorded per
+    node.
+    """
+
+    registry: Optional[CheckpointRegistry] = None
+    projection: CheckpointProjection = CheckpointProjection()
+    stats: Optional[CheckpointStats] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_node: Dict[str, str] = {}
+
+    async def _register(self, config) -> None:
+        if self.registry is None:
+            return
+        thread_id = str(config["configurable"]["thread_id"])
+        try:
+            await self.registry.record(thread_id)
+        except Exception as e:
+            print(f"{Colors.RED}[TrackedAsyncRedisSaver] Failed to register thread: {e}")
+
+    def _serialized_size(self, values: Dict) -> int:
+        try:
+            return len(self.serde.dumps_typed(values)[1])
+        except Exception:
+            return 0
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        values = checkpoint.get("channel_values") or {}
+        projected = self.projection.values(values)
+        if self.stats is not None:
+            thread_id = str(config["configurable"]["thread_id"])
+            self.stats.record(
+                self._last_node.pop(thread_id, "input"),
+                self._serialized_size(values),
+                self._serialized_size(projected),
+            )
+        if projected is not values:
+            checkpoint = {**checkpoint, "channel_values": projected}
+        result = await super().aput(config, checkpoint, metadata, new_versions)
+        await self._register(config)
+        return result
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        if self.stats is not None:
+            thread_id = str(config["configurable"]["thread_id"])
+            self._last_node[thread_id] = node_from_task_path(task_path)
+        writes = self.projection.writes(writes)
+        result = await super().aput_writes(config, writes, task_id, task_path)
+        await self._register(config)
+        return result
+
+
+class CheckpointSweeper:
+    """
+    Background SCAN over checkpoint keys written before the registry existed.
+
+    Each run walks at most `scan_budget` SCAN pages from a cursor shared through
+    Redis, so the keyspace is covered incrementally across runs and workers. A
+    key is unlinked when its thread is round `n` of a conversation whose registry
+    already lists a later round. Only one worker sweeps per interval.
+    """
+
+    def __init__(
+        self,
+        registry: CheckpointRegistry,
+        interval_seconds: float,
+        scan_budget: int,
+    ):
+        self.registry = registry
+        self.interval_seconds = interval_seconds
+        self.scan_budget = scan_budget
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                removed = await self.sweep_once()
+                if removed:
+                    print(f"{Colors.GREEN}[CheckpointSweeper] Unlinked {removed} stale keys")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"{Colors.RED}[CheckpointSweeper] Sweep failed: {e}")
+
+    async def sweep_once(self) -> int:
+        redis: Redis = self.registry.redis_factory()
+        if not await redis.set(
+            SWEEP_LEASE_KEY, "1", nx=True, ex=max(1, int(self.interval_seconds))
+        ):
+            return 0
+
+        cursor = int(await redis.get(SWEEP_CURSOR_KEY) or 0)
+        candidates: Dict[str, Dict[int, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for _ in range(self.scan_budget):
+            cursor, keys = await redis.scan(
+                cursor=cursor, match=CHECKPOINT_KEY_PATTERN, count=SCAN_COUNT
+            )
+            for key in keys:
+                parts = key.split(":")
+                if len(parts) < 2:
+                    continue
+                group, round_no = split_round(parts[1])
+                if round_no is not None:
+                    candidates[group][round_no].append(key)
+            if cursor == 0:
+                break
+        await redis.set(SWEEP_CURSOR_KEY, cursor)
+
+        if not candidates:
+            return 0
+        groups = list(candidates)
+        async with redis.pipeline(transaction=False) as pipe:
+            for group in groups:
+                pipe.smembers(self.registry.threads_key(group))
+            known = await pipe.execute()
+
+        stale: List[str] = []
+        for group, threads in zip(groups, known):
+            rounds = [split_round(t)[1] for t in threads]
+            latest = max((r for r in rounds if r is not None), default=None)
+            if latest is None:
+                continue
+            for round_no, keys in candidates[group].items():
+                if round_no < latest:
+                    stale.extend(keys)
+        await unlink_in_batches(redis, stale)
+        return len(stale)
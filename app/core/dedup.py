@@ -0,0 +1,156 @@
+import hashlib
+import math
+import time
+from typing import Dict, Optional, Set
+import redis.asyncio as redis
+from app.config.credentials_config import config
+from app.core.redis_manager import get_redis
+from app.utils.printcolors import Colors
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over a bytearray using double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RotatingBloomFilter:
+    """
+    Two bloom generations: lookups check both, inserts go to the current one.
+
+    Every `rotate_seconds` the previous generation is dropped, so memory stays
+    bounded and an id is remembered locally for between one and two periods.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rotate_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rotate_seconds = rotate_seconds
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous: Optional[BloomFilter] = None
+        self._rotated_at = time.monotonic()
+
+    def _maybe_rotate(self) -> None:
+        if time.monotonic() - self._rotated_at >= self.rotate_seconds:
+            self._previous = self._current
+            self._current = BloomFilter(self.capacity, self.error_rate)
+            self._rotated_at = time.monotonic()
+
+    def add(self, item: str) -> None:
+        self._maybe_rotate()
+        self._current.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        self._maybe_rotate()
+        return item in self._current or (
+            self._previous is not None and item in self._previous
+        )
+
+
+class MessageDeduplicator:
+    """
+    Drop webhook redeliveries by message id across every worker.
+
+    A message id is claimed with Redis `SET NX EX`; only the first claimant
+    processes it. The claimant calls `mark_seen` once the message has been
+    processed or queued, which remembers the id in a local rotating bloom
+    filter so a later redelivery to this worker skips the Redis round trip.
+    If processing fails it calls `release` instead, so Meta's retry of that
+    message is processed rather than dropped. If Redis is unreachable the
+    deduplicator fails open and relies on the local state alone.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        capacity: int = 100_000,
+        error_rate: float = 1e-6,
+        rotate_seconds: float = 3600,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self._local = RotatingBloomFilter(capacity, error_rate, rotate_seconds)
+        # Claimed by this worker but not yet processed; bloom filters cannot
+        # forget an id, so claims only move into `_local` once they succeed.
+        self._pending: Set[str] = set()
+
+    def _get_redis(self) -> Optional[redis.Redis]:
+        return get_redis() if config.REDIS_URL else None
+
+    def _key(self, message_id: str) -> str:
+        return f"{self.namespace}:dedup:{message_id}"
+
+    async def is_duplicate(self, message_id: Optional[str]) -> bool:
+        if not message_id:
+            return False
+        if message_id in self._pending or message_id in self._local:
+            return True
+        self._pending.add(message_id)
+
+        client = self._get_redis()
+        if client is None:
+            return False
+        try:
+            claimed = await client.set(
+                self._key(message_id),
+                "1",
+                ex=self.ttl_seconds,
+                nx=True,
+            )
+        except Exception as e:
+            print(f"{Colors.RED}[MessageDeduplicator] Redis claim failed: {e}")
+            return False
+        if not claimed:
+            # Another worker holds it; it may still release it on failure.
+            self._pending.discard(message_id)
+        return not claimed
+
+    def mark_seen(self, message_id: Optional[str]) -> None:
+        """The claimed message was processed or queued; keep it claimed."""
+        if not message_id:
+            return
+        self._pending.discard(message_id)
+        self._local.add(message_id)
+
+    async def release(self, message_id: Optional[str]) -> None:
+        """Drop the claim on a message whose processing failed so a retry runs."""
+        if not message_id:
+            return
+        self._pending.discard(message_id)
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.delete(self._key(message_id))
+        except Exception as e:
+            print(f"{Colors.RED}[MessageDeduplicator] Redis release failed: {e}")
+
+
+_deduplicators: Dict[str, MessageDeduplicator] = {}
+
+
+def get_deduplicator(namespace: str) -> MessageDeduplicator:
+    deduplicator = _deduplicators.get(namespace)
+    if deduplicator is None:
+        deduplicator = MessageDeduplicator(
+            namespace, ttl_seconds=config.WEBHOOK_DEDUP_TTL_SECONDS
+        )
+        _deduplicators[namespace] = deduplicator
+    return deduplicator
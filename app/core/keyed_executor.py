@@ -0,0 +1,85 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from redis.asyncio import Redis
+from app.core.redis_lock import RedisLock
+from app.utils.printcolors import Colors
+
+BatchHandler = Callable[[str, List[Any]], Awaitable[Any]]
+
+
+@dataclass
+class _Job:
+    payload: Any
+    future: asyncio.Future
+
+
+class KeyedExecutor:
+    """
+    Serialize work per key while running different keys in parallel.
+
+    Each key gets a mailbox drained by a single task, so jobs for one key run
+    strictly in submission order. When `coalesce_window` is set, the drainer waits
+    that long before taking the mailbox and hands every job that arrived in the
+    meantime (up to `max_batch`) to the handler as one batch. Each batch runs under
+    a per-key Redis lock so workers in other processes cannot interleave with it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: BatchHandler,
+        redis_factory: Callable[[], Optional[Redis]],
+        coalesce_window: float = 0.0,
+        max_batch: int = 10,
+        lock_ttl_ms: int = 30_000,
+    ):
+        self.name = name
+        self.handler = handler
+        self.redis_factory = redis_factory
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.lock_ttl_ms = lock_ttl_ms
+        self._mailboxes: Dict[str, Deque[_Job]] = {}
+        self._drainers: Dict[str, asyncio.Task] = {}
+
+    async def submit(self, key: str, payload: Any) -> Any:
+        """Queue `payload` for `key` and wait for the batch that contains it."""
+        job = _Job(payload, asyncio.get_running_loop().create_future())
+        self._mailboxes.setdefault(key, deque()).append(job)
+        if key not in self._drainers:
+            self._drainers[key] = asyncio.create_task(self._drain(key))
+        return await job.future
+
+    async def _drain(self, key: str) -> None:
+        try:
+            while self._mailboxes.get(key):
+                if self.coalesce_window:
+                    await asyncio.sleep(self.coalesce_window)
+                mailbox = self._mailboxes[key]
+                batch = [mailbox.popleft() for _ in range(min(len(mailbox), self.max_batch))]
+                try:
+                    result = await self._run_locked(key, [job.payload for job in batch])
+                except Exception as e:
+                    print(f"{Colors.RED}[{self.name}] Batch for {key} failed: {e}")
+                    for job in batch:
+                        if not job.future.done():
+                            job.future.set_exception(e)
+                else:
+                    for job in batch:
+                        if not job.future.done():
+                            job.future.set_result(result)
+        finally:
+            # No await between the empty-mailbox check and here, so a concurrent
+            # submit either landed in the mailbox above or will start a new drainer.
+            self._drainers.pop(key, None)
+            if not self._mailboxes.get(key):
+                self._mailboxes.pop(key, None)
+
+    async def _run_locked(self, key: str, payloads: List[Any]) -> Any:
+        redis = self.redis_factory()
+        if redis is None:
+            return await self.handler(key, payloads)
+        async with RedisLock(redis, f"{self.name}:lock:{key}", ttl_ms=self.lock_ttl_ms):
+            return await self.handler(key, payloads)
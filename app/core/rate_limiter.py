@@ -1,25 +1,240 @@
+import math
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from fastapi import Depends, HTTPException, Request, status
 from redis.asyncio import Redis
+from app.config.credentials_config import config
+from app.core.redis_manager import get_redis
+from app.middleware.auth_middleware import get_optional_user
+from app.utils.printcolors import Colors
+
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+
+SCOPE_SENDER = "sender"
+SCOPE_COMPANY = "company"
+SCOPE_ROUTE = "route"
+
+# Checks every key first and only records the request when all of them allow
+# it, so a request rejected by one limit does not use up the others.
+#   KEYS: one per limit
+#   ARGV: request id, cost, then (algorithm, limit, period_ms) per key
+# Returns {allowed, index of the first key that rejected (1-based), retry_after_ms}.
+RATE_LIMIT_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local member = ARGV[1]
+local cost = tonumber(ARGV[2])
+local tokens = {}
+local denied = 0
+local retry = 0
+
+for i, key in ipairs(KEYS) do
+    local base = 2 + (i - 1) * 3
+    local algorithm = ARGV[base + 1]
+    local limit = tonumber(ARGV[base + 2])
+    local period = tonumber(ARGV[base + 3])
+    local wait = 0
+    if algorithm == 'sliding_window' then
+        redis.call('ZREMRANGEBYSCORE', key, '-inf', now - period)
+        local count = redis.call('ZCARD', key)
+        if count + cost > limit then
+            wait = period
+            local oldest = redis.call('ZRANGE', key, count + cost - limit - 1, count + cost - limit - 1, 'WITHSCORES')
+            if oldest[2] then
+                wait = tonumber(oldest[2]) + period - now
+            end
+        end
+    else
+        local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+        local rate = limit / period
+        local available = tonumber(bucket[1]) or limit
+        local ts = tonumber(bucket[2]) or now
+        available = math.min(limit, available + math.max(0, now - ts) * rate)
+        tokens[i] = available
+        if available < cost then
+            wait = (cost - available) / rate
+        end
+    end
+    if wait > 0 then
+        if denied == 0 then
+            denied = i
+        end
+        retry = math.max(retry, math.ceil(wait))
+    end
+end
+
+if denied > 0 then
+    return {0, denied, retry}
+end
+
+for i, key in ipairs(KEYS) do
+    local base = 2 + (i - 1) * 3
+    local period = tonumber(ARGV[base + 3])
+    if ARGV[base + 1] == 'sliding_window' then
+        for n = 1, cost do
+            redis.call('ZADD', key, now, member .. ':' .. n)
+        end
+    else
+        redis.call('HSET', key, 'tokens', tostring(tokens[i] - cost), 'ts', now)
+    end
+    redis.call('PEXPIRE', key, period)
+end
+return {1, 0, 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    `limit` requests per `period` seconds for one scope.
+
+    A sliding window admits at most `limit` requests in any `period` long
+    interval. A token bucket holds up to `limit` tokens refilled evenly over
+    `period`, so it allows a burst of `limit` and then a steady rate.
+    """
+
+    name: str
+    limit: int
+    period: float
+    algorithm: str = SLIDING_WINDOW
+    scope: str = SCOPE_ROUTE
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after: float = 0.0
+    limit: Optional[RateLimit] = None
 
 
 class RateLimiter:
-    def __init__(
-        self,
-        redis: Redis,
-        max_calls: int,
-        period: int,
-        prefix: str = "whatsapp:rate_limiter",
-    ):
-        self.redis = redis
-        self.max_calls = max_calls
-        self.period = period
+    """
+    Redis rate limiter; every limit of a request is checked in one Lua call.
+
+    `check` takes `(limit, identity)` pairs, e.g. the sender's limit and the
+    route's global limit, and admits the request only if all of them allow it.
+    If Redis is unreachable the limiter fails open.
+    """
+
+    def __init__(self, prefix: str = "ratelimit"):
         self.prefix = prefix
+        self._script = None
+
+    def _get_redis(self) -> Redis:
+        return get_redis()
+
+    def _get_script(self):
+        if self._script is None:
+            self._script = self._get_redis().register_script(RATE_LIMIT_SCRIPT)
+        return self._script
+
+    def key(self, limit: RateLimit, identity: str) -> str:
+        return f"{self.prefix}:{limit.algorithm}:{limit.name}:{identity}"
+
+    async def check(
+        self, checks: Sequence[Tuple[RateLimit, str]], cost: int = 1
+    ) -> RateLimitDecision:
+        if not checks or not config.RATE_LIMIT_ENABLED or not config.REDIS_URL:
+            return RateLimitDecision(True)
+        keys: List[str] = []
+        args: List[Any] = [uuid.uuid4().hex, cost]
+        for limit, identity in checks:
+            keys.append(self.key(limit, identity))
+            args.extend([limit.algorithm, limit.limit, math.ceil(limit.period * 1000)])
+        try:
+            allowed, denied, retry_ms = await self._get_script()(keys=keys, args=args)
+        except Exception as e:
+            print(f"{Colors.RED}[RateLimiter] Redis check failed: {e}")
+            return RateLimitDecision(True)
+        if allowed:
+            return RateLimitDecision(True)
+        return RateLimitDecision(False, int(retry_ms) / 1000, checks[int(denied) - 1][0])
+
+    async def is_allowed(self, limit: RateLimit, identity: str) -> bool:
+        return (await self.check([(limit, identity)])).allowed
+
+
+rate_limiter = RateLimiter()
+
+
+# WhatsApp webhook: agent turns per sender. Over-limit messages are still saved
+# and broadcast; only the agent turn is skipped. Applied with `is_allowed`.
+WHATSAPP_SENDER_LIMIT = RateLimit(
+    "whatsapp_sender",
+    config.WHATSAPP_SENDER_RATE_LIMIT,
+    config.WHATSAPP_SENDER_RATE_PERIOD_SECONDS,
+    SLIDING_WINDOW,
+    SCOPE_SENDER,
+)
+# Routes that run LLM agents: a burst-friendly budget per company (or admin)
+# user and a global ceiling per route.
+LLM_COMPANY_LIMIT = RateLimit(
+    "llm_company",
+    config.LLM_COMPANY_RATE_LIMIT,
+    config.LLM_COMPANY_RATE_PERIOD_SECONDS,
+    TOKEN_BUCKET,
+    SCOPE_COMPANY,
+)
+LLM_ROUTE_LIMIT = RateLimit(
+    "llm_route",
+    config.LLM_ROUTE_RATE_LIMIT,
+    config.LLM_ROUTE_RATE_PERIOD_SECONDS,
+    SLIDING_WINDOW,
+    SCOPE_ROUTE,
+)
+
+
+def _route_id(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method}:{getattr(route, 'path', request.url.path)}"
+
+
+def _identity(
+    limit: RateLimit, request: Request, current_user: Optional[Dict[str, Any]]
+) -> str:
+    route_id = _route_id(request)
+    if limit.scope == SCOPE_COMPANY:
+        user_id = (current_user or {}).get("user_id")
+        if user_id:
+            return f"{route_id}:user:{user_id}"
+        host = request.client.host if request.client else "unknown"
+        return f"{route_id}:ip:{host}"
+    return route_id
+
+
+def rate_limit(*limits: RateLimit):
+    """
+    Dependency factory applying `limits` to a route, rejecting with 429.
+
+        @router.post("/campaign-brief", dependencies=[Depends(rate_limit(LLM_COMPANY_LIMIT))])
+
+    Company limits are keyed by the authenticated user (client IP when there is
+    none) and route limits by the route alone. Every key also includes the
+    route, so limits apply per route. Sender limits have no identity on a
+    request and are checked with `rate_limiter.is_allowed` instead.
+    """
+    for limit in limits:
+        if limit.scope == SCOPE_SENDER:
+            raise ValueError(f"{limit.name} is sender-scoped; use rate_limiter.is_allowed")
 
-    async def is_allowed(self, user_id: str) -> bool:
-        key = f"{self.prefix}:{user_id}"
-        count = await self.redis.incr(key)
-        if count == 1:
-            await self.redis.expire(key, self.period)
+    async def _dependency(
+        request: Request,
+        current_user: Optional[Dict[str, Any]] = Depends(get_optional_user),
+    ) -> None:
+        decision = await rate_limiter.check(
+            [(limit, _identity(limit, request, current_user)) for limit in limits]
+        )
+        if not decision.allowed:
+            retry_after = max(1, math.ceil(decision.retry_after))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={
+                    "message": "Too many requests",
+                    "details": [{"limit": decision.limit.name, "retry_after": retry_after}],
+                },
+                headers={"Retry-After": str(retry_after)},
+            )
 
-        if count > self.max_calls:
-            return False
-        return True
+    return _dependency
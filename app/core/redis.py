@@ -1,20 +1,48 @@
-from langgraph.checkpoint.redis.aio import AsyncRedisSaver
 from app.agents.Whatsapp.graph.whatsapp_graph import graph
+from app.agents.Whatsapp.nodes.state import whatsapp_checkpoint_registry
+from app.core.checkpoint_projection import (
+    CheckpointProjection,
+    CheckpointStats,
+    parse_fields,
+)
+from app.core.checkpoint_registry import CheckpointSweeper, TrackedAsyncRedisSaver
 from app.config.credentials_config import config
-import redis.asyncio as redis
+from app.core.redis_manager import get_redis, get_redis_manager
 from app.utils.printcolors import Colors
 
+checkpoint_stats = {"whatsapp": CheckpointStats(), "negotiation": CheckpointStats()}
+
+
+async def build_checkpointer(ttl, registry, drop_fields, stats):
+    """A tracked, projecting saver on the shared binary Redis pool."""
+    checkpointer = TrackedAsyncRedisSaver(redis_client=get_redis(decode=False), ttl=ttl)
+    await checkpointer.asetup()
+    if registry is not None:
+        checkpointer.registry = registry
+        registry.saver = checkpointer
+    checkpointer.projection = CheckpointProjection(parse_fields(drop_fields))
+    if config.CHECKPOINT_STATS_ENABLED:
+        checkpointer.stats = stats
+    return checkpointer
+
 
 async def Initialize_redis(app):
     if hasattr(app.state, "whatsapp_agent"):
         return
 
-    contextmanager = AsyncRedisSaver.from_conn_string(
-        config.REDIS_URL,
+    checkpointer = await build_checkpointer(
         ttl={"default_ttl": 86400},  # 1 day
+        registry=whatsapp_checkpoint_registry,
+        drop_fields=config.CHECKPOINT_DROP_FIELDS_WHATSAPP,
+        stats=checkpoint_stats["whatsapp"],
     )
-    checkpointer = await contextmanager.__aenter__()
     app.state.whatsapp_agent = graph.compile(checkpointer=checkpointer)
+    app.state.checkpoint_sweeper = CheckpointSweeper(
+        whatsapp_checkpoint_registry,
+        interval_seconds=config.CHECKPOINT_SWEEP_INTERVAL_SECONDS,
+        scan_budget=config.CHECKPOINT_SWEEP_SCAN_BUDGET,
+    )
+    app.state.checkpoint_sweeper.start()
     print(f"{Colors.GREEN}Redis initialized successfully")
     print("--------------------------------")
 
@@ -22,18 +50,46 @@ async def Initialize_redis(app):
 async def initialize_negotiation_redis(app, graph):
     if hasattr(app.state, "whatsapp_negotiation_agent"):
         return
-    contextmanager = AsyncRedisSaver.from_conn_string(
-        config.REDIS_URL, ttl={"default_ttl": 300}
+    checkpointer = await build_checkpointer(
+        ttl={"default_ttl": 300},
+        # Negotiation checkpoints expire in minutes and are never cleaned up
+        # by thread, so they are not registered.
+        registry=None,
+        drop_fields=config.CHECKPOINT_DROP_FIELDS_NEGOTIATION,
+        stats=checkpoint_stats["negotiation"],
     )
-    checkpointer = await contextmanager.__aenter__()
     app.state.whatsapp_negotiation_agent = graph.compile(checkpointer=checkpointer)
     print(f"{Colors.GREEN}Negotiation Redis initialized successfully")
 
 
+async def stop_checkpoint_sweeper(app):
+    sweeper = getattr(app.state, "checkpoint_sweeper", None)
+    if sweeper:
+        await sweeper.stop()
+        app.state.checkpoint_sweeper = None
+
+
 async def redis_info():
-    r = redis.from_url(config.REDIS_URL)
-    info = await r.info("memory")
+    manager = get_redis_manager()
+    info, keys = await manager.batch([("info", "memory"), ("dbsize",)])
     return {
         "used_memory_mb": info["used_memory"] / (1024 * 1024),
-        "keys": await r.dbsize(),
+        "keys": keys,
+        "health": await manager.health(),
     }
+
+
+async def checkpoint_stats_report():
+    """Average serialized checkpoint bytes per node, before and after projection."""
+    return {
+        "enabled": config.CHECKPOINT_STATS_ENABLED,
+        "graphs": {name: stats.report() for name, stats in checkpoint_stats.items()},
+    }
+
+
+async def reset_checkpoint_stats():
+    """Return the current report, then start collecting from zero."""
+    report = await checkpoint_stats_report()
+    for stats in checkpoint_stats.values():
+        stats.reset()
+    return report
@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+from typing import Optional
+from redis.asyncio import Redis
+from app.utils.printcolors import Colors
+
+# Only extend / drop a lock if the caller's token still owns it.
+RENEW_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLock:
+    """
+    Async mutex shared by every worker: SET NX PX with an owner token.
+
+    While held, the TTL is renewed in the background so long agent runs keep the
+    lock; if the holder dies the key simply expires after `ttl_ms`.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        key: str,
+        ttl_ms: int = 30_000,
+        poll_interval: float = 0.05,
+    ):
+        self.redis = redis
+        self.key = key
+        self.ttl_ms = ttl_ms
+        self.poll_interval = poll_interval
+        self.token = uuid.uuid4().hex
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def acquire(self) -> None:
+        while not await self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms):
+            await asyncio.sleep(self.poll_interval)
+        self._renewer = asyncio.create_task(self._renew())
+
+    async def release(self) -> None:
+        if self._renewer:
+            self._renewer.cancel()
+            self._renewer = None
+        try:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, self.key, self.token)
+        except Exception as e:
+            print(f"{Colors.RED}[RedisLock] Failed to release {self.key}: {e}")
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_ms / 3000)
+            renewed = await self.redis.eval(
+                RENEW_LOCK_SCRIPT, 1, self.key, self.token, self.ttl_ms
+            )
+            if not renewed:
+                print(f"{Colors.YELLOW}[RedisLock] Lost lock {self.key}")
+                return
+
+    async def __aenter__(self) -> "RedisLock":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
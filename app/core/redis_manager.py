@@ -0,0 +1,116 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import redis.asyncio as redis
+from app.config.credentials_config import config
+from app.utils.printcolors import Colors
+
+
+class RedisManager:
+    """
+    The process-wide Redis connection pools.
+
+    There are two pools against the same server: a text pool
+    (`decode_responses=True`) used by most callers, and a binary pool for
+    callers that store raw bytes (embedding vectors, LangGraph checkpoints).
+    Both are blocking pools, so callers wait for a free connection instead of
+    opening more than `max_connections` per worker. Connections are health
+    checked with PING after `health_check_interval` seconds idle.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int,
+        pool_timeout: float,
+        health_check_interval: int,
+        connect_timeout: float,
+    ) -> None:
+        self.url = url
+        options = dict(
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            health_check_interval=health_check_interval,
+            socket_connect_timeout=connect_timeout,
+            socket_keepalive=True,
+        )
+        self._text = redis.Redis(
+            connection_pool=redis.BlockingConnectionPool.from_url(
+                url, decode_responses=True, **options
+            )
+        )
+        self._binary = redis.Redis(
+            connection_pool=redis.BlockingConnectionPool.from_url(url, **options)
+        )
+
+    def client(self, decode: bool = True) -> redis.Redis:
+        return self._text if decode else self._binary
+
+    async def batch(
+        self,
+        commands: Iterable[Sequence[Any]],
+        decode: bool = True,
+        transaction: bool = False,
+    ) -> List[Any]:
+        """
+        Run `(command, *args)` tuples in one pipelined round trip.
+
+            ttl, value = await manager.batch([("ttl", key), ("get", key)])
+        """
+        async with self.client(decode).pipeline(transaction=transaction) as pipe:
+            for name, *args in commands:
+                getattr(pipe, name)(*args)
+            return await pipe.execute()
+
+    async def health(self) -> Dict[str, Any]:
+        try:
+            await self._text.ping()
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        pools = {"text": self._text.connection_pool, "binary": self._binary.connection_pool}
+        return {
+            "ok": True,
+            "pools": {
+                name: {
+                    "max_connections": pool.max_connections,
+                    "in_use": len(pool._in_use_connections),
+                }
+                for name, pool in pools.items()
+            },
+        }
+
+    async def close(self) -> None:
+        await self._text.aclose()
+        await self._binary.aclose()
+        await self._text.connection_pool.disconnect()
+        await self._binary.connection_pool.disconnect()
+
+
+_manager: Optional[RedisManager] = None
+
+
+def init_redis_manager() -> RedisManager:
+    global _manager
+    if _manager is None:
+        _manager = RedisManager(
+            config.REDIS_URL,
+            max_connections=config.REDIS_MAX_CONNECTIONS,
+            pool_timeout=config.REDIS_POOL_TIMEOUT,
+            health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+            connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+        )
+        print(f"{Colors.GREEN}[RedisManager] Pools ready (max {config.REDIS_MAX_CONNECTIONS} each)")
+    return _manager
+
+
+def get_redis_manager() -> RedisManager:
+    return _manager or init_redis_manager()
+
+
+def get_redis(decode: bool = True) -> redis.Redis:
+    return get_redis_manager().client(decode)
+
+
+async def close_redis_manager() -> None:
+    global _manager
+    if _manager is not None:
+        await _manager.close()
+        _manager = None
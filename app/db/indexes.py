@@ -0,0 +1,246 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from app.config.credentials_config import config
+from app.db.connection import get_db
+from app.utils.printcolors import Colors
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One declared index. `collection` is the name of the config attribute."""
+
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    name: str
+    unique: bool = False
+    sparse: bool = False
+    expire_after_seconds: Optional[int] = None
+    partial_filter: Optional[Dict[str, Any]] = field(default=None, hash=False)
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        return options
+
+
+INDEXES: List[IndexSpec] = [
+    # WhatsApp onboarding sessions: one document per sender, expired by TTL.
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_WHATSAPP_SESSIONS",
+        (("sender_id", ASCENDING),),
+        "sender_id_unique",
+        unique=True,
+    ),
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_WHATSAPP_SESSIONS",
+        (("last_active_at", ASCENDING),),
+        "last_active_at_ttl",
+        expire_after_seconds=config.WHATSAPP_SESSION_TTL_SECONDS,
+    ),
+    # Conversation logs are read per thread, newest first.
+    IndexSpec(
+        "MONGODB_COLLECTION_WHATSAPP_MESSAGES",
+        (("thread_id", ASCENDING), ("timestamp", DESCENDING)),
+        "thread_id_timestamp",
+    ),
+    IndexSpec(
+        "MONGODB_WHATSAPP_ADMIN_INFLUENCER",
+        (("thread_id", ASCENDING), ("timestamp", DESCENDING)),
+        "thread_id_timestamp",
+    ),
+    IndexSpec(
+        "MONGODB_WHATSAPP_ADMIN_COMPANY",
+        (("thread_id", ASCENDING), ("negotiation_id", ASCENDING)),
+        "thread_id_negotiation_id",
+    ),
+    IndexSpec(
+        "MONGODB_WHATSAPP_NEGOTIATION",
+        (("thread_id", ASCENDING), ("timestamp", DESCENDING)),
+        "thread_id_timestamp",
+    ),
+    IndexSpec(
+        "MONGODB_NEGOTIATION_HISTORY",
+        (("thread_id", ASCENDING), ("campaign_id", ASCENDING), ("_id", ASCENDING)),
+        "thread_id_campaign_id",
+    ),
+    # Evaluation reads LLM-labelled intents, newest first.
+    IndexSpec(
+        "MONGODB_NEGOTIATION_INTENT_LOG",
+        (("classifier", ASCENDING), ("created_at", DESCENDING)),
+        "classifier_created_at",
+    ),
+    # Per-thread control documents.
+    IndexSpec(
+        "MONGODB_AGENT_CONTROL",
+        (("thread_id", ASCENDING),),
+        "thread_id",
+    ),
+    IndexSpec(
+        "MONGODB_NEGOTIATION_AGENT_CONTROLS",
+        (("thread_id", ASCENDING),),
+        "thread_id",
+    ),
+    IndexSpec(
+        "MONGODB_NEGOTIATION_AGENT_CONTROLS",
+        (("_updated_at", DESCENDING),),
+        "updated_at",
+    ),
+    IndexSpec(
+        "MONGODB_NEGOTIATION_AGENT_CONTROLS",
+        (("campaign_id", ASCENDING), ("negotiation_status", ASCENDING)),
+        "campaign_id_negotiation_status",
+    ),
+    IndexSpec(
+        "MONGODB_INSTAGRAM_SESSIONS",
+        (("thread_id", ASCENDING),),
+        "thread_id",
+    ),
+    # Campaign pipeline.
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_CAMPAIGNS",
+        (("user_id", ASCENDING), ("created_at", DESCENDING)),
+        "user_id_created_at",
+    ),
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_CAMPAIGNS",
+        (("status", ASCENDING), ("created_at", DESCENDING)),
+        "status_created_at",
+    ),
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_CAMPAIGN_INFLUENCERS",
+        (("campaign_id", ASCENDING), ("influencer_id", ASCENDING), ("platform", ASCENDING)),
+        "campaign_id_influencer_id_platform",
+    ),
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_GENERATED_INFLUENCERS",
+        (("campaign_id", ASCENDING),),
+        "campaign_id",
+    ),
+    IndexSpec(
+        "MONGODB_CAMPAIGN_BRIEF_GENERATION",
+        (("user_id", ASCENDING), ("version", DESCENDING)),
+        "user_id_version",
+    ),
+    # Users are looked up by login email and WhatsApp phone.
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_USERS",
+        (("email", ASCENDING),),
+        "email",
+    ),
+    IndexSpec(
+        "MONGODB_ATLAS_COLLECTION_USERS",
+        (("phone", ASCENDING),),
+        "phone",
+        sparse=True,
+    ),
+    IndexSpec(
+        "MONGODB_CONTENT_FEEDBACK",
+        (("feedback_id", ASCENDING),),
+        "feedback_id",
+    ),
+]
+
+
+def _describe(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize an `index_information()` entry to the shape of `IndexSpec.options`."""
+    described = {"keys": tuple((k, int(v)) for k, v in info.get("key", []))}
+    for option in ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression"):
+        if option in info:
+            described[option] = info[option]
+    return described
+
+
+def _expected(spec: IndexSpec) -> Dict[str, Any]:
+    expected = {"keys": spec.keys}
+    expected.update({k: v for k, v in spec.options().items() if k != "name"})
+    return expected
+
+
+async def check_indexes(create: bool = False) -> Dict[str, Any]:
+    """
+    Compare the declared INDEXES with what exists in MongoDB.
+
+    Indexes that are missing are created when `create` is true. Indexes whose
+    keys or options differ from their declaration are reported as drift and left
+    untouched (dropping an index is a decision for a human). Indexes present in a
+    managed collection but not declared are listed as unmanaged.
+    """
+    db = get_db()
+    report: Dict[str, List[Dict[str, Any]]] = {
+        "created": [],
+        "missing": [],
+        "drift": [],
+        "unmanaged": [],
+        "errors": [],
+    }
+
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in INDEXES:
+        collection_name = getattr(config, spec.collection, None)
+        if collection_name:
+            by_collection.setdefault(collection_name, []).append(spec)
+
+    for collection_name, specs in by_collection.items():
+        collection = db.get_collection(collection_name)
+        try:
+            existing = await collection.index_information()
+        except OperationFailure:
+            # Collection does not exist yet.
+            existing = {}
+
+        for spec in specs:
+            entry = {"collection": collection_name, "name": spec.name}
+            info = existing.get(spec.name)
+            if info is None:
+                if not create:
+                    report["missing"].append(entry)
+                    continue
+                try:
+                    await collection.create_index(list(spec.keys), **spec.options())
+                    report["created"].append(entry)
+                except Exception as e:
+                    report["errors"].append({**entry, "error": str(e)})
+                continue
+
+            actual = _describe(info)
+            expected = _expected(spec)
+            if actual != expected:
+                report["drift"].append({**entry, "expected": expected, "actual": actual})
+
+        declared = {spec.name for spec in specs}
+        for name in existing:
+            if name != "_id_" and name not in declared:
+                report["unmanaged"].append({"collection": collection_name, "name": name})
+
+    return report
+
+
+async def ensure_indexes() -> Dict[str, Any]:
+    """Create any missing declared indexes. Safe to run on every startup."""
+    report = await check_indexes(create=True)
+    print(
+        f"{Colors.GREEN}[ensure_indexes] created={len(report['created'])} "
+        f"drift={len(report['drift'])} unmanaged={len(report['unmanaged'])} "
+        f"errors={len(report['errors'])}"
+    )
+    for item in report["drift"]:
+        print(f"{Colors.YELLOW}[ensure_indexes] Drift on {item['collection']}.{item['name']}")
+    for item in report["errors"]:
+        print(
+            f"{Colors.RED}[ensure_indexes] Failed on {item['collection']}.{item['name']}: {item['error']}"
+        )
+    return report
+
+
+async def index_drift_report() -> Dict[str, Any]:
+    """Read-only view of `check_indexes` for the admin API."""
+    return await check_indexes(create=False)
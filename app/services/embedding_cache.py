@@ -0,0 +1,150 @@
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import redis.asyncio as redis
+from langchain_openai.embeddings import OpenAIEmbeddings
+from app.config.credentials_config import config
+from app.core.redis_manager import get_redis
+from app.utils.printcolors import Colors
+
+EMBEDDING_CACHE_PREFIX = "embeddings"
+
+
+def normalize_query_text(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def _field_for(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(raw: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(raw)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for query embeddings keyed by (model, normalized text).
+
+    - Tier 1: in-process LRU bounded by `max_entries`.
+    - Tier 2: one Redis string per entry (`embeddings:<model>:<sha1>`), each
+      with its own TTL, shared by every worker.
+    Misses from both tiers are embedded in a single batched OpenAI call. The
+    normalized text only forms the key; the model receives the first original
+    query seen for it, so vectors match what an uncached call would return.
+    """
+
+    def __init__(self, model: str, max_entries: int, ttl_seconds: int) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_prefix = f"{EMBEDDING_CACHE_PREFIX}:{model}"
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+
+    def _get_embeddings(self) -> OpenAIEmbeddings:
+        if self._embeddings is None:
+            self._embeddings = OpenAIEmbeddings(
+                api_key=config.OPENAI_API_KEY,
+                model=self.model,
+            )
+        return self._embeddings
+
+    def _get_redis(self) -> Optional[redis.Redis]:
+        # Vectors are stored as packed bytes, so this uses the binary pool.
+        return get_redis(decode=False) if config.REDIS_URL else None
+
+    def _local_get(self, field: str) -> Optional[List[float]]:
+        vector = self._local.get(field)
+        if vector is not None:
+            self._local.move_to_end(field)
+        return vector
+
+    def _local_put(self, field: str, vector: List[float]) -> None:
+        self._local[field] = vector
+        self._local.move_to_end(field)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _redis_get_many(self, fields: List[str]) -> Dict[str, List[float]]:
+        client = self._get_redis()
+        if client is None or not fields:
+            return {}
+        try:
+            raw_values = await client.mget([f"{self.redis_prefix}:{f}" for f in fields])
+        except Exception as e:
+            print(f"{Colors.RED}[EmbeddingCache] Redis read failed: {e}")
+            return {}
+        return {
+            field: _unpack(raw) for field, raw in zip(fields, raw_values) if raw
+        }
+
+    async def _redis_put_many(self, vectors: Dict[str, List[float]]) -> None:
+        client = self._get_redis()
+        if client is None or not vectors:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for field, vector in vectors.items():
+                    pipe.set(
+                        f"{self.redis_prefix}:{field}", _pack(vector), ex=self.ttl_seconds
+                    )
+                await pipe.execute()
+        except Exception as e:
+            print(f"{Colors.RED}[EmbeddingCache] Redis write failed: {e}")
+
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        fields = [_field_for(normalize_query_text(q)) for q in queries]
+        found: Dict[str, List[float]] = {}
+
+        for field in fields:
+            vector = self._local_get(field)
+            if vector is not None:
+                found[field] = vector
+
+        missing = list(dict.fromkeys(f for f in fields if f not in found))
+        for field, vector in (await self._redis_get_many(missing)).items():
+            found[field] = vector
+            self._local_put(field, vector)
+
+        to_embed: Dict[str, str] = {}
+        for field, text in zip(fields, queries):
+            if field not in found:
+                to_embed.setdefault(field, text)
+        if to_embed:
+            vectors = await self._get_embeddings().aembed_documents(
+                list(to_embed.values())
+            )
+            fresh = dict(zip(to_embed.keys(), vectors))
+            for field, vector in fresh.items():
+                found[field] = vector
+                self._local_put(field, vector)
+            await self._redis_put_many(fresh)
+
+        return [found[field] for field in fields]
+
+    async def embed_query(self, query: str) -> List[float]:
+        return (await self.embed_queries([query]))[0]
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+
+
+def get_embedding_cache(model: Optional[str] = None) -> EmbeddingCache:
+    model = model or config.EMBEDDING_MODEL
+    cache = _caches.get(model)
+    if cache is None:
+        cache = EmbeddingCache(
+            model=model,
+            max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl_seconds=config.EMBEDDING_CACHE_TTL_SECONDS,
+        )
+        _caches[model] = cache
+    return cache
@@ -1,37 +1,17 @@
 import json
-import time
 import logging
-from typing import Set
 from datetime import datetime
 from fastapi import BackgroundTasks, Request, Response
 from fastapi.responses import JSONResponse
 import asyncio
 from app.agents.Instagram.invoke.instagram_agent import instagram_negotiation_agent
 from app.config import config
+from app.core.dedup import get_deduplicator
 from app.model.Instagram.instagram_message import InstagramMessageModel
 from app.services.websocket_manager import ws_manager
 
 logger = logging.getLogger(__name__)
 
-# -------------------------
-# Message deduplication cache
-# -------------------------
-PROCESSED_MESSAGES: Set[str] = set()
-PROCESSED_TTL = 3600  # 1 hour
-
-
-def cleanup_processed_messages(now: float):
-    """Clear processed message cache periodically."""
-    if not hasattr(cleanup_processed_messages, "last_run"):
-        cleanup_processed_messages.last_run = now
-        return
-
-    if now - cleanup_processed_messages.last_run > PROCESSED_TTL:
-        PROCESSED_MESSAGES.clear()
-        cleanup_processed_messages.last_run = now
-        logger.info("Processed message cache cleared")
-
-
 # -------------------------
 # Helpers
 # -------------------------
@@ -94,9 +74,6 @@ async def handle_webhook(request: Request, background_tasks: BackgroundTasks):
     except json.JSONDecodeError:
         return JSONResponse({"error": "Invalid JSON body"}, status_code=400)
 
-    now = time.time()
-    cleanup_processed_messages(now)
-
     for entry in body.get("entry", []):
         # Messenger payload
         for messaging_event in entry.get("messaging", []):
@@ -123,18 +100,22 @@ async def process_message_event(
         return
 
     message_id = message.get("mid")
-    if not message_id or message_id in PROCESSED_MESSAGES:
+    deduplicator = get_deduplicator("instagram")
+    if not message_id or await deduplicator.is_duplicate(message_id):
         return
 
-    PROCESSED_MESSAGES.add(message_id)
-
     psid = messaging_event.get("sender", {}).get("id")
     payload = message_payload(
         psid=psid,
         text=message.get("text", ""),
         attachments=message.get("attachments", []),
     )
-    await store_and_broadcast(payload, background_tasks)
+    try:
+        await store_and_broadcast(payload, background_tasks)
+    except Exception:
+        await deduplicator.release(message_id)
+        raise
+    deduplicator.mark_seen(message_id)
 
 
 async def store_and_broadcast(payload: dict, background_tasks: BackgroundTasks):
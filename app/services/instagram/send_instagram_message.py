@@ -1,24 +1,18 @@
-import httpx
 from app.config import config
 from app.core.exception import InternalServerErrorException
+from app.services.meta_graph_client import get_meta_graph_client
 
 
 async def Send_Insta_Message(message: str, recipient_id: str):
     if not message:
         raise InternalServerErrorException(message="Message is required")
     try:
-        PAGE_ACCESS_TOKEN = config.PAGE_ACCESS_TOKEN
-        backend_url = (
-            f"https://graph.facebook.com/{config.IG_GRAPH_API_VERSION}/me/messages"
+        await get_meta_graph_client().send_instagram_text(
+            recipient_id,
+            message,
+            access_token=config.PAGE_ACCESS_TOKEN,
+            api_version=config.IG_GRAPH_API_VERSION,
         )
-        headers = {
-            "Authorization": f"Bearer {PAGE_ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-        }
-        payload = {"recipient": {"id": recipient_id}, "message": {"text": message}}
-
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.post(backend_url, json=payload, headers=headers)
-            print(f"Message sent Successfully to {recipient_id}: {message}")
+        print(f"Message sent Successfully to {recipient_id}: {message}")
     except Exception as e:
         raise InternalServerErrorException(message=str(e)) from e
@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+import redis.asyncio as redis
+from agents import Agent, Runner
+from pydantic import TypeAdapter
+from app.config.credentials_config import config
+from app.core.redis_manager import get_redis
+from app.utils import prompts
+from app.utils.printcolors import Colors
+
+LLM_CACHE_PREFIX = "llm"
+
+
+def _prompts_version() -> str:
+    try:
+        with open(prompts.__file__, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()[:12]
+    except OSError:
+        return "unversioned"
+
+
+# Part of every key, so editing prompts.py starts a fresh keyspace; entries
+# under the old version are never read again and expire with their TTL.
+PROMPTS_VERSION = _prompts_version()
+
+
+def normalize_input(value: Any) -> str:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _output_schema(output_type) -> str:
+    if output_type is None:
+        return "text"
+    try:
+        return json.dumps(TypeAdapter(output_type).json_schema(), sort_keys=True)
+    except Exception:
+        return repr(output_type)
+
+
+def cache_key(agent: Agent, input: Any) -> str:
+    """
+    Hash of everything that determines the agent's output for `input`.
+
+    Instructions, model and settings, output schema and guardrail names are
+    hashed with the normalized input; a change to any of them is a new key.
+    """
+    parts = [
+        str(agent.instructions),
+        str(agent.model or os.getenv("OPENAI_DEFAULT_MODEL", "default")),
+        repr(agent.model_settings),
+        _output_schema(agent.output_type),
+        ",".join(g.get_name() for g in agent.input_guardrails),
+        ",".join(g.get_name() for g in agent.output_guardrails),
+        normalize_input(input),
+    ]
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return f"{LLM_CACHE_PREFIX}:{PROMPTS_VERSION}:{agent.name}:{digest}"
+
+
+@dataclass
+class CachedRunResult:
+    """Stands in for `RunResult` on a cache hit; call sites only read `final_output`."""
+
+    final_output: Any
+    cached: bool = True
+
+
+def _dump(output: Any) -> str:
+    if hasattr(output, "model_dump"):
+        output = output.model_dump(mode="json")
+    return json.dumps(output, default=str)
+
+
+def _load(raw: str, output_type) -> Any:
+    data = json.loads(raw)
+    if output_type is None:
+        return data
+    return TypeAdapter(output_type).validate_python(data)
+
+
+def _get_redis() -> Optional[redis.Redis]:
+    return get_redis() if config.REDIS_URL else None
+
+
+def cache_llm(ttl_seconds: Optional[int] = None):
+    """
+    Decorator for `Runner.run`-shaped callables adding a Redis result cache.
+
+        cached_run = cache_llm()(Runner.run)
+        result = await cached_run(agent, input=text)
+
+    Only successful runs are stored, so guardrail tripwires and errors are
+    never cached. Agents with tools or handoffs bypass the cache, since their
+    runs have side effects. Redis failures fall through to the model call.
+    """
+
+    def decorator(run):
+        @functools.wraps(run)
+        async def wrapper(starting_agent: Agent, input: Any, **kwargs):
+            client = _get_redis()
+            if (
+                not config.LLM_CACHE_ENABLED
+                or client is None
+                or starting_agent.tools
+                or starting_agent.handoffs
+            ):
+                return await run(starting_agent, input, **kwargs)
+
+            key = cache_key(starting_agent, input)
+            try:
+                raw = await client.get(key)
+                if raw is not None:
+                    return CachedRunResult(_load(raw, starting_agent.output_type))
+            except Exception as e:
+                print(f"{Colors.RED}[LLMCache] Read failed for {starting_agent.name}: {e}")
+
+            result = await run(starting_agent, input, **kwargs)
+            try:
+                await client.set(
+                    key,
+                    _dump(result.final_output),
+                    ex=ttl_seconds or config.LLM_CACHE_TTL_SECONDS,
+                )
+            except Exception as e:
+                print(f"{Colors.RED}[LLMCache] Write failed for {starting_agent.name}: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+cached_run = cache_llm()(Runner.run)
@@ -0,0 +1,197 @@
+from typing import Any, Dict, List, Optional
+import httpx
+from app.config.credentials_config import config
+from app.utils.printcolors import Colors
+
+GRAPH_BASE_URL = "https://graph.facebook.com"
+
+# Per-endpoint timeouts: message sends should fail fast, media transfers get longer reads.
+MESSAGE_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+LOOKUP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+MEDIA_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+class MetaGraphClient:
+    """
+    App-lifetime client for the Meta Graph API (WhatsApp Cloud API and Instagram).
+
+    One pooled `httpx.AsyncClient` with HTTP/2 keep-alive is shared by every caller,
+    so outbound messages reuse warm TLS connections to graph.facebook.com instead
+    of opening a new client per call.
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        phone_number_id: str,
+        api_version: str,
+        max_connections: int,
+        max_keepalive: int,
+    ) -> None:
+        self.access_token = access_token
+        self.phone_number_id = phone_number_id
+        self.api_version = api_version
+        self._client = httpx.AsyncClient(
+            base_url=GRAPH_BASE_URL,
+            http2=True,
+            timeout=MESSAGE_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=30.0,
+            ),
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def _auth_headers(self, access_token: Optional[str] = None) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {access_token or self.access_token}"}
+
+    async def send_message(self, payload: Dict[str, Any]) -> httpx.Response:
+        """POST a WhatsApp Cloud API message payload to `/<phone_number_id>/messages`."""
+        return await self._client.post(
+            f"/{self.api_version}/{self.phone_number_id}/messages",
+            headers=self._auth_headers(),
+            json={"messaging_product": "whatsapp", **payload},
+            timeout=MESSAGE_TIMEOUT,
+        )
+
+    async def send_text(self, to: str, body: str) -> httpx.Response:
+        return await self.send_message(
+            {"to": to, "type": "text", "text": {"body": body}}
+        )
+
+    async def send_template(
+        self,
+        to: str,
+        name: str,
+        language_code: str = "en",
+        components: Optional[List[Dict[str, Any]]] = None,
+    ) -> httpx.Response:
+        template: Dict[str, Any] = {"name": name, "language": {"code": language_code}}
+        if components:
+            template["components"] = components
+        return await self.send_message(
+            {"to": to, "type": "template", "template": template}
+        )
+
+    async def send_interactive(
+        self, to: str, interactive: Dict[str, Any]
+    ) -> httpx.Response:
+        return await self.send_message(
+            {"to": to, "type": "interactive", "interactive": interactive}
+        )
+
+    async def send_document(
+        self,
+        to: str,
+        media_id: str,
+        filename: str,
+        caption: Optional[str] = None,
+    ) -> httpx.Response:
+        document: Dict[str, Any] = {"id": media_id, "filename": filename}
+        if caption:
+            document["caption"] = caption
+        return await self.send_message(
+            {"to": to, "type": "document", "document": document}
+        )
+
+    async def get_media(
+        self, media_id: str, api_version: Optional[str] = None
+    ) -> Optional[bytes]:
+        """Resolve a WhatsApp media id to its download URL and fetch the binary."""
+        response = await self._client.get(
+            f"/{api_version or self.api_version}/{media_id}",
+            headers=self._auth_headers(),
+            timeout=LOOKUP_TIMEOUT,
+        )
+        response.raise_for_status()
+        download_url = response.json().get("url")
+        if not download_url:
+            print(f"{Colors.RED}[MetaGraphClient.get_media] No download URL for {media_id}")
+            return None
+        media_response = await self._client.get(
+            download_url, headers=self._auth_headers(), timeout=MEDIA_TIMEOUT
+        )
+        media_response.raise_for_status()
+        return media_response.content
+
+    async def upload_media(
+        self, file_bytes: bytes, mime_type: str, filename: str
+    ) -> Optional[str]:
+        """Upload media to the WhatsApp media endpoint and return its media id."""
+        response = await self._client.post(
+            f"/{self.api_version}/{self.phone_number_id}/media",
+            headers=self._auth_headers(),
+            data={"messaging_product": "whatsapp", "type": mime_type},
+            files={"file": (filename, file_bytes, mime_type)},
+            timeout=MEDIA_TIMEOUT,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        media_id = payload.get("id")
+        if not media_id:
+            print(f"{Colors.RED}[MetaGraphClient.upload_media] No media id: {payload}")
+        return media_id
+
+    async def get_object(
+        self,
+        object_id: str,
+        fields: str,
+        access_token: str,
+        api_version: Optional[str] = None,
+    ) -> httpx.Response:
+        """Read fields of a Graph object (e.g. an Instagram-scoped user id)."""
+        return await self._client.get(
+            f"/{api_version or self.api_version}/{object_id}",
+            params={"fields": fields, "access_token": access_token},
+            timeout=LOOKUP_TIMEOUT,
+        )
+
+    async def send_instagram_text(
+        self,
+        recipient_id: str,
+        text: str,
+        access_token: str,
+        api_version: Optional[str] = None,
+    ) -> httpx.Response:
+        return await self._client.post(
+            f"/{api_version or self.api_version}/me/messages",
+            headers=self._auth_headers(access_token),
+            json={"recipient": {"id": recipient_id}, "message": {"text": text}},
+            timeout=MESSAGE_TIMEOUT,
+        )
+
+
+_meta_client: Optional[MetaGraphClient] = None
+
+
+def init_meta_graph_client() -> MetaGraphClient:
+    global _meta_client
+    if _meta_client is None or _meta_client.is_closed:
+        _meta_client = MetaGraphClient(
+            access_token=config.META_WHATSAPP_ACCESSSTOKEN,
+            phone_number_id=config.WHATSAPP_PHONE_NUMBER_ID,
+            api_version=config.META_MESSAGES_API_VERSION,
+            max_connections=config.META_HTTP_MAX_CONNECTIONS,
+            max_keepalive=config.META_HTTP_MAX_KEEPALIVE,
+        )
+        print(f"{Colors.GREEN}Meta Graph client initialized")
+    return _meta_client
+
+
+def get_meta_graph_client() -> MetaGraphClient:
+    """Return the shared client; scripts running outside the app lifespan get one lazily."""
+    return init_meta_graph_client()
+
+
+async def close_meta_graph_client() -> None:
+    global _meta_client
+    if _meta_client is not None:
+        await _meta_client.close()
+        _meta_client = None
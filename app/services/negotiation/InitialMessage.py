@@ -1,7 +1,7 @@
-import httpx
 from pymongo.collection import ObjectId
 from app.config.credentials_config import config
 from app.db.connection import get_db
+from app.services.meta_graph_client import get_meta_graph_client
 from app.services.whatsapp.save_negotiation_message import save_negotiation_message
 from app.utils.Enums.user_enum import SenderType
 from bson.errors import InvalidId
@@ -75,19 +75,12 @@ async def NegotiationInitialMessage(influencer_id: str):
     if not phone_number:
         return {"status": "error", "message": "Influencer has no phone number"}
 
-    headers = {
-        "Authorization": f"Bearer {config.META_WHATSAPP_ACCESSSTOKEN}",
-        "Content-Type": "application/json",
-    }
-
-    payload_meta = {
-        "messaging_product": "whatsapp",
-        "to": phone_number,
-        "type": "template",
-        "template": {
-            "name": "negotiation",
-            "language": {"code": "en"},
-            "components": [
+    try:
+        await get_meta_graph_client().send_template(
+            to=phone_number,
+            name="negotiation",
+            language_code="en",
+            components=[
                 {
                     "type": "body",
                     "parameters": [
@@ -95,15 +88,7 @@ async def NegotiationInitialMessage(influencer_id: str):
                     ],
                 }
             ],
-        },
-    }
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.post(
-                "https://graph.facebook.com/v22.0/967002123161751/messages",
-                headers=headers,
-                json=payload_meta,
-            )
+        )
     except Exception as e:
         print(f"[NegotiationInitialMessage] Error sending WhatsApp message: {e}")
         return {"status": "error", "message": f"Error sending WhatsApp message: {e}"}
@@ -147,14 +132,15 @@ async def NegotiationInitialMessage(influencer_id: str):
             "agent_paused": False,
             "human_takeover": False,
             "timestamp": datetime.now(timezone.utc).isoformat(),
-            "history": [
-                {
-                    "sender_type": "AI",
-                    "message": personalized_message,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                },
-            ],
         },
+        new_messages=[
+            {
+                "sender_type": "AI",
+                "message": personalized_message,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            },
+        ],
+        reset_history=True,
     )
     return {
         "status": "success",
@@ -6,6 +6,9 @@ from app.utils.mongo_serializer import serialize_mongo_data
 from bson import ObjectId
 from bson.errors import InvalidId
 from app.config.credentials_config import config
+from app.agents.WhatsappNegotiation.state.negotiation_state import (
+    get_negotiation_history,
+)
 
 
 async def get_all_negotiation_controls(
@@ -67,7 +70,7 @@ async def get_negotiation_control_detail(_id: str) -> Dict[str, Any]:
         return {
             "name": serialized_doc.get("name"),
             "phone": serialized_doc.get("sender_id"),
-            "history": serialized_doc.get("history", []),
+            "history": serialize_mongo_data(await get_negotiation_history(document)),
             "conversation_mode": serialized_doc.get("conversation_mode"),
             "admin_approved": serialized_doc.get("admin_approved"),
             "Brand_approved": serialized_doc.get("Brand_approved"),
@@ -88,6 +91,9 @@ async def delete_negotiation_control(thread_id: str) -> Dict[str, Any]:
         result = await collection.delete_one({"thread_id": thread_id})
         if result.deleted_count == 0:
             return None
+        await db.get_collection(config.MONGODB_NEGOTIATION_HISTORY).delete_many(
+            {"thread_id": thread_id}
+        )
 
         return {
             "message": "Negotiation control deleted successfully",
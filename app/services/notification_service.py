@@ -26,8 +26,11 @@ async def admin_ws(websocket: WebSocket):
         websocket,
         role="ADMIN",
     )
+    last_seq = websocket.query_params.get("last_seq")
+    if last_seq is not None:
+        await ws_manager.resume(websocket, last_seq)
     try:
         while True:
-            await websocket.receive_text()
+            await ws_manager.handle_client_frame(websocket, await websocket.receive_text())
     except Exception:
         await ws_manager.disconnect(websocket)
@@ -1,98 +1,395 @@
-# from typing import Set
-# from langchain_mongodb import MongoDBAtlasVectorSearch
-# from langchain_openai import OpenAIEmbeddings
-# from app.config.credentials_config import config
-# from app.db.connection import get_pymongo_db
-# from app.utils.helpers import (
-#     extract_influencer_data,
-#     filter_influencer_data,
-#     normalize_country,
-#     normalize_followers,
-#     parse_followers_list,
-# )
-
-
-# async def vector_search_influencers(
-#     *,
-#     platform_name: str,
-#     mongo_collection: str,
-#     category,
-#     followers,
-#     country,
-#     limit,
-#     generated_ids=None,
-#     rejected_ids=None,
-# ):
-#     excluded_ids = set(generated_ids or []) | set(rejected_ids or [])
-
-#     categories = category or [""]
-#     countries = [normalize_country(c) for c in country] if country else [""]
-#     followers_list = normalize_followers(followers) if followers else [""]
-
-#     follower_ranges = parse_followers_list(followers_list)
-
-#     embeddings = OpenAIEmbeddings(
-#         api_key=config.OPENAI_API_KEY,
-#         model=config.EMBEDDING_MODEL,
-#     )
-
-#     db = get_pymongo_db()
-#     collection = db[mongo_collection]
-
-#     vectorstore = MongoDBAtlasVectorSearch(
-#         collection=collection,
-#         embedding=embeddings,
-#         index_name="vector_index",
-#         embedding_key="embedding",
-#         text_key="pageContent",
-#         relevance_score_fn="cosine",
-#     )
-
-#     seen_usernames: Set[str] = set()
-#     results = []
-
-#     target_limit = limit * 2
-#     per_query_limit = max(50, target_limit * 2)
-
-#     for cat in categories:
-#         for cntry in countries:
-#             for follower_range in followers_list:
-#                 query = (
-#                     f"{platform_name} influencer {cat} "
-#                     f"from {cntry} with {follower_range} followers"
-#                 )
-
-#                 docs = vectorstore.similarity_search(query, k=per_query_limit)
-
-#                 for doc in docs:
-#                     influencer = extract_influencer_data(doc, platform_name)
-
-#                     influencer_id = influencer.get("id")
-#                     username = influencer.get("username")
-
-#                     if not influencer_id or influencer_id in excluded_ids:
-#                         continue
-#                     if username in seen_usernames:
-#                         continue
-
-#                     if not filter_influencer_data(
-#                         influencer,
-#                         parse_followers_list([follower_range]),
-#                         follower_ranges,
-#                         cntry,
-#                     ):
-#                         continue
-
-#                     seen_usernames.add(username)
-#                     results.append(influencer)
-
-#                     if len(results) >= target_limit:
-#                         break
-
-#                 if len(results) >= target_limit:
-#                     break
-
-#     return {
-#         "data": results[:limit],
-#         "message": "Success" if results else "No influencers found",
-#     }
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from langchain_core.documents import Document
+from langfuse import observe
+from pymongo import UpdateOne
+from app.config.credentials_config import config
+from app.db.connection import get_db
+from app.services.embedding_cache import get_embedding_cache
+from app.utils.helpers import (
+    extract_influencer_data,
+    filter_influencer_data,
+    normalize_country,
+    normalize_country_key,
+    normalize_followers,
+    parse_followers_list,
+    search_filter_fields,
+)
+from app.utils.printcolors import Colors
+
+VECTOR_INDEX_NAME = "vector_index"
+EMBEDDING_KEY = "embedding"
+NUM_CANDIDATES_FACTOR = 10
+# Candidates already satisfy country/follower/exclusion filters when pre-filtering,
+# so only a small slack for cross-combination duplicates is needed.
+PREFILTER_SLACK = 10
+VECTOR_FILTER_FIELDS = ["followers_numeric", "country_normalized", "id"]
+
+PLATFORM_SEARCH_CONFIG: Dict[str, Dict[str, str]] = {
+    "instagram": {
+        "label": "Instagram",
+        "collection": config.MONGODB_ATLAS_COLLECTION_INSTAGRAM,
+        "text_key": "pageContent",
+    },
+    "tiktok": {
+        "label": "TikTok",
+        "collection": config.MONGODB_ATLAS_COLLECTION_TIKTOK,
+        "text_key": "pageContent",
+    },
+    "youtube": {
+        "label": "YouTube",
+        "collection": config.MONGODB_ATLAS_COLLECTION_YOUTUBE,
+        "text_key": "text",
+    },
+}
+
+
+def get_platform_config(platform: str) -> Dict[str, str]:
+    settings = PLATFORM_SEARCH_CONFIG.get((platform or "").strip().lower())
+    if not settings:
+        raise ValueError(f"Unsupported platform: {platform}")
+    return settings
+
+
+def build_search_combinations(
+    category: Optional[List[str]],
+    country: Optional[List[str]],
+    followers: Optional[List[str]],
+) -> List[Tuple[str, str, str]]:
+    """Category x country x follower-range combinations, in search priority order."""
+    categories = category if category else [""]
+    countries = [normalize_country(c) for c in country] if country else [""]
+    followers_list = normalize_followers(followers) if followers else [""]
+    return [
+        (cat, cntry, follower_range)
+        for cat in categories
+        for cntry in countries
+        for follower_range in followers_list
+    ]
+
+
+def build_query_text(label: str, cat: str, cntry: str, follower_range: str) -> str:
+    return f"{label} influencer {cat} from {cntry} with {follower_range} followers"
+
+
+def build_prefilter(
+    cntry: str,
+    follower_ranges: List[Tuple[int, int]],
+    excluded_ids: Optional[Set[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Express country, follower-range and exclusion constraints as a `$vectorSearch` filter."""
+    if not config.VECTOR_SEARCH_PREFILTER:
+        return None
+    clauses: List[Dict[str, Any]] = []
+    country_key = normalize_country_key(cntry)
+    if country_key:
+        clauses.append({"country_normalized": {"$eq": country_key}})
+    if follower_ranges:
+        range_clauses = [
+            {"followers_numeric": {"$gte": min_count, "$lte": max_count}}
+            for min_count, max_count in follower_ranges
+        ]
+        clauses.append(
+            range_clauses[0] if len(range_clauses) == 1 else {"$or": range_clauses}
+        )
+    if excluded_ids:
+        clauses.append({"id": {"$nin": sorted(excluded_ids)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class PlatformVectorStore:
+    """Warm handle on one platform collection's Atlas vector index."""
+
+    def __init__(self, platform: str, collection) -> None:
+        settings = get_platform_config(platform)
+        self.platform = platform
+        self.label = settings["label"]
+        self.text_key = settings["text_key"]
+        self.collection = collection
+
+    async def search(
+        self,
+        query_vector: List[float],
+        k: int,
+        search_filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Document]:
+        """Run one `$vectorSearch` aggregation on the async Motor client."""
+        vector_stage: Dict[str, Any] = {
+            "index": VECTOR_INDEX_NAME,
+            "path": EMBEDDING_KEY,
+            "queryVector": query_vector,
+            "numCandidates": k * NUM_CANDIDATES_FACTOR,
+            "limit": k,
+        }
+        if search_filter:
+            vector_stage["filter"] = search_filter
+        pipeline = [
+            {"$vectorSearch": vector_stage},
+            {"$set": {"score": {"$meta": "vectorSearchScore"}}},
+            {"$project": {EMBEDDING_KEY: 0}},
+        ]
+        docs = await self.collection.aggregate(pipeline).to_list(length=k)
+        return [
+            Document(page_content=str(doc.pop(self.text_key, "") or ""), metadata=doc)
+            for doc in docs
+        ]
+
+
+class InfluencerSearchService:
+    """
+    Platform-agnostic influencer discovery, built once at startup.
+
+    Holds one `PlatformVectorStore` per platform plus the shared embedding cache,
+    so search and regeneration reuse the same warm objects on every request.
+    """
+
+    def __init__(self, db) -> None:
+        self.embedding_cache = get_embedding_cache()
+        self.stores: Dict[str, PlatformVectorStore] = {
+            platform: PlatformVectorStore(
+                platform, db.get_collection(settings["collection"])
+            )
+            for platform, settings in PLATFORM_SEARCH_CONFIG.items()
+            if settings["collection"]
+        }
+
+    def get_store(self, platform: str) -> PlatformVectorStore:
+        store = self.stores.get((platform or "").strip().lower())
+        if not store:
+            raise ValueError(f"Unsupported platform: {platform}")
+        return store
+
+    async def iter_candidates(
+        self,
+        platform: str,
+        category: Optional[List[str]],
+        followers: Optional[List[str]],
+        country: Optional[List[str]],
+        exclude_ids: Optional[Set[str]] = None,
+        per_combination_limit: int = 50,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield deduplicated influencers that pass filtering, in combination order.
+
+        All combination queries are embedded in one batch and their vector searches
+        start concurrently; results are consumed as each one completes in order.
+        Breaking out of the iteration cancels searches that are still pending.
+        """
+        store = self.get_store(platform)
+        excluded_ids = {str(x) for x in (exclude_ids or set())}
+        combinations = build_search_combinations(category, country, followers)
+        all_follower_ranges = parse_followers_list([fr for _, _, fr in combinations])
+
+        queries = [build_query_text(store.label, *combo) for combo in combinations]
+        vectors = await self.embedding_cache.embed_queries(queries)
+        tasks = [
+            asyncio.create_task(
+                store.search(
+                    vector,
+                    per_combination_limit,
+                    search_filter=build_prefilter(
+                        cntry,
+                        parse_followers_list([follower_range]) or all_follower_ranges,
+                        excluded_ids,
+                    ),
+                )
+            )
+            for (_, cntry, follower_range), vector in zip(combinations, vectors)
+        ]
+
+        seen_usernames: Set[str] = set()
+        try:
+            for (_, cntry, follower_range), task in zip(combinations, tasks):
+                combination_ranges = parse_followers_list([follower_range])
+                for doc in await task:
+                    influencer = extract_influencer_data(doc, store.label)
+                    username = influencer.get("username")
+                    if not influencer.get("id") or not username:
+                        continue
+                    if username in seen_usernames:
+                        continue
+                    if str(influencer.get("id")) in excluded_ids:
+                        continue
+                    if not filter_influencer_data(
+                        influencer,
+                        combination_ranges,
+                        all_follower_ranges,
+                        cntry,
+                    ):
+                        continue
+                    seen_usernames.add(username)
+                    yield influencer
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def stream(
+        self,
+        platform: str,
+        category: List[str],
+        limit: int,
+        followers: List[str],
+        country: List[str],
+        exclude_ids: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield up to `limit * 2` influencers as soon as each one passes filtering."""
+        target_limit = limit * 2
+        if config.VECTOR_SEARCH_PREFILTER:
+            per_combination_limit = target_limit + PREFILTER_SLACK
+        else:
+            per_combination_limit = max(50, target_limit * 2)
+
+        candidates = self.iter_candidates(
+            platform,
+            category,
+            followers,
+            country,
+            exclude_ids=set(exclude_ids or []),
+            per_combination_limit=per_combination_limit,
+        )
+        yielded = 0
+        try:
+            async for influencer in candidates:
+                yield influencer
+                yielded += 1
+                if yielded >= target_limit:
+                    break
+        finally:
+            await candidates.aclose()
+
+    @observe(name="influencer_search")
+    async def search(
+        self,
+        platform: str,
+        category: List[str],
+        limit: int,
+        followers: List[str],
+        country: List[str],
+        exclude_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        results: List[Dict[str, Any]] = []
+        influencers = self.stream(
+            platform, category, limit, followers, country, exclude_ids=exclude_ids
+        )
+        try:
+            async for influencer in influencers:
+                results.append(influencer)
+        finally:
+            await influencers.aclose()
+
+        if not results:
+            return {
+                "data": [],
+                "message": "No influencers found for the selected filters.",
+            }
+        return {
+            "data": results,
+            "message": f"Found {len(results)} influencers.",
+        }
+
+    @observe(name="influencer_regenerate_one")
+    async def regenerate_one(
+        self,
+        platform: str,
+        category: Optional[List[str]],
+        followers: Optional[List[str]],
+        country: Optional[List[str]],
+        exclude_ids: Optional[Set[str]] = None,
+    ) -> Dict[str, Any]:
+        """Return the first unseen influencer matching the filters, or an empty result."""
+        per_combination_limit = (
+            1 + PREFILTER_SLACK if config.VECTOR_SEARCH_PREFILTER else 50
+        )
+        candidates = self.iter_candidates(
+            platform,
+            category,
+            followers,
+            country,
+            exclude_ids=exclude_ids,
+            per_combination_limit=per_combination_limit,
+        )
+        try:
+            async for influencer in candidates:
+                return influencer
+        finally:
+            await candidates.aclose()
+        return {
+            "data": [],
+            "message": "No influencers found for the selected filters.",
+        }
+
+
+_search_service: Optional[InfluencerSearchService] = None
+
+
+def init_influencer_search_service() -> InfluencerSearchService:
+    global _search_service
+    if _search_service is None:
+        _search_service = InfluencerSearchService(get_db())
+    return _search_service
+
+
+def get_influencer_search_service() -> InfluencerSearchService:
+    if _search_service is None:
+        raise RuntimeError("Error: Influencer search service not initialized.")
+    return _search_service
+
+
+async def materialize_search_fields(platform: str, batch_size: int = 500) -> Dict[str, Any]:
+    """
+    Backfill `followers_numeric` and `country_normalized` on a platform collection.
+
+    Influencers are imported outside this service, so nothing here writes these
+    fields on insert. Run this (via the admin materialize route) after every
+    import while `VECTOR_SEARCH_PREFILTER` is on; documents without the fields
+    are invisible to the vector pre-filters.
+    """
+    settings = get_platform_config(platform)
+    collection = get_db().get_collection(settings["collection"])
+    cursor = collection.find({}, {"_id": 1, "followers": 1, "country": 1})
+
+    updated = 0
+    operations: List[UpdateOne] = []
+    async for doc in cursor:
+        operations.append(
+            UpdateOne({"_id": doc["_id"]}, {"$set": search_filter_fields(doc)})
+        )
+        if len(operations) >= batch_size:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            operations = []
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+    return {"platform": platform, "updated": updated}
+
+
+async def ensure_vector_index_filters(platform: str) -> Dict[str, Any]:
+    """Add the pre-filter fields to the platform's Atlas vector index definition."""
+    settings = get_platform_config(platform)
+    collection = get_db().get_collection(settings["collection"])
+    indexes = await collection.list_search_indexes(VECTOR_INDEX_NAME).to_list(
+        length=None
+    )
+    if not indexes:
+        return {"platform": platform, "updated": False, "reason": "index not found"}
+
+    definition = indexes[0].get("latestDefinition") or {}
+    fields = list(definition.get("fields", []))
+    existing = {f.get("path") for f in fields if f.get("type") == "filter"}
+    missing = [path for path in VECTOR_FILTER_FIELDS if path not in existing]
+    if not missing:
+        return {"platform": platform, "updated": False, "missing": []}
+
+    fields.extend({"type": "filter", "path": path} for path in missing)
+    await collection.update_search_index(
+        VECTOR_INDEX_NAME, {**definition, "fields": fields}
+    )
+    print(
+        f"{Colors.GREEN}[ensure_vector_index_filters] {platform}: added filter fields {missing}"
+    )
+    return {"platform": platform, "updated": True, "missing": missing}
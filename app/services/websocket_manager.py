@@ -1,15 +1,244 @@
 from __future__ import annotations
 import asyncio
-from typing import Dict, Set
+import itertools
+import json
+import uuid
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+import redis.asyncio as redis
 from fastapi import WebSocket
+from app.config.credentials_config import config
+from app.core.background_tasks import spawn
+from app.core.redis_manager import get_redis
+from app.utils.printcolors import Colors
+
+SEND_TIMEOUT_SECONDS = 10.0
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_CLOSE = "close"
+# Application close code sent to clients evicted for not keeping up.
+SLOW_CONSUMER_CLOSE_CODE = 4008
+
+CLUSTER_MODE_LOCAL = "local"
+CLUSTER_MODE_REDIS = "redis"
+CLUSTER_CHANNEL = "ws:events"
+CLUSTER_SEQ_KEY = "ws:seq"
+REPLAY_STREAM = "ws:replay"
+RELAY_RETRY_SECONDS = 1.0
+RESYNC_EVENT_TYPE = "resync_required"
+
+# Stamp the next sequence onto both frames, append them to the capped replay
+# stream under the explicit id `<seq>-0`, and publish to peer nodes, atomically.
+# KEYS: seq counter, replay stream. ARGV: origin, target, key (JSON), data, bump,
+# maxlen, channel.
+APPEND_EVENT_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local function stamp(body)
+    if body == '' then
+        return ''
+    end
+    if body == '{}' then
+        return '{"seq":' .. seq .. '}'
+    end
+    return '{"seq":' .. seq .. ',' .. string.sub(body, 2)
+end
+local data = stamp(ARGV[4])
+local bump = stamp(ARGV[5])
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[6], seq .. '-0',
+    'target', ARGV[2], 'key', ARGV[3], 'data', data, 'bump', bump)
+redis.call('PUBLISH', ARGV[7], cjson.encode({
+    origin = ARGV[1], seq = seq, target = ARGV[2], key = ARGV[3],
+    data = data, bump = bump,
+}))
+return {seq, data, bump}
+"""
+
+TARGET_ALL = "all"
+TARGET_ROLE = "role"
+TARGET_USER = "user"
+TARGET_TOPICS = "topics"
+
+# Topic that receives the full payload of every conversation event.
+INBOX_TOPIC = "inbox"
+TOPIC_PREFIXES = ("thread:", "campaign:")
+BUMP_EVENT_TYPE = "inbox.bump"
+
+
+def serialize_event(message: Dict[str, Any]) -> str:
+    return json.dumps(message, default=str, separators=(",", ":"))
+
+
+def stamp_seq(body: str, seq: int) -> str:
+    """Prefix `"seq": n` onto an already-serialized JSON object (mirrors the Lua script)."""
+    if not body:
+        return body
+    if body == "{}":
+        return f'{{"seq":{seq}}}'
+    return f'{{"seq":{seq},{body[1:]}'
+
+
+def is_valid_topic(topic: Any) -> bool:
+    if not isinstance(topic, str):
+        return False
+    if topic == INBOX_TOPIC:
+        return True
+    return any(topic.startswith(p) and len(topic) > len(p) for p in TOPIC_PREFIXES)
+
+
+def event_topics(payload: Dict[str, Any]) -> List[str]:
+    topics = []
+    if payload.get("thread_id"):
+        topics.append(f"thread:{payload['thread_id']}")
+    if payload.get("campaign_id"):
+        topics.append(f"campaign:{payload['campaign_id']}")
+    return topics
+
+
+def build_bump(event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact record telling a dashboard that a conversation it isn't viewing changed."""
+    return {
+        "type": BUMP_EVENT_TYPE,
+        "payload": {
+            "event": event_type,
+            "thread_id": payload.get("thread_id"),
+            "campaign_id": payload.get("campaign_id"),
+            "sender": payload.get("sender") or payload.get("sender_type"),
+            "timestamp": payload.get("timestamp"),
+        },
+    }
+
+
+class _Connection:
+    """One socket plus its bounded outbound queue and the task draining it."""
+
+    __slots__ = (
+        "websocket",
+        "user_id",
+        "role",
+        "queue",
+        "writer",
+        "dropped",
+        "topics",
+        "subscribed",
+        "held",
+    )
+
+    def __init__(
+        self, websocket: WebSocket, user_id: str | None, role: str | None, size: int
+    ) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        self.role = role
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=size)
+        self.writer: asyncio.Task | None = None
+        self.dropped = 0
+        self.topics: Set[str] = set()
+        # Sockets that never sent a subscribe frame keep receiving every payload.
+        self.subscribed = False
+        # While a resume replay is in flight, live frames wait here so the
+        # client still sees events in sequence order.
+        self.held: list[tuple[int | None, str]] | None = None
 
 
 class WebSocketManager:
-    def __init__(self) -> None:
-        self._all_connections: Set[WebSocket] = set()
+    """
+    Fan-out of server events to connected dashboards.
+
+    Every event is serialized once and pushed onto each target connection's
+    bounded queue; a per-connection writer task does the actual send. A slow or
+    stalled browser therefore only backs up its own queue. When that queue is
+    full the `slow_consumer_policy` either drops the oldest pending frame or
+    closes the socket. Sockets whose send fails are evicted immediately.
+
+    In `redis` cluster mode every event is stamped with a cluster-wide sequence
+    number, delivered to this node's sockets, and published once on a Redis
+    channel; each other node relays it to its own local sockets. In `local`
+    mode the sequence is a per-process counter and nothing leaves the process.
+
+    Conversation events (payloads carrying `thread_id` / `campaign_id`) are routed
+    by topic. Sockets subscribed to `thread:<id>`, `campaign:<id>` or `inbox` get
+    the full payload; other subscribing sockets get a compact `inbox.bump` record;
+    legacy sockets that never subscribed still receive everything.
+
+    Every event is also kept in a replay buffer (a capped Redis Stream keyed by
+    sequence in cluster mode, an in-process ring otherwise). A reconnecting
+    client resumes from its `last_seq` and receives only what it missed, or a
+    `resync_required` frame if it fell further behind than the buffer allows.
+    """
+
+    def __init__(
+        self,
+        queue_size: int,
+        slow_consumer_policy: str,
+        cluster_mode: str,
+        replay_buffer_size: int,
+        replay_max_events: int,
+    ) -> None:
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.cluster_mode = cluster_mode
+        self.replay_buffer_size = replay_buffer_size
+        # A replay must fit in the send queue, or the drop policy would punch holes in it.
+        self.replay_max_events = min(replay_max_events, queue_size - 1)
+        self.node_id = uuid.uuid4().hex
+        self._connections: Dict[WebSocket, _Connection] = {}
         self._user_connections: Dict[str, Set[WebSocket]] = {}
         self._role_connections: Dict[str, Set[WebSocket]] = {}
-        self._lock = asyncio.Lock()
+        self._topic_connections: Dict[str, Set[WebSocket]] = {}
+        self._legacy_connections: Set[WebSocket] = set()
+        self._subscriber_connections: Set[WebSocket] = set()
+        self._local_seq = itertools.count(1)
+        self._last_local_seq = 0
+        self._local_replay: deque = deque(maxlen=replay_buffer_size)
+        self._append_script = None
+        self._relay_task: Optional[asyncio.Task] = None
+
+    @property
+    def clustered(self) -> bool:
+        return self.cluster_mode == CLUSTER_MODE_REDIS
+
+    def _get_redis(self) -> redis.Redis:
+        return get_redis()
+
+    def _get_append_script(self):
+        if self._append_script is None:
+            self._append_script = self._get_redis().register_script(APPEND_EVENT_SCRIPT)
+        return self._append_script
+
+    async def start(self) -> None:
+        """Start relaying events published by other nodes (cluster mode only)."""
+        if self.clustered and self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
+
+    async def stop(self) -> None:
+        if self._relay_task:
+            self._relay_task.cancel()
+            await asyncio.gather(self._relay_task, return_exceptions=True)
+            self._relay_task = None
+
+    async def _relay(self) -> None:
+        while True:
+            pubsub = self._get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CLUSTER_CHANNEL)
+                print(f"{Colors.GREEN}WS cluster relay subscribed | node={self.node_id}")
+                async for message in pubsub.listen():
+                    envelope = json.loads(message["data"])
+                    if envelope.get("origin") == self.node_id:
+                        continue
+                    self._deliver_local(
+                        envelope["target"],
+                        json.loads(envelope["key"]),
+                        envelope["data"],
+                        envelope.get("bump") or None,
+                        envelope.get("seq"),
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"{Colors.RED}WS cluster relay error: {e}")
+                await asyncio.sleep(RELAY_RETRY_SECONDS)
+            finally:
+                await pubsub.aclose()
 
     async def connect(
         self,
@@ -19,58 +248,325 @@ class WebSocketManager:
         role: str | None = None,
     ):
         await websocket.accept()
-        async with self._lock:
-            self._all_connections.add(websocket)
-
-            if user_id:
-                self._user_connections.setdefault(user_id, set()).add(websocket)
-            if role:
-                self._role_connections.setdefault(role, set()).add(websocket)
-        print(f"🔌 WS connected | total={len(self._all_connections)}")
+        conn = _Connection(websocket, user_id, role, self.queue_size)
+        self._connections[websocket] = conn
+        if user_id:
+            self._user_connections.setdefault(user_id, set()).add(websocket)
+        if role:
+            self._role_connections.setdefault(role, set()).add(websocket)
+        self._legacy_connections.add(websocket)
+        conn.writer = asyncio.create_task(self._writer(conn))
+        print(f"🔌 WS connected | total={len(self._connections)}")
 
     async def disconnect(self, websocket: WebSocket):
-        async with self._lock:
-            self._all_connections.discard(websocket)
+        conn = self._connections.pop(websocket, None)
+        if conn is None:
+            return
+        self._discard_index(self._user_connections, conn.user_id, websocket)
+        self._discard_index(self._role_connections, conn.role, websocket)
+        for topic in conn.topics:
+            self._discard_index(self._topic_connections, topic, websocket)
+        self._legacy_connections.discard(websocket)
+        self._subscriber_connections.discard(websocket)
+        if conn.writer and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        print(f"❌ WS disconnected | total={len(self._connections)}")
 
-            for sockets in self._user_connections.values():
-                sockets.discard(websocket)
-            for sockets in self._role_connections.values():
-                sockets.discard(websocket)
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Set[str]:
+        conn = self._connections.get(websocket)
+        if conn is None:
+            return set()
+        if not conn.subscribed:
+            conn.subscribed = True
+            self._legacy_connections.discard(websocket)
+            self._subscriber_connections.add(websocket)
+        for topic in topics:
+            if is_valid_topic(topic) and topic not in conn.topics:
+                conn.topics.add(topic)
+                self._topic_connections.setdefault(topic, set()).add(websocket)
+        return set(conn.topics)
 
-        print(f"❌ WS disconnected | total={len(self._all_connections)}")
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Set[str]:
+        conn = self._connections.get(websocket)
+        if conn is None:
+            return set()
+        for topic in topics:
+            if topic in conn.topics:
+                conn.topics.discard(topic)
+                self._discard_index(self._topic_connections, topic, websocket)
+        return set(conn.topics)
 
-    async def broadcast_event(self, event_type: str, payload: dict) -> int:
-        message = {
-            "type": event_type,
-            "payload": payload,
-        }
+    async def handle_client_frame(self, websocket: WebSocket, raw: str) -> None:
+        """Apply a subscribe / unsubscribe / resume frame from the client.
+
+        `{"action": "subscribe"|"unsubscribe", "topics": [...]}` edits topics;
+        `{"action": "resume", "last_seq": n}` replays missed events.
+        """
+        try:
+            frame = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(frame, dict):
+            return
+        action = frame.get("action")
+        if action == "resume":
+            await self.resume(websocket, frame.get("last_seq"))
+            return
+        topics = frame.get("topics") or []
+        if isinstance(topics, str):
+            topics = [topics]
+        if action == "subscribe":
+            current = self.subscribe(websocket, topics)
+        elif action == "unsubscribe":
+            current = self.unsubscribe(websocket, topics)
+        else:
+            return
+        conn = self._connections.get(websocket)
+        if conn is not None:
+            self._enqueue(
+                conn,
+                serialize_event({"type": "subscriptions", "topics": sorted(current)}),
+            )
+
+    @staticmethod
+    def _discard_index(
+        index: Dict[str, Set[WebSocket]], key: str | None, websocket: WebSocket
+    ) -> None:
+        if not key:
+            return
+        sockets = index.get(key)
+        if sockets is None:
+            return
+        sockets.discard(websocket)
+        if not sockets:
+            index.pop(key, None)
+
+    async def _writer(self, conn: _Connection) -> None:
+        try:
+            while True:
+                data = await conn.queue.get()
+                await asyncio.wait_for(
+                    conn.websocket.send_text(data), timeout=SEND_TIMEOUT_SECONDS
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"{Colors.YELLOW}WS send failed, evicting socket: {e}")
+            await self.disconnect(conn.websocket)
 
-        async with self._lock:
-            sockets = list(self._all_connections)
+    async def _close_slow_consumer(self, conn: _Connection) -> None:
+        await self.disconnect(conn.websocket)
+        try:
+            await conn.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
 
+    def _enqueue(self, conn: _Connection, data: str, seq: int | None = None) -> bool:
+        if conn.held is not None:
+            conn.held.append((seq, data))
+            return True
+        return self._push(conn, data)
+
+    def _push(self, conn: _Connection, data: str) -> bool:
+        try:
+            conn.queue.put_nowait(data)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self.slow_consumer_policy == POLICY_CLOSE:
+            print(f"{Colors.YELLOW}WS slow consumer closed (queue full)")
+            spawn(self._close_slow_consumer(conn))
+            return False
+        conn.queue.get_nowait()
+        conn.queue.put_nowait(data)
+        conn.dropped += 1
+        return True
+
+    def _fanout(
+        self, sockets: Iterable[WebSocket], data: str, seq: int | None = None
+    ) -> int:
         delivered = 0
-        for ws in sockets:
-            try:
-                await ws.send_json(message)
+        for ws in list(sockets):
+            conn = self._connections.get(ws)
+            if conn is not None and self._enqueue(conn, data, seq):
                 delivered += 1
+        return delivered
+
+    def _deliver_topics(
+        self, topics: List[str], data: str, bump: str | None, seq: int | None
+    ) -> int:
+        interested: Set[WebSocket] = set()
+        for topic in [*topics, INBOX_TOPIC]:
+            interested.update(self._topic_connections.get(topic, ()))
+        delivered = self._fanout(interested, data, seq)
+        delivered += self._fanout(self._legacy_connections, data, seq)
+        if bump is not None:
+            self._fanout(self._subscriber_connections - interested, bump, seq)
+        return delivered
+
+    def _deliver_local(
+        self,
+        target: str,
+        key: Any,
+        data: str,
+        bump: str | None = None,
+        seq: int | None = None,
+    ) -> int:
+        if target == TARGET_TOPICS:
+            return self._deliver_topics(key or [], data, bump, seq)
+        if target == TARGET_ROLE:
+            return self._fanout(self._role_connections.get(key, ()), data, seq)
+        if target == TARGET_USER:
+            return self._fanout(self._user_connections.get(key, ()), data, seq)
+        return self._fanout(self._connections.keys(), data, seq)
+
+    @staticmethod
+    def _frame_for(
+        conn: _Connection, target: str, key: Any, data: str, bump: str | None
+    ) -> str | None:
+        """The frame `conn` would have received live for one buffered event."""
+        if target == TARGET_ROLE:
+            return data if conn.role == key else None
+        if target == TARGET_USER:
+            return data if conn.user_id == key else None
+        if target == TARGET_TOPICS:
+            if not conn.subscribed:
+                return data
+            if conn.topics.intersection([*(key or []), INBOX_TOPIC]):
+                return data
+            return bump
+        return data
+
+    async def _missed_events(self, last_seq: int) -> tuple[list, bool, int]:
+        """Buffered events after `last_seq`, whether they cover the whole gap, and the latest seq."""
+        if self.clustered:
+            client = self._get_redis()
+            rows = await client.xrange(
+                REPLAY_STREAM, min=f"{last_seq + 1}-0", count=self.replay_max_events + 1
+            )
+            events = [
+                (
+                    int(entry_id.split("-")[0]),
+                    fields["target"],
+                    json.loads(fields["key"]),
+                    fields["data"],
+                    fields.get("bump") or None,
+                )
+                for entry_id, fields in rows
+            ]
+            latest = int(await client.get(CLUSTER_SEQ_KEY) or 0)
+        else:
+            events = [e for e in self._local_replay if e[0] > last_seq]
+            latest = self._last_local_seq
+        if not events:
+            # A client ahead of the counter saw a sequence that was since reset.
+            return [], latest == last_seq, latest
+        covered = events[0][0] == last_seq + 1 and len(events) <= self.replay_max_events
+        return events, covered, latest
+
+    async def resume(self, websocket: WebSocket, last_seq: Any) -> None:
+        """Replay events missed since `last_seq` to one reconnecting socket."""
+        conn = self._connections.get(websocket)
+        if conn is None or conn.held is not None:
+            return
+        try:
+            last_seq = int(last_seq)
+        except (TypeError, ValueError):
+            return
+
+        conn.held = []
+        replayed_up_to = last_seq
+        try:
+            events, covered, latest = await self._missed_events(last_seq)
+            if not covered:
+                print(f"{Colors.YELLOW}WS resume from {last_seq} too far behind, resync")
+                frame = serialize_event({"type": RESYNC_EVENT_TYPE, "seq": latest})
+                held, conn.held = conn.held, None
+                self._push(conn, frame)
+                for seq, data in held:
+                    self._enqueue(conn, data, seq)
+                return
+            for seq, target, key, data, bump in events:
+                frame = self._frame_for(conn, target, key, data, bump)
+                replayed_up_to = seq
+                if frame is not None:
+                    self._push(conn, frame)
+            held, conn.held = conn.held, None
+            for seq, data in held:
+                if seq is None or seq > replayed_up_to:
+                    self._enqueue(conn, data, seq)
+        except Exception as e:
+            print(f"{Colors.RED}WS resume failed: {e}")
+            held, conn.held = conn.held or [], None
+            self._push(conn, serialize_event({"type": RESYNC_EVENT_TYPE, "seq": None}))
+            for seq, data in held:
+                self._enqueue(conn, data, seq)
+
+    async def _dispatch(
+        self,
+        target: str,
+        key: Any,
+        message: dict,
+        bump: dict | None = None,
+    ) -> int:
+        """Stamp, serialize once, deliver locally and (clustered) publish to peers.
+
+        Returns the number of sockets reached on this node.
+        """
+        body = serialize_event(message)
+        bump_body = serialize_event(bump) if bump else ""
+        if self.clustered:
+            try:
+                seq, data, bump_data = await self._get_append_script()(
+                    keys=[CLUSTER_SEQ_KEY, REPLAY_STREAM],
+                    args=[
+                        self.node_id,
+                        target,
+                        json.dumps(key),
+                        body,
+                        bump_body,
+                        self.replay_buffer_size,
+                        CLUSTER_CHANNEL,
+                    ],
+                )
+                seq = int(seq)
             except Exception as e:
-                print("WS send failed:", e)
+                # Still reach this node's sockets; peers and replay miss this one.
+                print(f"{Colors.RED}WS cluster append failed: {e}")
+                seq, data, bump_data = None, body, bump_body
+        else:
+            seq = next(self._local_seq)
+            self._last_local_seq = seq
+            data, bump_data = stamp_seq(body, seq), stamp_seq(bump_body, seq)
+            self._local_replay.append((seq, target, key, data, bump_data or None))
+        return self._deliver_local(target, key, data, bump_data or None, seq)
 
+    async def broadcast_event(self, event_type: str, payload: dict) -> int:
+        message = {"type": event_type, "payload": payload}
+        topics = event_topics(payload)
+        if topics:
+            delivered = await self._dispatch(
+                TARGET_TOPICS, topics, message, bump=build_bump(event_type, payload)
+            )
+        else:
+            delivered = await self._dispatch(TARGET_ALL, None, message)
         print(f"📡 Broadcast `{event_type}` → {delivered} clients")
         return delivered
 
+    async def broadcast(self, message: dict) -> int:
+        return await self._dispatch(TARGET_ALL, None, message)
+
     async def broadcast_role(self, role: str, payload: dict) -> int:
-        async with self._lock:
-            sockets = list(self._role_connections.get(role, []))
+        return await self._dispatch(TARGET_ROLE, role, payload)
 
-        delivered = 0
-        for ws in sockets:
-            try:
-                await ws.send_json(payload)
-                delivered += 1
-            except Exception:
-                pass
-        return delivered
+    async def send_to_user(self, user_id: str, payload: dict) -> int:
+        return await self._dispatch(TARGET_USER, user_id, payload)
 
 
-ws_manager = WebSocketManager()
+ws_manager = WebSocketManager(
+    queue_size=config.WS_SEND_QUEUE_SIZE,
+    slow_consumer_policy=config.WS_SLOW_CONSUMER_POLICY,
+    cluster_mode=config.WS_CLUSTER_MODE,
+    replay_buffer_size=config.WS_REPLAY_BUFFER_SIZE,
+    replay_max_events=config.WS_REPLAY_MAX_EVENTS,
+)
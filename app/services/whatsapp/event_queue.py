@@ -0,0 +1,316 @@
+import asyncio
+import json
+import time
+import uuid
+import zlib
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import redis.asyncio as redis
+from app.config.credentials_config import config
+from app.core.redis_manager import get_redis
+from app.core.redis_lock import RELEASE_LOCK_SCRIPT, RENEW_LOCK_SCRIPT
+from app.utils.printcolors import Colors
+
+STREAM_PREFIX = "whatsapp:events"
+DEAD_LETTER_STREAM = "whatsapp:events:dead"
+CONSUMER_GROUP = "whatsapp-consumers"
+LEASE_PREFIX = "whatsapp:events:lease"
+LEASE_TTL_MS = 30_000
+STREAM_MAXLEN = 100_000
+READ_COUNT = 10
+READ_BLOCK_MS = 5_000
+RETRY_BACKOFF_SECONDS = 1.0
+PROGRESS_PREFIX = "whatsapp:events:progress"
+PROGRESS_TTL_SECONDS = 86_400
+
+EventHandler = Callable[..., Awaitable[Any]]
+
+def _get_redis() -> redis.Redis:
+    return get_redis()
+
+
+def partition_for(thread_id: str, partitions: Optional[int] = None) -> int:
+    partitions = partitions or config.WHATSAPP_QUEUE_PARTITIONS
+    return zlib.crc32(thread_id.encode("utf-8")) % partitions
+
+
+def stream_key(partition: int) -> str:
+    return f"{STREAM_PREFIX}:{partition}"
+
+
+async def enqueue_whatsapp_event(event: Dict[str, Any], thread_id: str) -> str:
+    """Append a raw webhook event to the stream partition owning `thread_id`."""
+    return await _get_redis().xadd(
+        stream_key(partition_for(thread_id)),
+        {
+            "thread_id": thread_id,
+            "event": json.dumps(event),
+            "enqueued_at": str(time.time()),
+        },
+        maxlen=STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+class EventProgress:
+    """
+    Completed pipeline steps of one event, kept across retry attempts.
+
+        s3_url = await progress.step("media", lambda: upload(...))
+
+    A step that already completed on an earlier attempt is not run again; its
+    stored (JSON) result is returned instead, so saves, broadcasts, uploads
+    and sends happen once and a retry resumes at the step that failed. With
+    no `key` (inline webhook processing) every step simply runs.
+    """
+
+    def __init__(self, key: Optional[str] = None) -> None:
+        self.key = key
+
+    async def step(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self.key is None:
+            return await fn()
+        client = _get_redis()
+        try:
+            raw = await client.hget(self.key, name)
+            if raw is not None:
+                return json.loads(raw)
+        except Exception as e:
+            print(f"{Colors.RED}[EventProgress] Read failed for {self.key}:{name}: {e}")
+        result = await fn()
+        try:
+            await client.hset(self.key, name, json.dumps(result, default=str))
+            await client.expire(self.key, PROGRESS_TTL_SECONDS)
+        except Exception as e:
+            print(f"{Colors.RED}[EventProgress] Write failed for {self.key}:{name}: {e}")
+        return result
+
+    async def clear(self) -> None:
+        if self.key is not None:
+            await _get_redis().delete(self.key)
+
+
+def progress_from_config(config: Optional[Dict[str, Any]]) -> EventProgress:
+    """The `EventProgress` a graph run was given as `configurable.event_progress`."""
+    progress = ((config or {}).get("configurable") or {}).get("event_progress")
+    return progress if isinstance(progress, EventProgress) else EventProgress()
+
+
+def _drop_tail(tails: Dict[str, asyncio.Task], thread_id: str, task: asyncio.Task) -> None:
+    if tails.get(thread_id) is task:
+        del tails[thread_id]
+
+
+class WhatsAppEventConsumers:
+    """
+    Pool of Redis Stream consumers for queued WhatsApp webhook events.
+
+    Events are partitioned by a hash of `thread_id`. Each partition is consumed by
+    exactly one worker at a time (guarded by a renewable lease key). Within a
+    partition, up to `concurrency` entries run at once; entries of the same
+    thread are chained so a thread's messages are always handled in arrival
+    order, while unrelated threads sharing the partition do not wait on each
+    other. Each entry is acknowledged as soon as its own turn finishes.
+    Failed events are retried with backoff, then moved to the dead-letter stream.
+    The handler receives an `EventProgress` for the entry, so a retry skips the
+    steps an earlier attempt already completed.
+    """
+
+    def __init__(
+        self,
+        app,
+        handler: EventHandler,
+        partitions: int,
+        max_attempts: int,
+        concurrency: int,
+    ) -> None:
+        self.app = app
+        self.handler = handler
+        self.partitions = partitions
+        self.max_attempts = max(1, max_attempts)
+        self.concurrency = max(1, concurrency)
+        self.worker_id = uuid.uuid4().hex
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        for partition in range(self.partitions):
+            await self._ensure_group(stream_key(partition))
+            self._tasks.append(asyncio.create_task(self._run_partition(partition)))
+        print(
+            f"{Colors.GREEN}[WhatsAppEventConsumers] Started {self.partitions} partition consumers"
+        )
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _ensure_group(self, key: str) -> None:
+        try:
+            await _get_redis().xgroup_create(key, CONSUMER_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _run_partition(self, partition: int) -> None:
+        client = _get_redis()
+        lease_key = f"{LEASE_PREFIX}:{partition}"
+        while not self._stopping.is_set():
+            try:
+                acquired = await client.set(
+                    lease_key, self.worker_id, nx=True, px=LEASE_TTL_MS
+                )
+                if not acquired:
+                    await asyncio.sleep(LEASE_TTL_MS / 3000)
+                    continue
+                renewer = asyncio.create_task(self._renew_lease(lease_key))
+                try:
+                    await self._consume(partition, renewer)
+                finally:
+                    renewer.cancel()
+                    await client.eval(RELEASE_LOCK_SCRIPT, 1, lease_key, self.worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(
+                    f"{Colors.RED}[WhatsAppEventConsumers] Partition {partition} error: {e}"
+                )
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS)
+
+    async def _renew_lease(self, lease_key: str) -> None:
+        client = _get_redis()
+        while True:
+            await asyncio.sleep(LEASE_TTL_MS / 3000)
+            renewed = await client.eval(
+                RENEW_LOCK_SCRIPT, 1, lease_key, self.worker_id, LEASE_TTL_MS
+            )
+            if not renewed:
+                print(f"{Colors.YELLOW}[WhatsAppEventConsumers] Lost lease {lease_key}")
+                return
+
+    async def _consume(self, partition: int, renewer: asyncio.Task) -> None:
+        client = _get_redis()
+        key = stream_key(partition)
+        consumer = f"partition-{partition}"
+        slots = asyncio.Semaphore(self.concurrency)
+        # Last scheduled entry per thread; the next one of that thread waits on it.
+        tails: Dict[str, asyncio.Task] = {}
+        in_flight: Set[asyncio.Task] = set()
+        # Start with entries a previous lease holder read but never acknowledged,
+        # paging by id so entries still in flight here are not read twice.
+        last_id = "0"
+        try:
+            while not self._stopping.is_set() and not renewer.done():
+                response = await client.xreadgroup(
+                    CONSUMER_GROUP,
+                    consumer,
+                    {key: last_id},
+                    count=READ_COUNT,
+                    block=READ_BLOCK_MS if last_id == ">" else None,
+                )
+                entries = response[0][1] if response else []
+                if not entries:
+                    last_id = ">"
+                    continue
+                for entry_id, fields in entries:
+                    if renewer.done():
+                        return
+                    if last_id != ">":
+                        last_id = entry_id
+                    await slots.acquire()
+                    thread_id = fields.get("thread_id") or entry_id
+                    task = asyncio.create_task(
+                        self._process_after(tails.get(thread_id), key, entry_id, fields, slots)
+                    )
+                    tails[thread_id] = task
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                    task.add_done_callback(partial(_drop_tail, tails, thread_id))
+        finally:
+            # Unacknowledged entries go back to whoever holds the lease next;
+            # their EventProgress lets that attempt resume instead of repeat.
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _process_after(
+        self,
+        previous: Optional[asyncio.Task],
+        key: str,
+        entry_id: str,
+        fields: Dict[str, str],
+        slots: asyncio.Semaphore,
+    ) -> None:
+        try:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            await self._process(key, entry_id, fields)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"{Colors.RED}[WhatsAppEventConsumers] {entry_id} not acknowledged: {e}")
+        finally:
+            slots.release()
+
+    async def _process(self, key: str, entry_id: str, fields: Dict[str, str]) -> None:
+        client = _get_redis()
+        error: Optional[Exception] = None
+        try:
+            event = json.loads(fields.get("event") or "{}")
+        except json.JSONDecodeError as e:
+            event, error = None, e
+
+        progress = EventProgress(f"{PROGRESS_PREFIX}:{key}:{entry_id}")
+        if event is not None:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    await self.handler(self.app, event, progress=progress)
+                    error = None
+                    break
+                except Exception as e:
+                    error = e
+                    print(
+                        f"{Colors.RED}[WhatsAppEventConsumers] {entry_id} attempt {attempt} failed: {e}"
+                    )
+                    if attempt < self.max_attempts:
+                        await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+        if error is not None:
+            await client.xadd(
+                DEAD_LETTER_STREAM,
+                {
+                    **fields,
+                    "source_stream": key,
+                    "source_id": entry_id,
+                    "error": str(error)[:1000],
+                    "failed_at": str(time.time()),
+                },
+                maxlen=STREAM_MAXLEN,
+                approximate=True,
+            )
+        await client.xack(key, CONSUMER_GROUP, entry_id)
+        await progress.clear()
+
+
+async def start_whatsapp_consumers(app, handler: EventHandler) -> None:
+    if getattr(app.state, "whatsapp_event_consumers", None):
+        return
+    consumers = WhatsAppEventConsumers(
+        app,
+        handler,
+        partitions=config.WHATSAPP_QUEUE_PARTITIONS,
+        max_attempts=config.WHATSAPP_QUEUE_MAX_ATTEMPTS,
+        concurrency=config.WHATSAPP_QUEUE_CONCURRENCY,
+    )
+    await consumers.start()
+    app.state.whatsapp_event_consumers = consumers
+
+
+async def stop_whatsapp_consumers(app) -> None:
+    consumers = getattr(app.state, "whatsapp_event_consumers", None)
+    if consumers:
+        await consumers.stop()
+        app.state.whatsapp_event_consumers = None
@@ -1,5 +1,4 @@
-import httpx
-from app.config.credentials_config import config
+from app.services.meta_graph_client import get_meta_graph_client
 from app.utils.helpers import format_followers
 
 
@@ -10,12 +9,6 @@ async def send_whatsapp_interactive_message(
 ) -> bool:
     print("Entering into send_whatsapp_interactive_message")
     print("--------------------------------")
-    access_token = config.META_WHATSAPP_ACCESSSTOKEN
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-    }
 
     username = influencer.get("username")
     followers = influencer.get("followers")
@@ -57,23 +50,11 @@ async def send_whatsapp_interactive_message(
         },
     }
 
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": recipient_id,
-        "type": "interactive",
-        "interactive": interactive,
-    }
-
-    print("Interactive message Payload: ", payload)
+    print("Interactive message Payload: ", interactive)
     print("--------------------------------")
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        response = await client.post(
-            "https://graph.facebook.com/v22.0/967002123161751/messages",
-            headers=headers,
-            json=payload,
-        )
-        print("Response: ", response.json())
-        if response.status_code != 200:
-            return False
-        return True
+    response = await get_meta_graph_client().send_interactive(recipient_id, interactive)
+    print("Response: ", response.json())
+    if response.status_code != 200:
+        return False
+    return True
@@ -1,30 +1,13 @@
 import httpx
 from fastapi import HTTPException
-from app.config.credentials_config import config
 from app.core.exception import InternalServerErrorException
+from app.services.meta_graph_client import get_meta_graph_client
 
 
 async def send_whatsapp_message(recipient_id: str, message_text: str) -> bool:
-    headers = {
-        "Authorization": f"Bearer {config.META_WHATSAPP_ACCESSSTOKEN}",
-        "Content-Type": "application/json",
-    }
-
-    message_payload = {
-        "messaging_product": "whatsapp",
-        "to": recipient_id,
-        "type": "text",
-        "text": {"body": message_text},
-    }
-
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(
-                "https://graph.facebook.com/v22.0/967002123161751/messages",
-                headers=headers,
-                json=message_payload,
-            )
-            print("Response: ", response.json())
+        response = await get_meta_graph_client().send_text(recipient_id, message_text)
+        print("Response: ", response.json())
         if response.status_code != 200:
             raise HTTPException(
                 status_code=500,
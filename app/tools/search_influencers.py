@@ -1,7 +1,5 @@
 from typing import List
-from app.tools.instagram_influencers import search_instagram_influencers
-from app.tools.tiktok_influencers import search_tiktok_influencers
-from app.tools.youtube_influencers import search_youtube_influencers
+from app.services.vector_search import get_influencer_search_service
 import asyncio
 
 
@@ -13,45 +11,28 @@ async def search_influencers(
     limit: int,
 ):
     try:
-        tasks = []
+        search_service = get_influencer_search_service()
         platforms_lower = [
             p.strip().lower() if isinstance(p, str) else str(p).strip().lower()
             for p in platforms
         ]
-
-        if "instagram" in platforms_lower:
-            tasks.append(
-                search_instagram_influencers(
-                    category=category,
-                    limit=limit,
-                    followers=followers,
-                    country=country,
-                )
-            )
-        if "tiktok" in platforms_lower:
-            tasks.append(
-                search_tiktok_influencers(
-                    category=category,
-                    limit=limit,
-                    followers=followers,
-                    country=country,
-                )
-            )
-        if "youtube" in platforms_lower:
-            tasks.append(
-                search_youtube_influencers(
-                    category=category,
-                    limit=limit,
-                    followers=followers,
-                    country=country,
-                )
+        tasks = [
+            search_service.search(
+                platform=platform,
+                category=category,
+                limit=limit,
+                followers=followers,
+                country=country,
             )
+            for platform in dict.fromkeys(platforms_lower)
+            if platform in search_service.stores
+        ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         combined_results = []
         for result in results:
             if isinstance(result, Exception):
                 continue
-            combined_results.extend(result)
+            combined_results.extend(result.get("data", []))
 
         return combined_results
 
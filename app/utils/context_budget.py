@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+from app.config.credentials_config import config
+from app.utils.printcolors import Colors
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encoding = None
+_encoding_failed = False
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text` by the configured tiktoken encoding, else ~4 chars per token."""
+    global _encoding, _encoding_failed
+    text = text or ""
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding(config.LLM_TOKENIZER_ENCODING)
+        except Exception as e:
+            # The encoding file is downloaded on first use; offline hosts fall back.
+            _encoding_failed = True
+            print(f"{Colors.YELLOW}[count_tokens] tiktoken unavailable, estimating: {e}")
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        tokens = _encoding.encode(text)
+        return _encoding.decode(tokens[-max_tokens:] if keep_end else tokens[:max_tokens])
+    return text[-max_tokens * 4 :] if keep_end else text[: max_tokens * 4]
+
+
+def _message_text(message: dict) -> str:
+    return (message.get("message") or message.get("content") or "").strip()
+
+
+def unsummarized(history: List[dict], summary_until: Optional[str]) -> List[dict]:
+    """Messages newer than the last one folded into the rolling summary."""
+    if not summary_until:
+        return list(history)
+    return [m for m in history if str(m.get("timestamp") or "") > str(summary_until)]
+
+
+@dataclass
+class ConversationContext:
+    summary: Optional[str] = None
+    messages: List[dict] = field(default_factory=list)
+    tokens: int = 0
+
+
+def build_context(
+    history: List[dict],
+    summary: Optional[str] = None,
+    summary_until: Optional[str] = None,
+    budget_tokens: Optional[int] = None,
+    max_messages: Optional[int] = None,
+) -> ConversationContext:
+    """
+    The slice of a conversation that fits in `budget_tokens`.
+
+    The rolling summary (if any) may use up to a third of the budget. The
+    remainder is filled with the newest messages not yet covered by the
+    summary, at most `max_messages` of them, oldest first in the result. The
+    newest message is always kept, truncated if it alone exceeds the budget.
+    """
+    budget = budget_tokens or config.LLM_CONTEXT_BUDGET_TOKENS
+    max_messages = max_messages or config.LLM_CONTEXT_MAX_MESSAGES
+    context = ConversationContext()
+
+    if summary:
+        context.summary = truncate_to_tokens(summary, budget // 3, keep_end=True)
+        context.tokens = count_tokens(context.summary)
+
+    candidates = [
+        m
+        for m in unsummarized(history or [], summary_until if summary else None)
+        if isinstance(m, dict) and _message_text(m)
+    ]
+    kept: List[dict] = []
+    for message in reversed(candidates[-max_messages:]):
+        text = _message_text(message)
+        tokens = count_tokens(text) + 4  # role and separators
+        if context.tokens + tokens > budget:
+            if not kept:
+                text = truncate_to_tokens(text, max(1, budget - context.tokens - 4))
+                kept.append({**message, "message": text})
+                context.tokens = budget
+            break
+        kept.append(message)
+        context.tokens += tokens
+    context.messages = list(reversed(kept))
+    return context
+
+
+def context_to_agent_messages(context: ConversationContext) -> List[dict]:
+    out = []
+    if context.summary:
+        out.append(
+            {
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {context.summary}",
+            }
+        )
+    for message in context.messages:
+        role = "user" if (message.get("sender_type") or "").upper() == "USER" else "assistant"
+        out.append({"role": role, "content": _message_text(message)})
+    return out
+
+
+def context_to_transcript(context: ConversationContext) -> str:
+    lines = []
+    if context.summary:
+        lines.append(f"(Earlier conversation, summarized: {context.summary})")
+    for message in context.messages:
+        is_ai = message.get("sender_type") == "AI" or message.get("role") == "assistant"
+        lines.append(f"{'AI' if is_ai else 'User'}: {_message_text(message)}")
+    return "\n".join(lines)
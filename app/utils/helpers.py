@@ -259,6 +259,32 @@ def normalize_country(country: str) -> str:
     return mapping.get(country.lower(), country)
 
 
+def normalize_country_key(country: Optional[str]) -> str:
+    if not country:
+        return ""
+    return normalize_country(country.strip()).strip().lower()
+
+
+def country_search_keys(country: Optional[str]) -> List[str]:
+    """Normalized keys for a stored country value, e.g. "Dubai, UAE" -> both parts."""
+    if not country or not isinstance(country, str):
+        return []
+    keys = [normalize_country_key(country)]
+    for part in country.replace("/", ",").split(","):
+        key = normalize_country_key(part)
+        if key and key not in keys:
+            keys.append(key)
+    return [k for k in keys if k]
+
+
+def search_filter_fields(influencer_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Derived fields indexed as `$vectorSearch` pre-filters on platform collections."""
+    return {
+        "followers_numeric": parse_follower_count(influencer_doc.get("followers") or 0),
+        "country_normalized": country_search_keys(influencer_doc.get("country")),
+    }
+
+
 def followers_in_range(influencer_count: int, ranges: List[Tuple[int, int]]):
     if not ranges:
         return True
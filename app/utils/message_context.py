@@ -1,12 +1,16 @@
 import io
 
-import httpx
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer
 
 from app.Schemas.instagram.message_schema import GenerateReplyOutput
-from app.config.credentials_config import config
+from app.services.meta_graph_client import get_meta_graph_client
+from app.utils.context_budget import (
+    build_context,
+    context_to_agent_messages,
+    context_to_transcript,
+)
 from app.utils.printcolors import Colors
 from app.utils.prompts import (
     ANALYZE_INFLUENCER_WHATSAPP_PROMPT,
@@ -14,15 +18,17 @@ from app.utils.prompts import (
 )
 
 
-def build_message_context(last_messages: list[dict], latest: str) -> str:
+def build_message_context(
+    last_messages: list[dict],
+    latest: str,
+    summary: str | None = None,
+    summary_until: str | None = None,
+) -> str:
     """
     Build conversation context for the AI reply.
     """
 
-    history = "\n".join(
-        f"{'AI' if msg.get('sender_type') == 'AI' else 'User'}: {msg.get('message', '')}"
-        for msg in last_messages
-    )
+    history = context_to_transcript(build_context(last_messages, summary, summary_until))
 
     return f"""
 {NEGOTIATE_INFLUENCER_DM_PROMPT}
@@ -37,11 +43,13 @@ Write the next reply as a natural human text message.
 """.strip()
 
 
-def build_whatsapp_message_context(last_messages: list[dict], latest: str) -> str:
-    history = "\n".join(
-        f"{'AI' if msg.get('sender_type') == 'AI' else 'User'}: {msg.get('message', '')}"
-        for msg in last_messages
-    )
+def build_whatsapp_message_context(
+    last_messages: list[dict],
+    latest: str,
+    summary: str | None = None,
+    summary_until: str | None = None,
+) -> str:
+    history = context_to_transcript(build_context(last_messages, summary, summary_until))
 
     return f"""
 {ANALYZE_INFLUENCER_WHATSAPP_PROMPT}
@@ -87,25 +95,30 @@ def set_history_list(state: dict, history: list) -> None:
     state["history"] = history if isinstance(history, list) else []
 
 
-def history_to_agent_messages(history: list[dict]) -> list[dict]:
+def history_to_agent_messages(
+    history: list[dict],
+    summary: str | None = None,
+    summary_until: str | None = None,
+) -> list[dict]:
     """
     Convert our history (sender_type: 'USER'|'AI', message: str) to the format
     expected by the agents API: role 'user'|'assistant', content: str.
     """
     # IMPORTANT:
     # - We keep full history in Mongo/state for the frontend.
-    # - For LLM context, we only send the most recent window.
-    recent_history = history[-20:] if isinstance(history, list) else []
-
-    out = []
-    for msg in recent_history:
-        if not isinstance(msg, dict):
-            continue
-        role = "user" if (msg.get("sender_type") or "").upper() == "USER" else "assistant"
-        content = (msg.get("message") or msg.get("content") or "").strip()
-        if content:
-            out.append({"role": role, "content": content})
-    return out
+    # - For LLM context, we only send what fits the token budget: the rolling
+    #   summary of older turns plus the most recent messages.
+    history = history if isinstance(history, list) else []
+    return context_to_agent_messages(build_context(history, summary, summary_until))
+
+
+def state_to_agent_messages(state: dict) -> list[dict]:
+    """`history_to_agent_messages` for a negotiation state carrying its summary."""
+    return history_to_agent_messages(
+        get_history_list(state),
+        state.get("history_summary"),
+        state.get("history_summary_until"),
+    )
 
 
 def build_campaign_brief_pdf_bytes(brief: dict) -> bytes | None:
@@ -202,29 +215,9 @@ async def upload_media_to_meta(file_bytes: bytes, mime_type: str, filename: str)
         return None
 
     try:
-        phone_number_id = "967002123161751"
-        url = f"https://graph.facebook.com/v22.0/{phone_number_id}/media"
-        headers = {
-            "Authorization": f"Bearer {config.META_WHATSAPP_ACCESSSTOKEN}",
-        }
-        files = {"file": (filename, file_bytes, mime_type)}
-        data = {
-            "messaging_product": "whatsapp",
-            "type": mime_type,
-        }
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, headers=headers, data=data, files=files)
-
-        response.raise_for_status()
-        payload = response.json()
-        media_id = payload.get("id")
-        if not media_id:
-            print(
-                f"{Colors.RED}[upload_media_to_meta] No media id in response: {payload}"
-            )
-            return None
-        return media_id
+        return await get_meta_graph_client().upload_media(
+            file_bytes, mime_type, filename
+        )
     except Exception as e:
         print(f"{Colors.RED}[upload_media_to_meta] Failed to upload media: {e}")
         return None
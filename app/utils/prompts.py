@@ -380,6 +380,15 @@ and set the expectation that the brand will follow up with any remaining operati
 Do not introduce new terms, prices, or deliverables that were not already agreed in the conversation.
 """
 
+NEGOTIATION_HISTORY_SUMMARY_PROMPT = """
+You maintain a running summary of a WhatsApp negotiation between a brand (AI) and an influencer (USER).
+Your input is JSON with "summary" (the summary so far, possibly empty) and "messages" (the next messages, oldest first).
+Return an updated summary that folds the new messages into the old one.
+Keep every fact the negotiation depends on: prices offered by each side and in what order, agreed or rejected terms,
+deliverables, platforms, timelines, usage rights, exclusivity, open questions and the influencer's stated constraints.
+Drop greetings and small talk. Write plain sentences, at most 150 words. Return only the summary text.
+"""
+
 CAMPAIGN_LOGO_PROMPT = """
 Create a premium, photorealistic circular brand logo for a campaign.
 
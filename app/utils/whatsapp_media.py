@@ -1,7 +1,7 @@
-import httpx
 from datetime import datetime, timezone
 from app.config.credentials_config import config
 from typing import Optional
+from app.services.meta_graph_client import get_meta_graph_client
 from app.utils.campaign_helpers import upload_file_to_s3_with_prefix
 
 async def upload_whatsapp_media_to_s3(media_id: str, media_type: str, mime_type: str) -> Optional[str]:
@@ -10,31 +10,18 @@ async def upload_whatsapp_media_to_s3(media_id: str, media_type: str, mime_type:
     Returns the S3 URL if successful, else None.
     """
     try:
-        # Step 1: Fetch Media URL from Meta
-        whatsapp_token = config.META_WHATSAPP_ACCESSSTOKEN
+        # Step 1 & 2: Resolve the media URL and download the binary from Meta
         api_version = config.WHATSAPP_GRAPH_API_VERSION
         
         # Ensure version string format 
-        api_version = api_version.replace("v.", "v")
+        api_version = api_version.replace("v.", "v") if api_version else None
         
-        meta_url = f"https://graph.facebook.com/{api_version}/{media_id}"
-        headers = {"Authorization": f"Bearer {whatsapp_token}"}
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(meta_url, headers=headers)
-            response.raise_for_status()
-            media_info = response.json()
-            download_url = media_info.get("url")
-            
-            if not download_url:
-                print(f"[upload_whatsapp_media_to_s3] No download URL found for media_id {media_id}")
-                return None
-            
-            # Step 2: Download Media Binary
-            # Use the same token for the download
-            media_response = await client.get(download_url, headers=headers)
-            media_response.raise_for_status()
-            binary_content = media_response.content
+        binary_content = await get_meta_graph_client().get_media(
+            media_id, api_version=api_version
+        )
+        if binary_content is None:
+            print(f"[upload_whatsapp_media_to_s3] No download URL found for media_id {media_id}")
+            return None
         
         # Step 3: Upload to S3 using existing helper from campaign_helpers
         date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
@@ -1,10 +1,29 @@
 from app.agents.WhatsappNegotiation.graph.whatsappnegotiation_graph import (
     negotiation_graph,
 )
-from app.core.redis import Initialize_redis, initialize_negotiation_redis
+from app.agents.Whatsapp.invoke.whatsapp_agent import process_whatsapp_event
+from app.core.redis import (
+    Initialize_redis,
+    initialize_negotiation_redis,
+    stop_checkpoint_sweeper,
+)
 
 # from app.core.scheduler import shutdown_scheduler, start_scheduler
 from app.db.connection import connect, close
+from app.db.indexes import ensure_indexes
+from app.core.background_tasks import drain_background_tasks
+from app.core.redis_manager import close_redis_manager, init_redis_manager
+from app.services.meta_graph_client import (
+    close_meta_graph_client,
+    init_meta_graph_client,
+)
+from app.services.vector_search import init_influencer_search_service
+from app.services.websocket_manager import ws_manager
+from app.services.whatsapp.event_queue import (
+    start_whatsapp_consumers,
+    stop_whatsapp_consumers,
+)
+from app.config.credentials_config import config
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -32,10 +51,23 @@ security_schemes = {
 async def lifespan(app: FastAPI):
     await connect()
     print("connected successfully")
+    await ensure_indexes()
+    init_influencer_search_service()
+    init_meta_graph_client()
+    init_redis_manager()
+    await ws_manager.start()
     await Initialize_redis(app)
     await initialize_negotiation_redis(app, negotiation_graph)
     print("whatsapp redis initialized successfully")
+    if config.WHATSAPP_WEBHOOK_MODE == "queue" and config.WHATSAPP_QUEUE_RUN_CONSUMERS:
+        await start_whatsapp_consumers(app, process_whatsapp_event)
     yield
+    await stop_whatsapp_consumers(app)
+    await stop_checkpoint_sweeper(app)
+    await drain_background_tasks()
+    await ws_manager.stop()
+    await close_meta_graph_client()
+    await close_redis_manager()
     await close()
     print("🧹closed")
 